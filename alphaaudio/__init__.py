@@ -0,0 +1,2 @@
+# AlphaAudio engine: everything that does not need Streamlit lives here so it can
+# be shared between the app (streamlit_app.py) and offline tooling.
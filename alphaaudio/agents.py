@@ -0,0 +1,274 @@
+import queue
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from . import schemas
+
+# --- AGENT DAG EXECUTOR ---
+# Each agent declares which other agents it reads from. The executor starts every
+# agent as soon as its dependencies are done, so independent agents (Structural
+# and Thermal both only need the Architect) run at the same time.
+
+DEFAULT_TIMEOUT = 180      # seconds per agent
+POLL_INTERVAL = 0.1
+
+
+class AgentTimeout(TimeoutError):
+    pass
+
+
+class Agent:
+    __slots__ = ("name", "deps", "build_prompt", "label", "timeout", "schema")
+
+    def __init__(self, name, build_prompt, deps=(), label=None, timeout=DEFAULT_TIMEOUT, schema=None):
+        self.name = name
+        self.deps = tuple(deps)
+        self.build_prompt = build_prompt   # (context, outputs) -> prompt text
+        self.label = label or name
+        self.timeout = timeout
+        self.schema = schema               # JSON response schema, None for free text
+
+    @property
+    def options(self):
+        # Extra generate_content arguments: JSON mode for agents with a schema
+        return {"generation_config": schemas.json_config(self.schema)} if self.schema else {}
+
+    def parse(self, text):
+        # Report object for a structured answer (SchemaError if invalid), else the text
+        return schemas.parse(self.name, text, self.schema) if self.schema else text
+
+    def summarize(self, text):
+        # What downstream prompts get: the compact fields, or the free text as is
+        if not self.schema:
+            return text
+        try:
+            return self.parse(text).compact()
+        except schemas.SchemaError:
+            return text
+
+    def render(self, text):
+        # Markdown for the UI; unparseable answers are shown raw
+        if not self.schema:
+            return text
+        try:
+            return self.parse(text).to_markdown()
+        except schemas.SchemaError:
+            return text
+
+
+class AgentDAG:
+    def __init__(self, agents):
+        self.agents = {a.name: a for a in agents}
+        for agent in agents:
+            for dep in agent.deps:
+                if dep not in self.agents:
+                    raise ValueError(f"Agent '{agent.name}' depends on unknown agent '{dep}'")
+        self.order = self._topo_order()
+
+    def __getitem__(self, name):
+        return self.agents[name]
+
+    def __contains__(self, name):
+        return name in self.agents
+
+    def _topo_order(self):
+        order, state = [], {}
+
+        def visit(name):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ValueError(f"Agent graph has a cycle through '{name}'")
+            state[name] = "visiting"
+            for dep in self.agents[name].deps:
+                visit(dep)
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.agents:
+            visit(name)
+        return order
+
+    def downstream(self, name):
+        # Every agent that directly or transitively reads `name`.
+        found = set()
+        for other in self.order:
+            if any(dep == name or dep in found for dep in self.agents[other].deps):
+                found.add(other)
+        return [n for n in self.order if n in found]
+
+    def run(self, call, context, targets=None, outputs=None, max_workers=4, on_event=None):
+        """Run `targets` (default: all agents) and return (outputs, errors).
+
+        `call(agent, prompt, progress)` performs the LLM request (passing
+        `agent.options`) and returns the text; it may call `progress(partial_text)`
+        from its worker thread while streaming. Answers of agents with a schema
+        are validated, an invalid one fails the agent. Agents outside `targets` must already be present in `outputs`.
+        `on_event(name, status, payload)` is always invoked from the calling
+        thread (status "partial" carries the streamed text so far), so it can
+        safely touch Streamlit elements.
+        """
+        targets = [n for n in self.order if targets is None or n in targets]
+        outputs = dict(outputs or {})
+        errors = {}
+        emit = on_event or (lambda *args: None)
+
+        partials = queue.SimpleQueue()
+        pending = list(targets)
+        running = {}   # future -> (name, deadline, started)
+        pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent")
+        try:
+            while pending or running:
+                for name in list(pending):
+                    agent = self.agents[name]
+                    active = {n for n, _, _ in running.values()}
+                    blocked = [d for d in agent.deps if d in errors]
+                    missing = [d for d in agent.deps
+                               if d not in outputs and d not in pending and d not in active]
+                    if blocked or missing:
+                        pending.remove(name)
+                        reason = f"upstream {', '.join(blocked)} failed" if blocked else \
+                            f"missing input from {', '.join(missing)}"
+                        errors[name] = RuntimeError(f"skipped: {reason}")
+                        emit(name, "skipped", errors[name])
+                    elif all(d in outputs for d in agent.deps):
+                        pending.remove(name)
+                        prompt = agent.build_prompt(context, outputs)
+                        started = time.perf_counter()
+                        progress = lambda text, name=name: partials.put((name, text))
+                        future = pool.submit(call, agent, prompt, progress)
+                        running[future] = (name, started + agent.timeout, started)
+                        emit(name, "running", None)
+
+                if not running:
+                    continue
+                done, _ = wait(list(running), timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                self._drain(partials, {n for n, _, _ in running.values()}, emit)
+                now = time.perf_counter()
+                for future in done:
+                    name, _, started = running.pop(future)
+                    try:
+                        text = future.result()
+                        self.agents[name].parse(text)
+                        outputs[name] = text
+                    except Exception as e:
+                        errors[name] = e
+                        emit(name, "failed", e)
+                    else:
+                        emit(name, "done", now - started)
+                for future, (name, deadline, _) in list(running.items()):
+                    if now > deadline:
+                        # The worker thread cannot be killed; we just stop waiting for it.
+                        running.pop(future)
+                        errors[name] = AgentTimeout(f"{name} timed out after {self.agents[name].timeout}s")
+                        emit(name, "timeout", errors[name])
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return outputs, errors
+
+    @staticmethod
+    def _drain(partials, active, emit):
+        # Only the latest partial text per agent matters.
+        latest = {}
+        while True:
+            try:
+                name, text = partials.get_nowait()
+            except queue.Empty:
+                break
+            latest[name] = text
+        for name, text in latest.items():
+            if name in active:
+                emit(name, "partial", text)
+
+
+# --- OUTPUT VERSIONS ---
+class OutputVersions:
+    """Version stamps for agent outputs kept across reruns. Each output records
+    the versions of the dependencies it was computed from, so replacing one
+    output (e.g. a retune) makes everything downstream of it stale."""
+
+    def __init__(self):
+        self.versions = {}   # name -> version of its current output
+        self.inputs = {}     # name -> {dep: version it was computed from}
+
+    def stamp(self, dag, name):
+        self.versions[name] = self.versions.get(name, 0) + 1
+        self.inputs[name] = {dep: self.versions.get(dep, 0) for dep in dag[name].deps}
+
+    def stale(self, dag):
+        # Outputs built on an older dependency, or on one that is itself stale.
+        found = []
+        for name in dag.order:
+            if name not in self.versions:
+                continue
+            used = self.inputs.get(name, {})
+            if any(dep in found or used.get(dep) != self.versions.get(dep, 0) for dep in dag[name].deps):
+                found.append(name)
+        return found
+
+    def clear(self):
+        self.versions.clear()
+        self.inputs.clear()
+
+
+def retune_prompt(agent, context, outputs, original, feedback):
+    # Same prompt as the agent's own run (project data, upstream outputs), plus
+    # its previous answer and the user's feedback.
+    return f"{agent.build_prompt(context, outputs)}\nORIGINAL: {agent.summarize(original)}\nFEEDBACK: {feedback}"
+
+
+# --- DESIGN STUDIO PIPELINE ---
+def _with_addition(prompt, context):
+    extra = (context.get("extra") or "").strip()
+    return f"{prompt}\nUSER ADDITION: {extra}" if extra else prompt
+
+
+def _with_electrical(prompt, context):
+    # Current draw / bank sag from the local electrical solver, when available
+    electrical = context.get("electrical")
+    return f"{prompt}\nELECTRICAL (computed, use these numbers): {electrical}" if electrical else prompt
+
+
+def _with_thermal(prompt, context):
+    # Coil / motor temperatures from the local thermal simulation, when available
+    thermal = context.get("thermal")
+    return f"{prompt}\nCOIL THERMAL (simulated, use these numbers): {thermal}" if thermal else prompt
+
+
+def _with_guides(prompt, context):
+    # Wiring guide passages matching the user's notes / addition, when any
+    guides = context.get("guides")
+    return f"{prompt}\nINSTALL GUIDE (from our wiring guide, answer install questions from it): {guides}" if guides else prompt
+
+
+def _json_answer(prompt, schema):
+    # The prompts still describe a markdown layout; JSON mode overrides it.
+    if not schema:
+        return prompt
+    return f"{prompt}\nANSWER FORMAT: one JSON object following the response schema, no markdown."
+
+
+def design_studio_dag(prompts):
+    architect = _json_answer(prompts.get("ARCHITECT_PROMPT"), prompts.get("ARCHITECT_SCHEMA"))
+    structural = _json_answer(prompts.get("STRUCTURAL_PROMPT"), prompts.get("STRUCTURAL_SCHEMA"))
+    thermal = _json_answer(prompts.get("THERMAL_PROMPT"), prompts.get("THERMAL_SCHEMA"))
+    core = prompts.get("CORE_PROMPT")
+    dag = AgentDAG([
+        Agent("architect",
+              lambda ctx, out: _with_guides(_with_addition(f"{architect}\nDATA: {ctx['proj_data']}", ctx), ctx),
+              label="📐 Architect is calculating box volume...", schema=prompts.get("ARCHITECT_SCHEMA")),
+        Agent("structural",
+              lambda ctx, out: f"{structural}\nDATA: {ctx['proj_data']}\nARCHITECT: {brief(out, 'architect')}",
+              deps=["architect"], label="🔨 Structural is analyzing flex...", schema=prompts.get("STRUCTURAL_SCHEMA")),
+        Agent("thermal",
+              lambda ctx, out: _with_guides(_with_thermal(_with_electrical(
+                  f"{thermal}\nDATA: {ctx['proj_data']}\nARCHITECT: {brief(out, 'architect')}", ctx), ctx), ctx),
+              deps=["architect"], label="🔥 Thermal is calculating heat soak...", schema=prompts.get("THERMAL_SCHEMA")),
+        Agent("core",
+              lambda ctx, out: (f"{core}\nDATA: ARCH: {brief(out, 'architect')}\n"
+                                f"STRUCT: {brief(out, 'structural')}\nTHERM: {brief(out, 'thermal')}"),
+              deps=["architect", "structural", "thermal"], label="🏁 Synthesizing Master Plan..."),
+    ])
+    # Upstream answers as downstream prompts see them (compact structured fields)
+    brief = lambda out, name: dag[name].summarize(out[name])
+    return dag
@@ -0,0 +1,204 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .llm import ModelRegistry, fake_factory, gemini_factory
+from .metrics import Metrics
+from .ratelimit import DEFAULT_RPM, DEFAULT_TPM, RateLimiter
+from .pipeline import default_dag, design_context, load_catalogs, load_guides, load_json, run_design
+from .response_cache import ResponseCache
+
+# --- HEADLESS BATCH RUNNER ---
+# Runs the Design Studio pipeline (Architect -> Structural/Thermal -> Core) over
+# a JSONL file of build specs:
+#
+#   python -m alphaaudio.batch builds.jsonl -o results.jsonl --concurrency 4
+#   python -m alphaaudio.batch builds.jsonl -o results.jsonl --fake   # no API calls
+#
+# Each input line is a JSON object with any of the pipeline.DEFAULT_SPEC fields
+# plus an optional "id". A result line is appended as soon as its build is done,
+# so rerunning the same command skips builds that already succeeded.
+
+DEFAULT_CONCURRENCY = 4
+PIPELINE = ["architect", "structural", "thermal", "core"]
+
+
+def now():
+    return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def read_specs(path):
+    specs = []
+    with open(path, "r") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                spec = json.loads(line)
+            except ValueError as e:
+                raise SystemExit(f"{path}:{line_no}: invalid JSON ({e})")
+            spec.setdefault("id", f"line-{line_no}")
+            specs.append(spec)
+    return specs
+
+
+def completed_ids(path):
+    # Ids that already have a successful result; failed builds are retried.
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue   # half-written last line of an interrupted run
+            if record.get("status") == "ok":
+                done.add(record.get("id"))
+    return done
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))]
+
+
+class BatchRunner:
+    def __init__(self, model, dag, catalogs, output_path, concurrency=DEFAULT_CONCURRENCY, cache=False,
+                 guide_index=None):
+        self.model = model
+        self.dag = dag
+        self.catalogs = catalogs
+        self.guide_index = guide_index
+        self.output_path = output_path
+        self.concurrency = concurrency
+        self.cache = cache
+        self.stage_times = {name: [] for name in PIPELINE}
+        self.counts = {"ok": 0, "failed": 0}
+        self._lock = threading.Lock()
+
+    def run_one(self, spec):
+        started = time.perf_counter()
+        outputs, errors, timings = run_design(self.model, self.dag, design_context(self.catalogs, spec, self.guide_index),
+                                              targets=PIPELINE, cache=self.cache)
+        return {
+            "id": spec["id"],
+            "status": "failed" if errors else "ok",
+            "finished": now(),
+            "elapsed": round(time.perf_counter() - started, 3),
+            "timings": {k: round(v, 3) for k, v in timings.items()},
+            "input": spec,
+            "outputs": outputs,
+            "errors": {k: str(v) for k, v in errors.items()},
+        }
+
+    def _write(self, out, record):
+        with self._lock:
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            self.counts[record["status"]] += 1
+            for name, seconds in record["timings"].items():
+                self.stage_times.setdefault(name, []).append(seconds)
+
+    def run(self, specs, on_result=None):
+        pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="build")
+        try:
+            with open(self.output_path, "a+") as out:
+                if out.tell():
+                    out.seek(out.tell() - 1)
+                    if out.read(1) != "\n":
+                        out.write("\n")   # close the torn line of an interrupted run
+                # Submit lazily so at most `concurrency` builds are in flight.
+                queue, running = list(specs), {}
+                while queue or running:
+                    while queue and len(running) < self.concurrency:
+                        spec = queue.pop(0)
+                        running[pool.submit(self.run_one, spec)] = spec
+                    done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        spec = running.pop(future)
+                        try:
+                            record = future.result()
+                        except Exception as e:
+                            record = {"id": spec["id"], "status": "failed", "finished": now(), "elapsed": None,
+                                      "timings": {}, "input": spec, "outputs": {}, "errors": {"pipeline": str(e)}}
+                        self._write(out, record)
+                        if on_result:
+                            on_result(record)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def report(self, elapsed):
+        total = self.counts["ok"] + self.counts["failed"]
+        lines = [f"{total} builds in {elapsed:.1f}s ({total / elapsed * 60 if elapsed else 0:.1f} builds/min), "
+                 f"{self.counts['ok']} ok, {self.counts['failed']} failed"]
+        for name, values in self.stage_times.items():
+            if values:
+                lines.append(f"  {name:<11} n={len(values):<4} mean {sum(values) / len(values):6.2f}s  "
+                             f"p50 {percentile(values, 50):6.2f}s  p95 {percentile(values, 95):6.2f}s  "
+                             f"max {max(values):6.2f}s")
+        return "\n".join(lines)
+
+
+def build_model(args):
+    limiter = RateLimiter(rpm=args.rpm, tpm=args.tpm)
+    metrics = Metrics(export_path=args.metrics_file)
+    if args.fake:
+        return ModelRegistry(["fake-model"], fake_factory(args.fake_latency), limiter=limiter, metrics=metrics)
+    api_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
+    if not api_key:
+        raise SystemExit("Set GEMINI_API_KEY (or GOOGLE_API_KEY), or use --fake")
+    models = load_json(os.path.join(args.data_dir, "models.json"), ["gemini-1.5-flash"])
+    return ModelRegistry(models, gemini_factory(api_key), cache=ResponseCache(args.cache_path, data_dir=args.data_dir), limiter=limiter,
+                         metrics=metrics)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m alphaaudio.batch",
+                                     description="Run the Design Studio pipeline over a JSONL file of builds.")
+    parser.add_argument("input", help="JSONL build specs, one object per line")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="JSONL results, appended (default: %(default)s)")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="builds in flight at once (default: %(default)s)")
+    parser.add_argument("--data-dir", default=".", help="directory with the *_db.json and prompt files")
+    parser.add_argument("--cache", action="store_true", help="reuse cached answers for identical prompts")
+    parser.add_argument("--cache-path", default=".cache/llm_responses.sqlite")
+    parser.add_argument("--rpm", type=int, default=DEFAULT_RPM, help="requests/min quota (default: %(default)s)")
+    parser.add_argument("--tpm", type=int, default=DEFAULT_TPM, help="tokens/min quota (default: %(default)s)")
+    parser.add_argument("--metrics-file", help="write per-agent LLM metrics here in Prometheus text format")
+    parser.add_argument("--fake", action="store_true", help="use the offline fake model")
+    parser.add_argument("--fake-latency", type=float, default=0.2, help="seconds per fake answer")
+    args = parser.parse_args(argv)
+
+    specs = read_specs(args.input)
+    done = completed_ids(args.output)
+    todo = [s for s in specs if s["id"] not in done]
+    print(f"{len(specs)} builds, {len(specs) - len(todo)} already done, {len(todo)} to run", file=sys.stderr)
+
+    runner = BatchRunner(build_model(args), default_dag(args.data_dir), load_catalogs(args.data_dir),
+                         args.output, max(1, args.concurrency), cache=args.cache,
+                         guide_index=load_guides(args.data_dir))
+    progress = lambda r: print(f"[{r['status']}] {r['id']} ({r['elapsed']}s)", file=sys.stderr)
+    started = time.perf_counter()
+    try:
+        runner.run(todo, on_result=progress)
+    except KeyboardInterrupt:
+        print("Interrupted: rerun the same command to resume.", file=sys.stderr)
+        print(runner.report(time.perf_counter() - started))
+        return 130
+    print(runner.report(time.perf_counter() - started))
+    print(f"  upstream: {runner.model.flow_report()}")
+    if args.metrics_file:
+        print(f"  metrics: {runner.model.metrics.export()}")
+    return 1 if runner.counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
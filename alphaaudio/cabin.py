@@ -0,0 +1,177 @@
+import re
+
+import numpy as np
+
+from . import enclosure
+from .resolver import Match, Resolution, TrigramIndex, normalize, trigrams
+
+# --- CABIN GAIN / IN-CAR SPL ---
+# A car is a small, leaky pressure vessel: below the frequency whose half
+# wavelength spans the longest interior dimension, the pressure rises at
+# 12 dB/octave until the cabin leaks, where the gain levels off. That transfer
+# function is added to the 1 m half-space curves of the enclosure solver, with
+# the drivers summed coherently, each curve cut to xmax and passed through the
+# subsonic filter. Everything is (builds, frequencies), so a whole Build Wars
+# field is predicted in one enclosure solve.
+#
+# Interior dimensions come from the small table below, matched on the free-text
+# "Vehicle Model" (longest keyword wins, then a fuzzy match of each word for
+# typos, then a compact sedan).
+
+C = enclosure.C
+CABIN_LEAK_HZ = 12.0     # below this the cabin leaks and the gain stops rising
+SUBSONIC_ORDER = 4       # 24 dB/octave subsonic filter
+DEFAULT_VEHICLE = "sedan"
+RUNNER_UP = 0.9          # score of exact keywords shorter than the one used
+
+# keyword -> interior length, width, height (m), seats to the rear glass / tailgate
+VEHICLES = {
+    # body styles (fallbacks, a model name wins over them)
+    "sedan": (2.6, 1.45, 1.15),
+    "coupe": (2.2, 1.45, 1.10),
+    "hatchback": (2.4, 1.40, 1.20),
+    "wagon": (3.0, 1.45, 1.20),
+    "suv": (3.2, 1.55, 1.25),
+    "pickup": (2.0, 1.60, 1.20),
+    "truck": (2.0, 1.60, 1.20),
+    "regular cab": (1.3, 1.60, 1.15),
+    "van": (3.6, 1.65, 1.30),
+    # models
+    "civic": (2.6, 1.45, 1.12),
+    "corolla": (2.5, 1.42, 1.12),
+    "jetta": (2.6, 1.45, 1.13),
+    "golf": (2.4, 1.42, 1.18),
+    "mazda3": (2.5, 1.42, 1.12),
+    "elantra": (2.6, 1.45, 1.12),
+    "accord": (2.8, 1.50, 1.15),
+    "camry": (2.8, 1.50, 1.15),
+    "altima": (2.8, 1.50, 1.14),
+    "impala": (2.9, 1.55, 1.15),
+    "charger": (2.9, 1.55, 1.12),
+    "crown victoria": (3.0, 1.60, 1.15),
+    "model 3": (2.7, 1.48, 1.12),
+    "mustang": (2.1, 1.45, 1.08),
+    "camaro": (2.1, 1.45, 1.05),
+    "challenger": (2.3, 1.50, 1.10),
+    "miata": (1.2, 1.30, 1.00),
+    "cr-v": (3.0, 1.50, 1.25),
+    "rav4": (3.0, 1.50, 1.25),
+    "explorer": (3.4, 1.55, 1.25),
+    "grand cherokee": (3.2, 1.55, 1.22),
+    "wrangler": (2.6, 1.45, 1.30),
+    "4runner": (3.3, 1.50, 1.25),
+    "tahoe": (3.5, 1.65, 1.28),
+    "escalade": (3.5, 1.65, 1.28),
+    "suburban": (3.9, 1.65, 1.28),
+    "f-150": (2.0, 1.65, 1.22),
+    "silverado": (2.0, 1.65, 1.22),
+    "sierra": (2.0, 1.65, 1.22),
+    "ram": (2.1, 1.65, 1.22),
+    "tundra": (2.1, 1.65, 1.22),
+    "tacoma": (1.9, 1.50, 1.15),
+    "odyssey": (3.6, 1.65, 1.30),
+    "sienna": (3.6, 1.65, 1.30),
+    "caravan": (3.5, 1.60, 1.28),
+    "transit": (4.2, 1.75, 1.60),
+    "sprinter": (4.5, 1.75, 1.70),
+}
+
+
+BODY_STYLES = {"sedan", "coupe", "hatchback", "wagon", "suv", "pickup", "truck", "regular cab", "van"}
+VEHICLE_INDEX = TrigramIndex(VEHICLES)
+
+
+def resolve_vehicle(text):
+    # Resolution over the table keys: exact keywords score 1, else per-word fuzzy matches
+    words = " ".join(re.findall(r"[a-z0-9-]+", str(text or "").lower()))
+    found = [key for key in VEHICLES if re.search(rf"(?<![a-z0-9-]){re.escape(key)}(?![a-z0-9-])", words)]
+    if found:
+        found.sort(key=lambda key: (len(key), key not in BODY_STYLES), reverse=True)
+        return Resolution(text, None, None, [Match(key, key, 1.0 if i == 0 else RUNNER_UP)
+                                             for i, key in enumerate(found)])
+    scores = {}
+    for word in words.split():
+        if len(word) >= 3 and not word.isdigit():
+            for i, score in VEHICLE_INDEX.search(word):
+                key = VEHICLE_INDEX.names[i]
+                scores[key] = max(score, scores.get(key, 0.0))
+    ranked = sorted(scores.items(), key=lambda kv: -kv[1])
+    return Resolution(text, None, None, [Match(key, key, score) for key, score in ranked[:3]])
+
+
+def replace_vehicle(text, key):
+    # "2010 hond civc" + "civic" -> "2010 hond civic": swap the word closest to the key
+    words = str(text or "").split()
+    if not words:
+        return key
+    grams = trigrams(key)
+    closest = max(range(len(words)), key=lambda i: len(trigrams(normalize(words[i])) & grams))
+    words[closest] = key.title() if key.isalpha() else key.upper()
+    return " ".join(words)
+
+
+def match_vehicle(text):
+    # (table key, (length, width, height)) for free-text like "2010 Honda Civic"
+    best = resolve_vehicle(text).best
+    key = best.record if best else DEFAULT_VEHICLE
+    return key, VEHICLES[key]
+
+
+def transition_frequency(length):
+    # First axial mode of the longest interior dimension
+    return C / (2 * np.asarray(length, dtype=float))
+
+
+def cabin_gain(freqs, transition, leak=CABIN_LEAK_HZ):
+    # dB: +12 dB/octave below `transition`, levelling off below `leak`
+    f = np.asarray(freqs, dtype=float)
+    ft = np.asarray(transition, dtype=float)[..., None]
+    return 10 * np.log10((1 + (ft / f) ** 4) / (1 + (leak / f) ** 4))
+
+
+class CabinResponse:
+    # Arrays are (builds,) unless noted; `spl` and `gain` are (builds, freqs).
+    __slots__ = ("labels", "quantities", "cars", "vehicles", "freqs", "transition", "gain", "spl",
+                 "peak", "peak_freq")
+
+    def at(self, freq, i=0):
+        return float(np.interp(freq, self.freqs, self.spl[i]))
+
+    def summary(self, i=0, at=None):
+        text = (f"{self.quantities[i]:.0f}x {self.labels[i]} in a {self.cars[i] or self.vehicles[i]} "
+                f"(cabin matched as '{self.vehicles[i]}', gain from {self.transition[i]:.0f} Hz): peak {self.peak[i]:.1f} dB at {self.peak_freq[i]:.0f} Hz")
+        if at is not None:
+            text += f", {self.at(at, i):.1f} dB at {at:.0f} Hz"
+        return text
+
+
+def in_car(design, quantities, cars, j=0):
+    """Cabin SPL of the tuning-`j` curves of an EnclosureDesign (one driver per
+    row, already at its power), `quantities` drivers of that row per car."""
+    freqs = design.freqs
+    quantities = np.broadcast_to(np.asarray(quantities, dtype=float).reshape(-1), (len(design.labels),))
+    cars = list(cars) if not isinstance(cars, str) else [cars] * len(design.labels)
+    matched = [match_vehicle(car) for car in cars]
+    resp = CabinResponse()
+    resp.labels, resp.quantities, resp.cars, resp.freqs = design.labels, quantities, cars, freqs
+    resp.vehicles = [key for key, _ in matched]
+    resp.transition = transition_frequency([dims[0] for _, dims in matched])
+    resp.gain = cabin_gain(freqs, resp.transition)
+
+    # Over xmax the cone can't follow: the output stops where the excursion does
+    over_xmax = np.maximum(design.excursion[:, j] / design.xmax[:, :1], 1.0)
+    subsonic = design.subsonic[:, j, None]
+    hpf = 10 * np.log10(1 + (subsonic / freqs) ** (2 * SUBSONIC_ORDER))
+    resp.spl = (design.spl[:, j] + 20 * np.log10(quantities)[:, None] - 20 * np.log10(over_xmax)
+                - hpf + resp.gain)
+    peak = resp.spl.argmax(axis=-1)
+    resp.peak = resp.spl.max(axis=-1)
+    resp.peak_freq = freqs[peak]
+    return resp
+
+
+def predict_builds(drivers, quantities, powers, cars, kind=enclosure.PORTED, freqs=enclosure.DEFAULT_FREQS):
+    """In-car SPL of whole builds: `drivers` (catalog records), how many of each,
+    watts per driver and the vehicle text. Each driver gets its own alignment."""
+    design = enclosure.solve(drivers, kind, power=powers, freqs=freqs)
+    return in_car(design, quantities, cars)
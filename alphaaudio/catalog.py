@@ -0,0 +1,284 @@
+import keyword
+from bisect import bisect_left, bisect_right
+
+from .resolver import DEFAULT_SUGGESTIONS, TrigramIndex, resolve
+
+# --- TYPED CATALOG ---
+# Gear tables as compact records (__slots__) with the indexes the app needs:
+# brand/model hash lookup, sorted numeric columns for bisect range queries and
+# per-value buckets for categorical columns, plus a trigram name index for
+# free-text lookups (built on first use). Built once per process, so filtering
+# never rescans the raw JSON on a rerun.
+
+NUMBER = (int, float)
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def _check(kind, name, value, expected):
+    if expected is NUMBER:
+        ok = isinstance(value, NUMBER) and not isinstance(value, bool)
+    else:
+        ok = isinstance(value, expected)
+    if not ok:
+        raise SchemaError(f"{kind}.{name}: expected {getattr(expected, '__name__', 'number')}, "
+                          f"got {type(value).__name__} ({value!r})")
+
+
+def _slot(name):
+    # Fields named like keywords ("class") are stored as "class_".
+    return name + "_" if keyword.iskeyword(name) else name
+
+
+def _slots(fields):
+    return tuple(_slot(name) for name in fields)
+
+
+class Record:
+    # FIELDS: name -> (type, required). Unknown keys are kept in `extra`.
+    FIELDS = {}
+    RANGE_FIELDS = ()       # numeric columns with a sorted index
+    BUCKET_FIELDS = ()      # categorical columns with a value -> rows index
+    __slots__ = ("extra",)
+
+    def __init__(self, row):
+        kind = type(self).__name__
+        if not isinstance(row, dict):
+            raise SchemaError(f"{kind}: expected an object, got {type(row).__name__}")
+        for name, (expected, required) in self.FIELDS.items():
+            value = row.get(name)
+            if value is None:
+                if required:
+                    raise SchemaError(f"{kind}.{name}: missing")
+            else:
+                _check(kind, name, value, expected)
+            setattr(self, _slot(name), value)
+        self.extra = {k: v for k, v in row.items() if k not in self.FIELDS}
+
+    def get(self, name, default=None):
+        # Same access style as the raw dict rows, so scoring code works on both.
+        if name in self.FIELDS:
+            value = getattr(self, _slot(name))
+        else:
+            value = self.extra.get(name)
+        return default if value is None else value
+
+    def __getitem__(self, name):
+        if name not in self.FIELDS and name not in self.extra:
+            raise KeyError(name)
+        return self.get(name)
+
+    def as_dict(self):
+        row = {name: self.get(name) for name in self.FIELDS if self.get(name) is not None}
+        row.update(self.extra)
+        return row
+
+    @property
+    def label(self):
+        return f"{self.brand} {self.model}"
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.label!r})"
+
+
+class Subwoofer(Record):
+    FIELDS = {
+        "brand": (str, True), "model": (str, True), "size": (str, True),
+        "rms": (NUMBER, True), "fs": (NUMBER, True), "xmax": (NUMBER, True),
+        "price": (NUMBER, True), "type": (str, False),
+        # Thiele-Small parameters for the enclosure solver (vas L, sd cm2, re ohm)
+        "qts": (NUMBER, False), "qes": (NUMBER, False), "vas": (NUMBER, False),
+        "sd": (NUMBER, False), "re": (NUMBER, False), "ts_estimated": (bool, False),
+    }
+    RANGE_FIELDS = ("price", "rms", "fs", "xmax")
+    BUCKET_FIELDS = ("size", "type")
+    __slots__ = _slots(FIELDS)
+
+
+class Amplifier(Record):
+    FIELDS = {
+        "brand": (str, True), "model": (str, True), "power_rms_per_ch": (NUMBER, True),
+        "bridged_power": (NUMBER, False), "impedance": (str, False), "class": (str, True),
+        "channels": (int, True), "price": (NUMBER, True), "notes": (str, False),
+    }
+    RANGE_FIELDS = ("price", "power_rms_per_ch", "channels")
+    BUCKET_FIELDS = ("class", "channels", "impedance")
+    __slots__ = _slots(FIELDS)
+
+    @property
+    def sub_power(self):
+        # Power available to a subwoofer bank: mono amps as rated, multichannel
+        # amps bridged when they can be.
+        if self.channels == 1:
+            return float(self.power_rms_per_ch)
+        return float(self.bridged_power or self.power_rms_per_ch * self.channels)
+
+
+class Battery(Record):
+    FIELDS = {
+        "brand": (str, True), "type": (str, True), "model": (str, True),
+        "voltage": (NUMBER, True), "capacity_Ah": (NUMBER, True), "chemistry": (str, True),
+        "max_discharge_A": (NUMBER, True), "size": (str, False), "notes": (str, False),
+    }
+    RANGE_FIELDS = ("voltage", "capacity_Ah", "max_discharge_A")
+    BUCKET_FIELDS = ("type", "chemistry")
+    __slots__ = _slots(FIELDS)
+
+
+class Alternator(Record):
+    FIELDS = {
+        "brand": (str, True), "model": (str, True), "amperage": (NUMBER, True),
+        "voltage": (NUMBER, True), "notes": (str, False),
+    }
+    RANGE_FIELDS = ("amperage", "voltage")
+    __slots__ = _slots(FIELDS)
+
+
+class Headunit(Record):
+    FIELDS = {
+        "brand": (str, True), "model": (str, True), "preout_voltage": (NUMBER, True),
+        "clipping_point_v": (NUMBER, False), "chassis_type": (str, True), "eq_bands": (int, False),
+        "internal_eq": (bool, True), "floating": (bool, False), "external": (bool, False),
+        "custom": (bool, False), "features": (list, False), "notes": (str, False),
+    }
+    RANGE_FIELDS = ("preout_voltage", "eq_bands")
+    BUCKET_FIELDS = ("chassis_type", "internal_eq")
+    __slots__ = _slots(FIELDS)
+
+
+class Processor(Record):
+    FIELDS = {
+        "brand": (str, True), "model": (str, True), "input_topology": (str, True),
+        "channels_in": (int, True), "channels_out": (int, True), "active": (bool, True),
+        "passive": (bool, False), "tuning": (str, False), "features": (list, False),
+        "notes": (str, False),
+    }
+    RANGE_FIELDS = ("channels_in", "channels_out")
+    BUCKET_FIELDS = ("input_topology", "active")
+    __slots__ = _slots(FIELDS)
+
+
+def _norm(value):
+    return value.strip().lower() if isinstance(value, str) else value
+
+
+class Catalog:
+    def __init__(self, name, record_cls, rows):
+        self.name = name
+        self.record_cls = record_cls
+        self.records = []
+        self.rows = []          # the validated raw dicts, for st.dataframe and prompts
+        self.errors = []        # (row index, message) of rows rejected by the schema
+        for i, row in enumerate(rows or []):
+            try:
+                record = record_cls(row)
+            except SchemaError as e:
+                self.errors.append((i, str(e)))
+                continue
+            self.records.append(record)
+            self.rows.append(row)
+        self._build_indexes()
+
+    # --- INDEXES ---
+    def _build_indexes(self):
+        self._by_key = {}
+        self._by_brand = {}
+        for i, r in enumerate(self.records):
+            self._by_key.setdefault((_norm(r.brand), _norm(r.model)), i)
+            self._by_brand.setdefault(_norm(r.brand), []).append(i)
+        self._sorted = {}
+        for field in self.record_cls.RANGE_FIELDS:
+            pairs = sorted((r.get(field), i) for i, r in enumerate(self.records) if r.get(field) is not None)
+            self._sorted[field] = ([v for v, _ in pairs], [i for _, i in pairs])
+        self._buckets = {}
+        for field in self.record_cls.BUCKET_FIELDS:
+            buckets = self._buckets[field] = {}
+            for i, r in enumerate(self.records):
+                buckets.setdefault(_norm(r.get(field)), []).append(i)
+        self._names = None
+
+    @property
+    def names(self):
+        # Trigram index of "brand model" labels, built by the first free-text lookup
+        if self._names is None:
+            self._names = TrigramIndex([r.label for r in self.records])
+        return self._names
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    # --- LOOKUPS ---
+    def lookup(self, brand, model):
+        i = self._by_key.get((_norm(brand), _norm(model)))
+        return None if i is None else self.records[i]
+
+    def resolve(self, text, k=DEFAULT_SUGGESTIONS):
+        # Free-text part ("2x Sundown Zv6 15") -> Resolution with scored matches
+        return resolve(self.names, self.records, text, k=k)
+
+    def by_brand(self, brand):
+        return [self.records[i] for i in self._by_brand.get(_norm(brand), [])]
+
+    def bucket_values(self, field):
+        return list(self._buckets[field])
+
+    def _range_ids(self, field, lo, hi):
+        keys, ids = self._sorted[field]
+        start = 0 if lo is None else bisect_left(keys, lo)
+        stop = len(keys) if hi is None else bisect_right(keys, hi)
+        return ids[start:stop]
+
+    def range(self, field, lo=None, hi=None):
+        # Rows with lo <= field <= hi, in ascending field order.
+        return [self.records[i] for i in self._range_ids(field, lo, hi)]
+
+    def filter(self, ranges=None, equals=None):
+        """Rows matching every range (field -> (lo, hi), None = open) and every
+        equality (field -> value or set of values), in catalog order."""
+        id_sets = []
+        for field, (lo, hi) in (ranges or {}).items():
+            if lo is None and hi is None:
+                continue
+            id_sets.append(set(self._range_ids(field, lo, hi)))
+        for field, wanted in (equals or {}).items():
+            values = wanted if isinstance(wanted, (set, frozenset, list, tuple)) else [wanted]
+            buckets = self._buckets[field]
+            id_sets.append({i for v in values for i in buckets.get(_norm(v), [])})
+        if not id_sets:
+            return list(self.records)
+        id_sets.sort(key=len)
+        ids = id_sets[0].intersection(*id_sets[1:])
+        return [self.records[i] for i in sorted(ids)]
+
+
+RECORD_TYPES = {"subwoofers": Subwoofer, "amplifiers": Amplifier, "batteries": Battery,
+                "alternators": Alternator, "headunits": Headunit, "processors": Processor}
+
+
+class Catalogs:
+    __slots__ = ("subwoofers", "amplifiers", "batteries", "alternators", "headunits", "processors")
+
+    def __init__(self, sub_db, amp_db, battery_electrical_db, headunits_processors_db):
+        self.reload("subwoofers", sub_db)
+        self.reload("amplifiers", amp_db)
+        self.reload("batteries", battery_electrical_db.get("batteries", []))
+        self.reload("alternators", battery_electrical_db.get("alternators", []))
+        self.reload("headunits", headunits_processors_db.get("headunits", []))
+        self.reload("processors", headunits_processors_db.get("processors", []))
+
+    def reload(self, name, rows):
+        # Rebuild one catalog (records and indexes) in place, the others are untouched
+        catalog = Catalog(name, RECORD_TYPES[name], rows)
+        setattr(self, name, catalog)
+        return catalog
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self.__slots__)
+
+    def errors(self):
+        return [(c.name, i, msg) for c in self for i, msg in c.errors]
@@ -0,0 +1,174 @@
+import os
+from functools import reduce
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .catalog import NUMBER
+
+# --- COLUMNAR CATALOG FILES ---
+# Each catalog's validated rows compiled to an uncompressed Arrow IPC file, read
+# through a memory map: opening one reads its footer, and only the columns a
+# query or a page actually uses are paged in. The Gear Lab tables search, sort
+# and slice here on the server, so a rerun sends the browser one page instead of
+# the whole catalog. A file records the (mtime, size) of the JSON it was compiled
+# from and is recompiled when that changes (or by tools/build_catalogs.py).
+
+FORMAT = 1                       # bump when the column layout changes
+DEFAULT_DIR = ".cache/catalogs"
+SEARCH_COLUMNS = ("brand", "model")
+PAGE_SIZES = (25, 50, 100)
+FORMAT_KEY = b"alphaaudio.format"
+SOURCE_KEY = b"alphaaudio.source"
+
+# catalog name -> JSON file it is built from
+SOURCES = {
+    "subwoofers": "Subwoofer_db.json",
+    "amplifiers": "amplifiers_db.json",
+    "batteries": "battery_electrical_db.json",
+    "alternators": "battery_electrical_db.json",
+    "headunits": "headunits_processors_db.json",
+    "processors": "headunits_processors_db.json",
+}
+ARROW_TYPES = {str: pa.string(), int: pa.int64(), bool: pa.bool_(), list: pa.list_(pa.string())}
+
+
+def source_stamp(path):
+    # "mtime_ns:size" of a JSON file, None when it is missing
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{st.st_mtime_ns}:{st.st_size}"
+
+
+def _column(values, expected):
+    if expected is NUMBER:
+        return pa.array(values, type=pa.float64())
+    if expected is list:
+        values = [None if v is None else [str(x) for x in v] for v in values]
+    return pa.array(values, type=ARROW_TYPES[expected])
+
+
+def _extra_column(values):
+    # Keys outside the record schema: Arrow's own inference, text if the types are mixed
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def to_table(catalog, stamp=None):
+    """Arrow table of a Catalog's valid rows: the record fields in schema order,
+    then any extra keys in the order they first appear."""
+    fields = catalog.record_cls.FIELDS
+    extras = list(dict.fromkeys(k for row in catalog.rows for k in row if k not in fields))
+    names, arrays = [], []
+    for name, (expected, _) in fields.items():
+        names.append(name)
+        arrays.append(_column([row.get(name) for row in catalog.rows], expected))
+    for name in extras:
+        names.append(name)
+        arrays.append(_extra_column([row.get(name) for row in catalog.rows]))
+    metadata = {FORMAT_KEY: str(FORMAT), SOURCE_KEY: stamp or ""}
+    return pa.Table.from_arrays(arrays, names=names, metadata=metadata)
+
+
+def write_table(table, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def read_table(path):
+    # Zero-copy: the columns' buffers point into the mapped file
+    return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+class CatalogTable:
+    """A columnar catalog with server-side search, sort and paging."""
+    __slots__ = ("name", "table", "_last")
+
+    def __init__(self, name, table):
+        self.name, self.table = name, table
+        self._last = None         # (search, sort, descending) -> ids, so paging doesn't redo them
+
+    def __len__(self):
+        return self.table.num_rows
+
+    @property
+    def stamp(self):
+        return (self.table.schema.metadata or {}).get(SOURCE_KEY, b"").decode()
+
+    @property
+    def columns(self):
+        return self.table.column_names
+
+    @property
+    def sortable(self):
+        return [f.name for f in self.table.schema if not pa.types.is_list(f.type)]
+
+    def select(self, search="", sort=None, descending=False):
+        """Row ids matching `search` (each word in brand or model, any case),
+        ordered on `sort`; None for every row in catalog order."""
+        args = (search.strip().lower(), sort, descending)
+        last = self._last
+        if last is not None and last[0] == args:
+            return last[1]
+        ids = None
+        searched = [c for c in SEARCH_COLUMNS if c in self.table.column_names]
+        if search.split() and searched:
+            mask = None
+            for word in search.split():
+                hit = reduce(pc.or_, [pc.fill_null(pc.match_substring(self.table[c], word, ignore_case=True), False)
+                                      for c in searched])
+                mask = hit if mask is None else pc.and_(mask, hit)
+            ids = pc.indices_nonzero(mask)
+        if sort:
+            column = self.table[sort] if ids is None else pc.take(self.table[sort], ids)
+            order = pc.array_sort_indices(column, order="descending" if descending else "ascending",
+                                          null_placement="at_end")
+            ids = order if ids is None else pc.take(ids, order)
+        self._last = (args, ids)
+        return ids
+
+    def count(self, ids):
+        return self.table.num_rows if ids is None else len(ids)
+
+    def page(self, ids, page, page_size, columns=None):
+        # Rows page * page_size ... of a selection, only `columns` (default all)
+        table = self.table if columns is None else self.table.select(columns)
+        start = page * page_size
+        if ids is None:
+            return table.slice(start, page_size)
+        return table.take(ids[start:start + page_size])
+
+
+def load_table(catalog, source, directory=DEFAULT_DIR, force=False):
+    """The memory-mapped table of `catalog`, compiled again first when the file
+    is missing, unreadable or older than `source` (the JSON file)."""
+    path = os.path.join(directory, f"{catalog.name}.arrow")
+    stamp = source_stamp(source)
+    if not force and stamp is not None:
+        try:
+            table = CatalogTable(catalog.name, read_table(path))
+            metadata = table.table.schema.metadata or {}
+            if metadata.get(FORMAT_KEY) == str(FORMAT).encode() and table.stamp == stamp:
+                return table
+        except (OSError, pa.ArrowInvalid):
+            pass
+    table = to_table(catalog, stamp)
+    if stamp is not None:
+        try:
+            write_table(table, path)
+            table = read_table(path)
+        except OSError:
+            pass   # read-only checkout: serve the in-memory table
+    return CatalogTable(catalog.name, table)
+
+
+def load_tables(catalogs, data_dir=".", directory=DEFAULT_DIR, force=False):
+    # {name: CatalogTable} for every catalog of a Catalogs
+    return {c.name: load_table(c, os.path.join(data_dir, SOURCES[c.name]), directory, force) for c in catalogs}
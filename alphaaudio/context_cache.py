@@ -0,0 +1,211 @@
+import datetime
+import hashlib
+import logging
+import threading
+import time
+
+from alphaaudio.ratelimit import SingleFlight
+from alphaaudio.serialize import Table, estimate_tokens, render_tables, row_label
+
+# --- CACHED PROMPT PREFIXES ---
+# Recommender prompts are a stable prefix (role prompt + catalog snapshot) and a
+# short per-request suffix (USER REQS, shortlist, computed numbers). The prefix is
+# registered once per model with the API's cached-content mechanism, and later
+# calls send only the suffix plus the handle, so the catalog is neither re-uploaded
+# nor billed at the full input rate. A prefix is keyed by its content hash: a new
+# catalog version gets a new handle and the old one is deleted. Prefixes under the
+# API minimum, models without caching and failed registrations fall back to the
+# full text, so a prompt always works with or without a cache. A catalog too small
+# to cache is not put in the prefix at all: only its shortlisted rows are sent.
+
+DEFAULT_TTL = 3600           # seconds an upstream cached prefix lives
+REFRESH_MARGIN = 60          # re-register this long before it expires
+MIN_CACHE_TOKENS = 1024      # the API refuses to cache shorter prefixes
+FAILURE_COOLDOWN = 600       # seconds before retrying a prefix whose registration failed
+
+logger = logging.getLogger(__name__)
+
+
+class Prompt:
+    """Prompt text split into a cacheable prefix and a per-request suffix.
+    str(prompt) is the full text (response cache keys, token estimates)."""
+    __slots__ = ("prefix", "suffix", "name")
+
+    def __init__(self, prefix, suffix, name=None):
+        self.prefix, self.suffix = prefix, suffix
+        self.name = name          # stable id of the prefix slot ("subwoofer_recommender")
+
+    def __str__(self):
+        return self.prefix + self.suffix
+
+    @property
+    def key(self):
+        return hashlib.sha256(self.prefix.encode("utf-8")).hexdigest()[:16]
+
+
+def catalog_prompt(role, snapshots, reqs, shortlists=(), extra="", name=None, min_tokens=MIN_CACHE_TOKENS):
+    """Recommender prompt. When `role` and the catalog snapshots are big enough to
+    cache they are the prefix, and the suffix names the shortlisted rows (best
+    first) and carries only those the snapshots left out. A smaller catalog would
+    be sent whole on every request, so the prefix is just `role` and the suffix
+    carries the shortlisted rows themselves. USER REQS and `extra` (computed
+    numbers) are always in the suffix."""
+    prefix = f"{role}\n\nDATABASE:\n" + "\n\n".join(snap.text for snap in snapshots)
+    cached = estimate_tokens(prefix) >= min_tokens
+    by_name = {snap.name: snap for snap in snapshots}
+    lines, tables = [f"USER REQS: {reqs}"], []
+    for shortlist in shortlists:
+        snap = by_name.pop(shortlist.label)
+        if not cached:
+            tables.append(Table(f"{shortlist.label.title()} shortlist (local pre-filter, best first)",
+                                shortlist.rows, snap.columns))
+            continue
+        lines.append(f"SHORTLIST {shortlist.label} (local pre-filter, best first): "
+                     + "; ".join(row_label(r) for r in shortlist.rows))
+        missing = [r for r in shortlist.rows if row_label(r) not in snap.labels]
+        if missing:
+            tables.append(Table(f"{shortlist.label.title()} not in the DATABASE above", missing, snap.columns))
+    if not cached:
+        prefix = role
+        # Catalogs without a shortlist go in whole
+        lines.append("DATABASE:")
+        lines += [snap.text for snap in by_name.values()]
+    if tables:
+        lines.append(render_tables(tables, 0)[0])
+    if extra:
+        lines.append(extra)
+    return Prompt(prefix, "\n\n" + "\n".join(lines), name)
+
+
+class CacheEntry:
+    __slots__ = ("key", "handle", "expires", "tokens")
+
+    def __init__(self, key, handle, expires, tokens):
+        self.key, self.handle, self.expires, self.tokens = key, handle, expires, tokens
+
+
+class ContextCache:
+    """Registered prefixes per (model, prompt slot). Subclasses talk to the
+    backend: _register(model name, prefix, ttl) -> handle, _bind(model, handle)
+    -> model that only needs the suffix, _release(handle)."""
+
+    def __init__(self, ttl=DEFAULT_TTL, min_tokens=MIN_CACHE_TOKENS):
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self.entries = {}         # (model name, slot) -> CacheEntry
+        self.hits = 0
+        self.registrations = 0
+        self.failures = 0
+        self.cached_tokens = 0    # prefix tokens sent by handle instead of as text
+        self._lock = threading.Lock()       # entries and counters only, never held upstream
+        self._flights = SingleFlight()      # one registration per (slot, prefix) at a time
+
+    def bind(self, model_name, model, prompt):
+        """`model` bound to the cached prefix of `prompt`, or None to send the
+        whole text (short prefix, caching unsupported or failing)."""
+        tokens = estimate_tokens(prompt.prefix)
+        if tokens < self.min_tokens:
+            return None
+        slot, key = (model_name, prompt.name or prompt.key), prompt.key
+        with self._lock:
+            handle, register = self._lookup(slot, key, time.time(), tokens)
+        if handle is not None:
+            return self._bind(model, handle)
+        if not register:
+            return None
+        # The upstream call runs outside the lock, so binds of other prefixes
+        # don't wait for it; binds of this prefix share it.
+        flight, leader = self._flights.begin((slot, key))
+        if not leader:
+            handle = SingleFlight.wait(flight)
+            if handle is not None:
+                with self._lock:
+                    self.hits += 1
+                    self.cached_tokens += tokens
+        else:
+            try:
+                handle = self._register_prefix(model_name, prompt.prefix, slot, key, tokens)
+            except BaseException as e:
+                self._flights.finish((slot, key), flight, error=e)
+                raise
+            self._flights.finish((slot, key), flight, result=handle)
+        return None if handle is None else self._bind(model, handle)
+
+    def _lookup(self, slot, key, now, tokens):
+        # Under the lock: (live handle or None, whether to register the prefix)
+        entry = self.entries.get(slot)
+        if entry and entry.key == key:
+            if entry.handle is None and now < entry.expires:
+                return None, False      # registration failed recently, send it inline
+            if entry.handle is not None and now < entry.expires - REFRESH_MARGIN:
+                self.hits += 1
+                self.cached_tokens += tokens
+                return entry.handle, False
+        # New catalog version, expiring handle or retry after a failure
+        return None, True
+
+    def _register_prefix(self, model_name, prefix, slot, key, tokens):
+        # Registers upstream, then publishes the handle and retires the slot's old one
+        try:
+            handle = self._register(model_name, prefix, self.ttl)
+        except Exception as e:
+            logger.warning("%s: prefix %s not cached (%s: %s), sending it inline",
+                           model_name, slot[1], type(e).__name__, e)
+            with self._lock:
+                self.failures += 1
+                self.entries[slot] = CacheEntry(key, None, time.time() + FAILURE_COOLDOWN, tokens)
+            return None
+        with self._lock:
+            entry = self.entries.get(slot)
+            stale = entry.handle if entry and entry.handle is not None else None
+            self.registrations += 1
+            self.cached_tokens += tokens
+            self.entries[slot] = CacheEntry(key, handle, time.time() + self.ttl, tokens)
+        logger.info("%s: cached %d-token prefix %s (%s)", model_name, tokens, slot[1], key)
+        if stale is not None:
+            self.release(stale)
+        return handle
+
+    def release(self, handle):
+        try:
+            self._release(handle)
+        except Exception as e:
+            logger.warning("could not delete cached prefix: %s: %s", type(e).__name__, e)
+
+    def clear(self):
+        with self._lock:
+            handles = [e.handle for e in self.entries.values() if e.handle is not None]
+            self.entries.clear()
+        for handle in handles:
+            self.release(handle)
+
+    def stats(self):
+        with self._lock:
+            live = [e for e in self.entries.values() if e.handle is not None]
+            return {"prefixes": len(live), "prefix_tokens": sum(e.tokens for e in live), "hits": self.hits,
+                    "registrations": self.registrations, "failures": self.failures,
+                    "cached_tokens": self.cached_tokens}
+
+    def _register(self, model_name, prefix, ttl):
+        raise NotImplementedError
+
+    def _bind(self, model, handle):
+        raise NotImplementedError
+
+    def _release(self, handle):
+        pass
+
+
+class GeminiContextCache(ContextCache):
+    # google.generativeai cached contents; the SDK is imported on first use
+    def _register(self, model_name, prefix, ttl):
+        from google.generativeai import caching
+        return caching.CachedContent.create(model=model_name, display_name="alphaaudio-catalog",
+                                            contents=[prefix], ttl=datetime.timedelta(seconds=ttl))
+
+    def _bind(self, model, handle):
+        import google.generativeai as genai
+        return genai.GenerativeModel.from_cached_content(cached_content=handle)
+
+    def _release(self, handle):
+        handle.delete()
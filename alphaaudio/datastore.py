@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from .schemas import SchemaError, validate
+
+# --- HOT-RELOADED DATA FILES ---
+# Every JSON file of the app is loaded, validated and cached on its own, along
+# with the (mtime, size) it had. refresh() is one stat() per file, so it can run
+# on every Streamlit rerun: only files whose stamp changed are read again. A file
+# that is missing, is not JSON or fails its schema keeps its last good version
+# (its default before the first good load) and reports the error. Subscribers
+# rebuild what depends on a file (its catalogs, the guide index...) when it
+# really changed, and only for that file.
+
+CHECK_INTERVAL = 1.0     # seconds between two stat() rounds (fragments rerun every second)
+
+# Shape of each file, in the schema subset of alphaaudio.schemas. Catalog rows are
+# checked one by one by the catalog layer, a bad row never rejects the file.
+ROWS = {"type": "array", "items": {"type": "object"}}
+SUBWOOFERS_SCHEMA = ROWS
+AMPLIFIERS_SCHEMA = ROWS
+BATTERY_ELECTRICAL_SCHEMA = {
+    "type": "object", "required": ["batteries", "alternators"],
+    "properties": {"batteries": ROWS, "alternators": ROWS, "wiring_guides": {
+        "type": "array", "items": {"type": "object", "required": ["topic", "details"]}}},
+}
+HEADUNITS_PROCESSORS_SCHEMA = {
+    "type": "object", "required": ["headunits", "processors"],
+    "properties": {"headunits": ROWS, "processors": ROWS},
+}
+MODELS_SCHEMA = {"type": "array", "minItems": 1, "items": {"type": "string"}}
+PROMPTS_SCHEMA = {
+    "type": "object",
+    "required": ["ARCHITECT_PROMPT", "STRUCTURAL_PROMPT", "THERMAL_PROMPT", "CORE_PROMPT",
+                 "RECOMMENDER_PROMPT", "COMPARISON_PROMPT"],
+}
+WIRING_GUIDE_SCHEMA = {
+    "type": "object", "required": ["wiring_guide"], "properties": {"wiring_guide": {"type": "object"}},
+}
+
+logger = logging.getLogger(__name__)
+
+
+class DataFile:
+    __slots__ = ("key", "path", "default", "schema", "value", "stamp", "version", "error", "loaded_at")
+
+    def __init__(self, key, path, default, schema=None):
+        self.key = key
+        self.path = path
+        self.default = default
+        self.schema = schema
+        self.value = default
+        self.stamp = None         # (mtime_ns, size) of the last read, good or not
+        self.version = 0          # bumped on every good reload
+        self.error = None         # why the current file content is not in use
+        self.loaded_at = None
+
+    def current_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def load(self, stamp):
+        """Read and validate the file. True if `value` changed."""
+        self.stamp = stamp
+        try:
+            if stamp is None:
+                raise OSError(f"{self.path} not found")
+            with open(self.path, "r") as f:
+                value = json.load(f)
+            if self.schema:
+                validate(value, self.schema, os.path.basename(self.path))
+        except (OSError, ValueError, SchemaError) as e:
+            self.error = f"{type(e).__name__}: {e}"
+            logger.warning("%s: %s, keeping the %s", self.path, self.error,
+                           "last good version" if self.version else "default")
+            return False
+        self.value, self.error, self.loaded_at = value, None, time.time()
+        self.version += 1
+        return True
+
+    def status(self):
+        return {"file": self.path, "version": self.version, "error": self.error,
+                "loaded": None if self.loaded_at is None else time.strftime("%H:%M:%S", time.localtime(self.loaded_at))}
+
+
+class DataStore:
+    """Independently cached JSON files with change subscriptions."""
+
+    def __init__(self, files, check_interval=CHECK_INTERVAL):
+        self.files = {f.key: f for f in files}
+        self.check_interval = check_interval
+        self.subscribers = {}     # name -> (file keys, callback(changed keys))
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        for f in self.files.values():
+            f.load(f.current_stamp())
+
+    def __getitem__(self, key):
+        return self.files[key].value
+
+    def version(self, key):
+        return self.files[key].version
+
+    def subscribe(self, name, keys, callback):
+        # Re-subscribing under the same name replaces the callback (module reloads)
+        self.subscribers[name] = (set(keys), callback)
+
+    def refresh(self, force=False):
+        """Reload the files whose mtime / size changed; returns the keys whose
+        content was replaced. Subscribers of those keys are called once each."""
+        now = time.monotonic()
+        if not force and now - self._checked < self.check_interval:
+            return []
+        with self._lock:
+            self._checked = now
+            changed = []
+            for key, f in self.files.items():
+                stamp = f.current_stamp()
+                if stamp != f.stamp and f.load(stamp):
+                    changed.append(key)
+            if changed:
+                logger.info("reloaded %s", ", ".join(self.files[k].path for k in changed))
+                for keys, callback in list(self.subscribers.values()):
+                    hit = [k for k in changed if k in keys]
+                    if hit:
+                        callback(hit)
+            return changed
+
+    def errors(self):
+        # (path, message) of files whose current content was rejected
+        return [(f.path, f.error) for f in self.files.values() if f.error]
+
+    def status(self):
+        return [f.status() for f in self.files.values()]
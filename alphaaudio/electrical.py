@@ -0,0 +1,130 @@
+import numpy as np
+
+# --- ELECTRICAL BUDGET SOLVER ---
+# Deterministic current / voltage-sag model behind the Battery recommender and
+# the Thermal agent. Every battery cell in the DB is expanded into series x
+# parallel banks and scored in one NumPy pass.
+
+SYSTEM_VOLTAGE = 14.4        # V, running vehicle
+MIN_BANK_VOLTAGE = 12.0      # resting bank voltage window we accept as "12 V system"
+MAX_BANK_VOLTAGE = 15.5
+MIN_LOAD_VOLTAGE = 11.5      # below this amps start clipping / protecting
+SAG_AT_MAX_DISCHARGE = 0.10  # a cell loses ~10% of its voltage at its rated max current
+MAX_PARALLEL = 8
+
+# Amplifier efficiency by topology (share of input power that reaches the speaker)
+AMP_EFFICIENCY = {"D": 0.80, "BD": 0.80, "H": 0.70, "G": 0.65, "AB": 0.55, "A/B": 0.55, "A": 0.25}
+DEFAULT_EFFICIENCY = 0.75
+
+# Average / peak power ratio by music style (Decaf keeps the amp near full tilt)
+DUTY_CYCLE = {
+    "Decaf (20-30Hz)": 0.50,
+    "Rap (30-40Hz)": 0.30,
+    "EDM (40Hz+)": 0.25,
+    "Metal": 0.20,
+}
+DEFAULT_DUTY = 0.30
+
+
+class ElectricalLoad:
+    __slots__ = ("rms", "amp_class", "efficiency", "duty", "peak_current", "average_current")
+
+    def __init__(self, rms, amp_class="D", music_style=None, voltage=SYSTEM_VOLTAGE):
+        self.rms = float(rms)
+        self.amp_class = (amp_class or "D").upper()
+        self.efficiency = AMP_EFFICIENCY.get(self.amp_class, DEFAULT_EFFICIENCY)
+        self.duty = DUTY_CYCLE.get(music_style, DEFAULT_DUTY)
+        self.peak_current = self.rms / (self.efficiency * voltage)
+        self.average_current = self.peak_current * self.duty
+
+
+def enumerate_banks(cells, load, alternator_amps, max_parallel=MAX_PARALLEL):
+    """Every series/parallel bank buildable from `cells`, best first.
+
+    Series counts are the one or two integers that put the bank's nominal voltage
+    in the 12-15.5 V window; parallel counts go from 1 to `max_parallel`. During a
+    burst the alternator carries `alternator_amps` and the bank the rest.
+    """
+    cells = list(cells)
+    if not cells:
+        return []
+    v = np.array([c.get("voltage", 0) for c in cells], dtype=float)[:, None, None]
+    ah = np.array([c.get("capacity_Ah", 0) for c in cells], dtype=float)[:, None, None]
+    i_max = np.array([c.get("max_discharge_A", 0) for c in cells], dtype=float)[:, None, None]
+
+    base = np.floor(SYSTEM_VOLTAGE / v)
+    series = np.maximum(np.concatenate([base, base + 1], axis=1), 1)        # (N, 2, 1)
+    parallel = np.arange(1, max_parallel + 1, dtype=float)[None, None, :]   # (1, 1, P)
+
+    r_cell = SAG_AT_MAX_DISCHARGE * v / np.maximum(i_max, 1e-9)
+    bank_v = series * v
+    bank_r = series * r_cell / parallel
+    bank_ah = ah * parallel
+    bank_i_max = i_max * parallel
+    battery_share = max(load.peak_current - alternator_amps, 0.0)
+    v_load = bank_v - battery_share * bank_r
+    sag = bank_v - v_load
+    in_window = (bank_v >= MIN_BANK_VOLTAGE) & (bank_v <= MAX_BANK_VOLTAGE)
+    viable = in_window & (bank_i_max >= battery_share) & (v_load >= MIN_LOAD_VOLTAGE)
+    deficit = max(load.average_current - alternator_amps, 0.0)
+    minutes = np.where(deficit > 0, 60 * bank_ah / max(deficit, 1e-9), np.inf)
+    cell_count = series * parallel
+
+    shape = np.broadcast_shapes(bank_v.shape, parallel.shape)
+    flat = lambda a: np.broadcast_to(a, shape).ravel()
+    cell_idx = flat(np.arange(len(cells))[:, None, None])
+    series, parallel, cell_count = flat(series), flat(parallel), flat(cell_count)
+    bank_v, bank_ah, bank_i_max = flat(bank_v), flat(bank_ah), flat(bank_i_max)
+    v_load, sag, minutes = flat(v_load), flat(sag), flat(minutes)
+    in_window, viable = flat(in_window), flat(viable)
+
+    # Viable first, then fewest cells, then least sag; banks outside the voltage
+    # window are dropped. Cells above 14.4 V get series 1 twice, hence `seen`.
+    order = np.lexsort((sag, cell_count, ~viable))
+    banks, seen = [], set()
+    for k in order[in_window[order]]:
+        key = (cell_idx[k], series[k], parallel[k])
+        if key in seen:
+            continue
+        seen.add(key)
+        cell = cells[cell_idx[k]]
+        banks.append({
+            "cell": f"{cell.get('brand')} {cell.get('model')}",
+            "chemistry": cell.get("chemistry"),
+            "config": f"{series[k]:.0f}S{parallel[k]:.0f}P",
+            "cells": int(cell_count[k]),
+            "nominal_v": round(float(bank_v[k]), 2),
+            "capacity_Ah": round(float(bank_ah[k]), 1),
+            "max_discharge_A": round(float(bank_i_max[k])),
+            "burst_v": round(float(v_load[k]), 2),
+            "sag_v": round(float(sag[k]), 2),
+            "minutes_at_avg": None if np.isinf(minutes[k]) else round(float(minutes[k]), 1),
+            "viable": bool(viable[k]),
+        })
+    return banks
+
+
+def smallest_banks(banks):
+    # First (smallest) viable bank per cell model, keeping the ranking order.
+    seen, out = set(), []
+    for bank in banks:
+        if bank["viable"] and bank["cell"] not in seen:
+            seen.add(bank["cell"])
+            out.append(bank)
+    return out
+
+
+def electrical_summary(load, banks, alternator_amps, top=3):
+    text = (f"Amplifier load {load.rms:,.0f} W RMS class {load.amp_class} "
+            f"({load.efficiency:.0%} efficient): peak draw {load.peak_current:,.0f} A at {SYSTEM_VOLTAGE} V, "
+            f"average ~{load.average_current:,.0f} A at {load.duty:.0%} duty. "
+            f"Alternator covers {alternator_amps:,.0f} A, battery bank must supply "
+            f"{max(load.peak_current - alternator_amps, 0):,.0f} A on bursts.")
+    viable = smallest_banks(banks)[:top]
+    if viable:
+        text += " Smallest viable banks: " + "; ".join(
+            f"{b['config']} {b['cell']} ({b['nominal_v']} V, {b['capacity_Ah']} Ah, sags to {b['burst_v']} V)"
+            for b in viable) + "."
+    else:
+        text += f" No bank from the database keeps the voltage above {MIN_LOAD_VOLTAGE} V: more alternator is required."
+    return text
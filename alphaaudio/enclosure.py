@@ -0,0 +1,226 @@
+import numpy as np
+
+# --- THIELE-SMALL ENCLOSURE SOLVER ---
+# Lumped-element (acoustic impedance analogy) model of a driver in a sealed box,
+# a ported box or a 4th order bandpass. Everything is broadcast over
+# (drivers, tunings, frequencies), so a whole catalog and a sweep of tunings are
+# solved in one NumPy pass.
+#
+# DB units: fs Hz, vas litres, sd cm^2, re ohm, xmax mm (one way). Internally SI.
+
+RHO = 1.184          # kg/m^3, air at 25 C
+C = 343.0            # m/s
+P_REF = 20e-6        # Pa
+QMS_DEFAULT = 9.0
+QL = 7.0             # box leakage losses
+END_CORRECTION = 1.463   # one flanged + one free port end, times the port radius
+M3_TO_FT3 = 35.3147
+M_TO_IN = 39.3701
+
+SEALED, PORTED, BANDPASS4 = "sealed", "ported", "bandpass4"
+KINDS = (SEALED, PORTED, BANDPASS4)
+
+DEFAULT_FREQS = np.geomspace(10, 200, 160)
+
+
+class DriverArrays:
+    # Column arrays for N drivers, shaped (N, 1, 1) so they broadcast against
+    # (tunings, frequencies).
+    __slots__ = ("labels", "fs", "qts", "qes", "qms", "vas", "sd", "re", "xmax", "rms",
+                 "cms", "mms", "bl", "rms_mech")
+
+    def __init__(self, drivers):
+        def col(name, default=np.nan, scale=1.0):
+            values = [d.get(name) for d in drivers]
+            return np.array([default if v is None else v for v in values], dtype=float)[:, None, None] * scale
+
+        self.labels = [f"{d.get('brand')} {d.get('model')}" for d in drivers]
+        self.fs = col("fs")
+        self.qts = col("qts", 0.5)
+        self.qes = col("qes", np.nan)
+        self.qes = np.where(np.isnan(self.qes), 1 / (1 / self.qts - 1 / QMS_DEFAULT), self.qes)
+        self.qms = 1 / (1 / self.qts - 1 / self.qes)
+        self.vas = col("vas", scale=1e-3)
+        self.sd = col("sd", scale=1e-4)
+        self.re = col("re", 3.4)
+        self.xmax = col("xmax", scale=1e-3)
+        self.rms = col("rms")
+        # Derived mechanical parameters
+        self.cms = self.vas / (RHO * C ** 2 * self.sd ** 2)
+        self.mms = 1 / ((2 * np.pi * self.fs) ** 2 * self.cms)
+        self.bl = np.sqrt(2 * np.pi * self.fs * self.mms * self.re / self.qes)
+        self.rms_mech = 2 * np.pi * self.fs * self.mms / self.qms
+
+    def __len__(self):
+        return len(self.labels)
+
+
+# --- ALIGNMENTS ---
+def sealed_alignment(ts, qtc=0.707):
+    ratio = np.maximum((qtc / ts.qts) ** 2 - 1, 0.05)
+    vb = ts.vas / ratio
+    fc = ts.fs * qtc / ts.qts
+    return vb, fc
+
+
+def ported_alignment(ts):
+    # QB3-style starting point; callers may override fb with their own tunings.
+    vb = 15 * ts.qts ** 2.87 * ts.vas
+    fb = 0.42 * ts.fs * ts.qts ** -0.9
+    return vb, fb
+
+
+def bandpass4_alignment(ts, s=0.7):
+    # Rear chamber sealed to Qtc = 0.707, front chamber sized from the ripple
+    # factor S and tuned to the rear chamber resonance.
+    vr, fc = sealed_alignment(ts)
+    vf = (2 * s * ts.qts) ** 2 * ts.vas
+    return vr, vf, fc
+
+
+def port_dimensions(ts, fb, vb, max_velocity=30.0):
+    # Area: keep peak air speed under `max_velocity` when the cone moves xmax at fb.
+    # Length: Helmholtz resonance of that area with the box, minus end correction.
+    peak_flow = ts.sd * ts.xmax * 2 * np.pi * fb
+    area = peak_flow / max_velocity
+    length = C ** 2 * area / ((2 * np.pi * fb) ** 2 * vb) - END_CORRECTION * np.sqrt(area / np.pi)
+    return area, np.maximum(length, 0.0)
+
+
+# --- RESPONSE ---
+def _driver_branch(ts, w, power):
+    e = np.sqrt(power * ts.re)                   # rms drive voltage into Re
+    p_g = e * ts.bl / (ts.re * ts.sd)
+    z_d = (ts.bl ** 2 / (ts.re * ts.sd ** 2) + ts.rms_mech / ts.sd ** 2
+           + 1j * w * ts.mms / ts.sd ** 2 + 1 / (1j * w * ts.cms * ts.sd ** 2))
+    return p_g, z_d
+
+
+def _port_mass(area, length):
+    return RHO * (length + END_CORRECTION * np.sqrt(area / np.pi)) / area
+
+
+def response(ts, kind, freqs=DEFAULT_FREQS, power=None, vb=None, fb=None, vf=None, area=None, length=None):
+    """Return (spl_db, excursion_m, port_velocity_m_s) at 1 m, half space.
+
+    Shapes broadcast as (drivers, tunings, freqs). `power` defaults to each
+    driver's rms rating; excursion and port velocity are peak values.
+    """
+    f = np.asarray(freqs, dtype=float).reshape(1, 1, -1)
+    w = 2 * np.pi * f
+    power = ts.rms if power is None else power
+    p_g, z_d = _driver_branch(ts, w, power)
+    if kind == SEALED:
+        z_b = 1 / (1j * w * vb / (RHO * C ** 2))
+        u_d = p_g / (z_d + z_b)
+        u_out = u_d
+        velocity = np.zeros(u_d.shape)
+    elif kind == PORTED:
+        c_ab = vb / (RHO * C ** 2)
+        m_ap = _port_mass(area, length)
+        r_al = QL / (2 * np.pi * fb * c_ab)
+        y_b = 1j * w * c_ab + 1 / (1j * w * m_ap) + 1 / r_al
+        u_d = p_g / (z_d + 1 / y_b)
+        p_b = u_d / y_b
+        u_out = p_b * (1j * w * c_ab + 1 / r_al)      # cone minus port flow
+        velocity = np.abs(p_b / (1j * w * m_ap)) / area
+    elif kind == BANDPASS4:
+        c_ar = vb / (RHO * C ** 2)
+        c_af = vf / (RHO * C ** 2)
+        m_ap = _port_mass(area, length)
+        r_al = QL / (2 * np.pi * fb * c_af)
+        y_f = 1j * w * c_af + 1 / (1j * w * m_ap) + 1 / r_al
+        u_d = p_g / (z_d + 1 / (1j * w * c_ar) + 1 / y_f)
+        u_out = (u_d / y_f) / (1j * w * m_ap)          # only the port radiates
+        velocity = np.abs(u_out) / area
+    else:
+        raise ValueError(f"Unknown enclosure kind '{kind}'")
+
+    pressure = RHO * w * np.abs(u_out) / (2 * np.pi)  # rms Pa at 1 m, half space
+    spl = 20 * np.log10(np.maximum(pressure, 1e-12) / P_REF)
+    excursion = np.sqrt(2) * np.abs(u_d) / (w * ts.sd)
+    return spl, excursion, np.sqrt(2) * velocity
+
+
+def f3(freqs, spl):
+    # Lowest frequency where the curve is within 3 dB of its passband maximum.
+    freqs = np.asarray(freqs)
+    above = spl >= spl.max(axis=-1, keepdims=True) - 3
+    return freqs[np.argmax(above, axis=-1)]
+
+
+# --- SOLVER ---
+class EnclosureDesign:
+    # Arrays are (drivers, tunings) unless noted; curves are (drivers, tunings, freqs).
+    __slots__ = ("kind", "labels", "freqs", "vb", "vf", "fb", "port_area", "port_length",
+                 "spl", "excursion", "port_velocity", "f3", "peak_excursion", "xmax", "subsonic")
+
+    def summary(self, i=0, j=0, quantity=1):
+        vb = float(self.vb[i, j])
+        text = (f"{self.kind}: net {vb * M3_TO_FT3:.2f} ft3 ({vb * 1e3:.0f} L) per driver"
+                f"{f', {vb * quantity * M3_TO_FT3:.2f} ft3 total' if quantity > 1 else ''}")
+        if self.kind == BANDPASS4:
+            text += f" rear + {float(self.vf[i, j]) * M3_TO_FT3:.2f} ft3 front"
+        if self.kind != SEALED:
+            text += (f", tuned {float(self.fb[i, j]):.1f} Hz, port {float(self.port_area[i, j]) * quantity * 1550:.0f} in2 "
+                     f"total x {float(self.port_length[i, j]) * M_TO_IN:.1f} in long, peak port speed "
+                     f"{float(self.port_velocity[i, j]):.0f} m/s, subsonic HPF {float(self.subsonic[i, j]):.0f} Hz")
+        text += (f", F3 {float(self.f3[i, j]):.0f} Hz, peak excursion "
+                 f"{float(self.peak_excursion[i, j]) * 1e3:.1f} mm (xmax {float(self.xmax[i, 0]) * 1e3:.0f} mm)")
+        return text
+
+
+def solve(drivers, kind, tunings=None, power=None, freqs=DEFAULT_FREQS, max_port_velocity=30.0):
+    """Design `kind` enclosures for every driver (dicts or catalog records).
+
+    `tunings` (Hz) sweeps the port tuning for ported/bandpass boxes; by default
+    each driver gets its own alignment tuning. `power` is watts per driver.
+    """
+    ts = drivers if isinstance(drivers, DriverArrays) else DriverArrays(list(drivers))
+    freqs = np.asarray(freqs, dtype=float)
+    power = None if power is None else np.asarray(power, dtype=float).reshape(-1, 1, 1)
+    design = EnclosureDesign()
+    design.kind, design.labels, design.freqs = kind, ts.labels, freqs
+    design.vf = design.port_area = design.port_length = None
+    tuning_axis = None if tunings is None else np.asarray(tunings, dtype=float).reshape(1, -1, 1)
+
+    if kind == SEALED:
+        vb, fc = sealed_alignment(ts)
+        design.fb = fc
+        spl, exc, vel = response(ts, SEALED, freqs, power, vb=vb)
+    elif kind in (PORTED, BANDPASS4):
+        if kind == PORTED:
+            vb, fb = ported_alignment(ts)
+            vf, chamber = None, vb
+        else:
+            vb, vf, fb = bandpass4_alignment(ts)
+            chamber = vf
+        fb = fb if tuning_axis is None else tuning_axis + 0 * vb
+        area, length = port_dimensions(ts, fb, chamber, max_port_velocity)
+        # The xmax rule of thumb ignores resonance gain in the port, so rescale the
+        # area once from the simulated air speed and re-derive the length.
+        for _ in range(2):
+            spl, exc, vel = response(ts, kind, freqs, power, vb=vb, fb=fb, vf=vf, area=area, length=length)
+            in_band = freqs.reshape(1, 1, -1) >= 0.8 * fb
+            area = area * (np.where(in_band, vel, 0).max(axis=-1, keepdims=True) / max_port_velocity)
+            length = np.maximum(C ** 2 * area / ((2 * np.pi * fb) ** 2 * chamber)
+                                - END_CORRECTION * np.sqrt(area / np.pi), 0.0)
+        spl, exc, vel = response(ts, kind, freqs, power, vb=vb, fb=fb, vf=vf, area=area, length=length)
+        design.vf, design.fb, design.port_area, design.port_length = vf, fb, area, length
+    else:
+        raise ValueError(f"Unknown enclosure kind '{kind}'")
+
+    grid = spl.shape[:2]
+    flat = lambda x: None if x is None else np.broadcast_to(np.asarray(x)[..., 0], grid)
+    design.vb, design.vf, design.fb = flat(vb), flat(design.vf), flat(design.fb)
+    design.port_area, design.port_length = flat(design.port_area), flat(design.port_length)
+    design.spl, design.excursion = spl, exc
+    # Peak excursion / port speed only count above the subsonic filter: below it
+    # the driver is not fed anyway.
+    design.subsonic = design.fb * (0.5 if kind == SEALED else 0.8)
+    in_band = freqs.reshape(1, 1, -1) >= design.subsonic[..., None]
+    design.peak_excursion = np.where(in_band, exc, 0).max(axis=-1)
+    design.port_velocity = np.where(in_band, vel, 0).max(axis=-1)
+    design.f3 = f3(freqs, spl)
+    design.xmax = ts.xmax[..., 0]
+    return design
@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+
+# --- WIRING GUIDE SEARCH ---
+# The install guides (wiring_guide.json) and the electrical tips
+# (battery_electrical_db.json "wiring_guides") split into one passage per guide,
+# with an inverted index and Okapi BM25 ranking. Everything except the query terms'
+# idf is known when the index is built, so each posting stores its final BM25 weight
+# and a search just adds a handful of arrays. The index is saved as JSON next
+# to the LLM cache and rebuilt only when the guide text changes.
+#
+# Agents get the top passages for the user's notes as grounded install advice
+# (`GuideIndex.context`), instead of working it out again on every call.
+
+K1 = 1.2                 # BM25 term-frequency saturation
+B = 0.75                 # BM25 length normalization
+TITLE_WEIGHT = 3         # a title / topic word counts as this many body words
+SUMMARY_WEIGHT = 2
+DEFAULT_RESULTS = 5
+DEFAULT_CONTEXT = 3      # passages handed to an agent
+CONTEXT_CHARS = 600      # per passage, in an agent prompt
+INDEX_FORMAT = 1         # bump when the saved layout or the tokenizer changes
+INDEX_PATH = ".cache/guide_index.json"   # shared by the app and the batch runner
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from", "how", "i",
+    "if", "in", "into", "is", "it", "its", "my", "not", "of", "on", "or", "should", "so", "than",
+    "that", "the", "this", "to", "what", "when", "which", "why", "will", "with", "you", "your",
+}
+SYNONYMS = {"gauge": "awg", "ga": "awg", "earth": "ground", "gnd": "ground", "three": "3"}
+SUFFIXES = (("ies", "y"), ("ing", ""), ("es", "e"), ("ed", ""), ("s", ""))
+MARKUP = re.compile(r"[*_`#>]+")
+
+
+def stem(word):
+    # Just enough suffix stripping that "fusing", "fuses" and "fuse" meet
+    if not word.isalpha():
+        return word
+    for suffix, repl in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3 and not word.endswith("ss"):
+            word = word[:-len(suffix)] + repl
+            break
+    return word[:-1] if word.endswith("e") and len(word) > 3 else word
+
+
+def tokenize(text):
+    # "Fuse 4 AWG wires" -> ["fus", "4", "awg", "wir"]; "1/0" stays one token
+    words = re.findall(r"[a-z0-9]+(?:/[0-9]+)?", str(text or "").lower())
+    return [stem(SYNONYMS.get(w, w)) for w in words if w not in STOPWORDS]
+
+
+def plain(text):
+    # Markdown content as one line of prose
+    return " ".join(MARKUP.sub("", str(text or "")).split())
+
+
+class Passage:
+    __slots__ = ("source", "title", "summary", "text", "difficulty")
+
+    def __init__(self, source, title, summary="", text="", difficulty=""):
+        self.source, self.title, self.summary, self.text, self.difficulty = source, title, summary, text, difficulty
+
+    def as_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def compact(self, chars=CONTEXT_CHARS):
+        body = plain(self.text)
+        if len(body) > chars:
+            body = body[:chars].rsplit(" ", 1)[0] + "..."
+        return f"[{plain(self.title)}] {body}"
+
+
+def guide_passages(wiring_guide_db, battery_electrical_db=None):
+    """One Passage per guide of wiring_guide.json (every section with a "guides"
+    list) and per tip of battery_electrical_db.json["wiring_guides"]."""
+    passages = []
+    guide = (wiring_guide_db or {}).get("wiring_guide", {})
+    for section in guide.values():
+        if not isinstance(section, dict):
+            continue
+        for g in section.get("guides", []):
+            details = g.get("details") or {}
+            summary = str(details.get("summary", "")).replace("(Click to Expand)", "").strip()
+            passages.append(Passage(plain(section.get("title", "")), g.get("title", ""), summary,
+                                    details.get("content", ""), g.get("difficulty", "")))
+    for tip in (battery_electrical_db or {}).get("wiring_guides", []):
+        passages.append(Passage("Electrical tips", tip.get("topic", ""), "", tip.get("details", "")))
+    return passages
+
+
+def corpus_version(passages):
+    # Content hash of the passages and the index settings
+    h = hashlib.sha1(f"{INDEX_FORMAT}:{K1}:{B}:{TITLE_WEIGHT}:{SUMMARY_WEIGHT}".encode())
+    h.update(json.dumps([p.as_dict() for p in passages], sort_keys=True).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+class GuideIndex:
+    """BM25 inverted index over guide passages."""
+
+    def __init__(self, passages, postings=None, version=None):
+        self.passages = list(passages)
+        self.version = version or corpus_version(self.passages)
+        # term -> (passage ids, BM25 weight of the term in each, idf included)
+        self.postings = postings if postings is not None else self._build()
+
+    def _build(self):
+        counts = []
+        for p in self.passages:
+            tf = {}
+            for field, weight in ((p.title, TITLE_WEIGHT), (p.summary, SUMMARY_WEIGHT), (p.text, 1)):
+                for term in tokenize(field):
+                    tf[term] = tf.get(term, 0) + weight
+            counts.append(tf)
+        n = len(counts)
+        lengths = np.array([sum(tf.values()) for tf in counts], dtype=float)
+        norm = K1 * (1 - B + B * lengths / max(lengths.mean(), 1.0)) if n else lengths
+        postings = {}
+        for i, tf in enumerate(counts):
+            for term, f in tf.items():
+                postings.setdefault(term, ([], []))
+                postings[term][0].append(i)
+                postings[term][1].append(f * (K1 + 1) / (f + norm[i]))
+        index = {}
+        for term, (ids, weights) in postings.items():
+            idf = np.log(1 + (n - len(ids) + 0.5) / (len(ids) + 0.5))
+            index[term] = (np.array(ids, dtype=np.int32), idf * np.array(weights))
+        return index
+
+    def __len__(self):
+        return len(self.passages)
+
+    def replace(self, other):
+        # Take over a rebuilt index, so everything holding this one sees the new guide
+        self.passages, self.postings, self.version = other.passages, other.postings, other.version
+
+    def search(self, query, k=DEFAULT_RESULTS):
+        """[(Passage, score)] best first; passages sharing no term are left out."""
+        hits = [self.postings[t] for t in set(tokenize(query)) if t in self.postings]
+        if not hits:
+            return []
+        scores = np.zeros(len(self.passages))
+        for ids, weights in hits:
+            scores[ids] += weights
+        found = np.flatnonzero(scores)
+        order = found[np.argsort(-scores[found], kind="stable")][:k]
+        return [(self.passages[i], float(scores[i])) for i in order]
+
+    def context(self, query, k=DEFAULT_CONTEXT):
+        # Top passages for an agent prompt, "" when nothing matches
+        return " | ".join(p.compact() for p, _ in self.search(query, k))
+
+    # --- PERSISTENCE ---
+    def to_dict(self):
+        return {
+            "version": self.version,
+            "passages": [p.as_dict() for p in self.passages],
+            "postings": {t: [ids.tolist(), [round(float(w), 6) for w in weights]]
+                         for t, (ids, weights) in self.postings.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        postings = {t: (np.array(ids, dtype=np.int32), np.array(weights, dtype=float))
+                    for t, (ids, weights) in data["postings"].items()}
+        return cls([Passage(**p) for p in data["passages"]], postings, data["version"])
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path)
+
+
+def load_index(path, passages):
+    """The index saved at `path` if it was built from the same passages, else a
+    fresh one (saved there for the next start). `path=None` skips the disk."""
+    version = corpus_version(passages)
+    if path:
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            if data.get("version") == version:
+                return GuideIndex.from_dict(data)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    index = GuideIndex(passages, version=version)
+    if path:
+        try:
+            index.save(path)
+        except OSError:
+            pass   # read-only checkout: keep the in-memory index
+    return index
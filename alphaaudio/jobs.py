@@ -0,0 +1,163 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from .streaming import CURSOR, consume_stream
+
+# --- BACKGROUND JOBS ---
+# Long LLM runs (simulations, recommenders, Build Wars, Beginner's Guide plans)
+# run on a process-wide worker pool instead of the Streamlit script thread, so a
+# widget interaction or a rerun no longer aborts them. The session only keeps the
+# job id and polls the job for progress and partial text; the job runs to the end
+# whether anyone is polling or not. One semaphore caps the upstream calls in
+# flight across every job of every session.
+
+DEFAULT_WORKERS = 8          # jobs running at once (queued beyond that)
+DEFAULT_MAX_UPSTREAM = 6     # LLM calls in flight at once, all jobs together
+KEEP_FINISHED = 200          # finished jobs kept for polling, oldest dropped first
+
+QUEUED, RUNNING, WAITING, DONE, FAILED = "queued", "running", "waiting", "done", "failed"
+
+
+class Step:
+    __slots__ = ("label", "state", "text", "ttft")
+
+    def __init__(self, label, state=RUNNING):
+        self.label = label
+        self.state = state
+        self.text = ""
+        self.ttft = None
+
+
+class Job:
+    def __init__(self, kind, label, queue):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.label = label or kind
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.steps = OrderedDict()   # name -> Step, in start order
+        self._queue = queue
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def step(self, name, label=None, state=None, text=None):
+        # Create or update one named step; safe to call from any worker thread.
+        with self._lock:
+            step = self.steps.get(name)
+            if step is None:
+                step = self.steps[name] = Step(label or name)
+            if label is not None:
+                step.label = label
+            if state is not None:
+                step.state = state
+            if text is not None:
+                step.text = text
+            return step
+
+    def upstream(self):
+        # Context manager holding one shared upstream slot for the duration of a call.
+        return self._queue.upstream()
+
+    def stream(self, name, chunks, label=None):
+        """Consume an LLM stream into step `name` (partial text is visible to
+        pollers as it arrives) while holding an upstream slot. Returns the
+        StreamResult. A stream that raises leaves the step FAILED, with the text
+        that arrived before the error."""
+        step = self.step(name, label, state=WAITING)
+        try:
+            with self.upstream():
+                self.step(name, state=RUNNING)
+                result = consume_stream(chunks, lambda text: self.step(name, text=text))
+        except Exception:
+            self.step(name, state=FAILED, text=step.text.removesuffix(CURSOR))
+            raise
+        step.ttft = result.ttft
+        self.step(name, state=DONE)
+        return result
+
+    def snapshot(self):
+        # [(name, label, state, text)] copied under the lock, for rendering
+        with self._lock:
+            return [(name, s.label, s.state, s.text) for name, s in self.steps.items()]
+
+
+class JobQueue:
+    def __init__(self, workers=DEFAULT_WORKERS, max_upstream=DEFAULT_MAX_UPSTREAM, keep=KEEP_FINISHED):
+        self.workers = workers
+        self.max_upstream = max_upstream
+        self.keep = keep
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._upstream = threading.BoundedSemaphore(max_upstream)
+        self.upstream_busy = 0
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind, fn, *args, label=None):
+        """Queue `fn(job, *args)`; its return value becomes `job.result`. Returns the Job."""
+        job = Job(kind, label, self)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict()
+        self._pool.submit(self._run, job, fn, args)
+        return job
+
+    @staticmethod
+    def _run(job, fn, args):
+        job.started = time.time()
+        job.status = RUNNING
+        try:
+            job.result = fn(job, *args)
+        except Exception as e:
+            job.error = e
+            job.finished = time.time()
+            job.status = FAILED
+        else:
+            job.finished = time.time()
+            job.status = DONE
+
+    @contextmanager
+    def upstream(self):
+        self._upstream.acquire()
+        with self._lock:
+            self.upstream_busy += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.upstream_busy -= 1
+            self._upstream.release()
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(0, len(finished) - self.keep)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+        for job in jobs:
+            counts[job.status] += 1
+        return {**counts, "workers": self.workers, "upstream_busy": self.upstream_busy,
+                "max_upstream": self.max_upstream}
@@ -0,0 +1,371 @@
+import json
+import logging
+import threading
+import time
+
+from alphaaudio.context_cache import Prompt
+from alphaaudio.metrics import CACHE, COALESCED, UPSTREAM, Metrics
+from alphaaudio.ratelimit import RetryPolicy, SingleFlight
+from alphaaudio.response_cache import CachedResponse
+from alphaaudio.schemas import example
+from alphaaudio.serialize import estimate_tokens
+
+# --- MODEL REGISTRY ---
+# One registry per process. It replaces the old "probe every model on every call"
+# approach: the working model is resolved lazily by the first real request, kept
+# for `ttl` seconds, and we only fail over to the next entry of models.json when
+# a real call raises.
+#
+# Prompts are plain text, or a context_cache.Prompt whose stable prefix is sent
+# as a cached-content handle when the registry has a context cache.
+
+DEFAULT_TTL = 600          # seconds before we go back to preferring the first model
+BASE_COOLDOWN = 30         # seconds a failing model is skipped, doubled per failure
+MAX_COOLDOWN = 900
+EXPECTED_OUTPUT_TOKENS = 1500   # reserved per call in the tokens/min bucket
+
+logger = logging.getLogger(__name__)
+
+
+class NoWorkingModelError(RuntimeError):
+    pass
+
+
+class StreamAbandonedError(RuntimeError):
+    # Raised to callers coalesced onto a stream whose consumer stopped reading
+    pass
+
+
+class ModelHealth:
+    __slots__ = ("name", "successes", "failure_count", "consecutive_failures",
+                 "last_success", "last_failure", "last_error", "last_latency", "cooldown_until")
+
+    def __init__(self, name):
+        self.name = name
+        self.successes = 0
+        self.failure_count = 0
+        self.consecutive_failures = 0
+        self.last_success = None
+        self.last_failure = None
+        self.last_error = ""
+        self.last_latency = None
+        self.cooldown_until = 0.0
+
+    def record_success(self, latency):
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.last_success = time.time()
+        self.last_latency = latency
+        self.cooldown_until = 0.0
+
+    def record_failure(self, error):
+        self.failure_count += 1
+        self.consecutive_failures += 1
+        self.last_failure = time.time()
+        self.last_error = f"{type(error).__name__}: {error}"
+        cooldown = min(BASE_COOLDOWN * 2 ** (self.consecutive_failures - 1), MAX_COOLDOWN)
+        self.cooldown_until = time.monotonic() + cooldown
+
+    def available(self, now):
+        return now >= self.cooldown_until
+
+    def as_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+def chunk_text(chunk):
+    # Chunks without text parts (safety stops, function calls) raise on `.text`.
+    try:
+        return chunk.text or ""
+    except ValueError:
+        return ""
+
+
+def usage_tokens(response):
+    # (prompt tokens, response tokens, of which cached) reported by Gemini, or Nones
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None, None, None
+    return (getattr(usage, "prompt_token_count", None), getattr(usage, "candidates_token_count", None),
+            getattr(usage, "cached_content_token_count", None))
+
+
+def gemini_factory(api_key):
+    # Imported here so the SDK is only loaded once a model is actually needed.
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel
+
+
+class FakeResponse:
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    # Offline stand-in for genai.GenerativeModel (batch runs and local testing):
+    # echoes the role line of the prompt after `latency` seconds, or the smallest
+    # valid answer in JSON mode.
+    def __init__(self, name, latency=0.2):
+        self.name = name
+        self.latency = latency
+
+    def _reply(self, prompt, generation_config=None):
+        role = next((line for line in prompt.splitlines() if line.strip()), "")[:80]
+        schema = (generation_config or {}).get("response_schema")
+        if schema:
+            return json.dumps({**example(schema), "notes": f"[{self.name}] {role}"})
+        return f"[{self.name}] {role} ({len(prompt)} prompt chars)"
+
+    def generate_content(self, prompt, stream=False, generation_config=None, **kwargs):
+        text = self._reply(prompt, generation_config)
+        if not stream:
+            time.sleep(self.latency)
+            return FakeResponse(text)
+
+        def chunks():
+            words = text.split(" ")
+            for word in words:
+                time.sleep(self.latency / len(words))
+                yield FakeResponse(word + " ")
+        return chunks()
+
+
+def fake_factory(latency=0.2):
+    return lambda name: FakeModel(name, latency)
+
+
+class ModelRegistry:
+    def __init__(self, model_names, factory, ttl=DEFAULT_TTL, cache=None, limiter=None, retry=None, metrics=None,
+                 context_cache=None):
+        if not model_names:
+            raise ValueError("ModelRegistry needs at least one model name")
+        self.model_names = list(model_names)
+        self.factory = factory
+        self.ttl = ttl
+        self.cache = cache       # optional ResponseCache, consulted when cache=True
+        self.limiter = limiter   # optional RateLimiter shared by every upstream call
+        self.context_cache = context_cache   # optional ContextCache for Prompt prefixes
+        self.retry = retry or RetryPolicy()
+        self.flights = SingleFlight()
+        self.retries = 0
+        self.metrics = metrics or Metrics()
+        if self.metrics.gauges is None:
+            self.metrics.gauges = self._gauges
+        self.health = {name: ModelHealth(name) for name in self.model_names}
+        self._models = {}
+        self._current = None
+        self._resolved_at = 0.0
+        self._lock = threading.Lock()
+
+    # --- RESOLUTION ---
+    def _model(self, name):
+        model = self._models.get(name)
+        if model is None:
+            model = self._models[name] = self.factory(name)
+        return model
+
+    def _bind(self, name, prompt):
+        # (model, what to send it): the suffix alone when the prefix is cached
+        model = self._model(name)
+        if isinstance(prompt, Prompt):
+            if self.context_cache is not None:
+                cached = self.context_cache.bind(name, model, prompt)
+                if cached is not None:
+                    return cached, prompt.suffix
+            return model, str(prompt)
+        return model, prompt
+
+    def _candidates(self):
+        # Current model first (while its TTL holds), then models.json order,
+        # skipping entries that are cooling down after a failure.
+        now = time.monotonic()
+        with self._lock:
+            if self._current and now - self._resolved_at > self.ttl:
+                self._current = None
+            order = list(self.model_names)
+            if self._current:
+                order.remove(self._current)
+                order.insert(0, self._current)
+        ready = [n for n in order if self.health[n].available(now)]
+        # If everything is cooling down, still try them all rather than give up.
+        return ready or order
+
+    def _mark_current(self, name):
+        with self._lock:
+            if self._current != name:
+                self._current = name
+                self._resolved_at = time.monotonic()
+
+    @property
+    def current_model(self):
+        return self._current
+
+    def set_models(self, model_names):
+        # models.json was edited: new preference order, health kept for known names
+        if not model_names:
+            raise ValueError("ModelRegistry needs at least one model name")
+        with self._lock:
+            self.model_names = list(model_names)
+            for name in self.model_names:
+                self.health.setdefault(name, ModelHealth(name))
+            if self._current not in self.model_names:
+                self._current = None
+
+    # --- CALLS ---
+    def _cache_for(self, use_cache, kwargs):
+        # Only plain text prompts with default settings are cacheable.
+        if use_cache and self.cache is not None and not kwargs:
+            return self.cache
+        return None
+
+    def _upstream(self, name, prompt, fn):
+        # One model: wait for the rate limiter, retry retryable errors with backoff.
+        attempt = 0
+        while True:
+            if self.limiter:
+                self.limiter.acquire(estimate_tokens(prompt) + EXPECTED_OUTPUT_TOKENS)
+            start = time.perf_counter()
+            try:
+                result = fn()
+            except Exception as e:
+                if not self.retry.should_retry(e, attempt):
+                    raise
+                delay = self.retry.delay(attempt)
+                attempt += 1
+                self.retries += 1
+                logger.warning("%s: %s, retry %d in %.1fs", name, type(e).__name__, attempt, delay)
+                time.sleep(delay)
+                continue
+            self.health[name].record_success(time.perf_counter() - start)
+            self._mark_current(name)
+            return result
+
+    def _failover(self, prompt, fn):
+        # fn(model, prompt text) on each candidate until one works -> (model name, result)
+        last_error = None
+        for name in self._candidates():
+            try:
+                return name, self._upstream(name, str(prompt), lambda: fn(*self._bind(name, prompt)))
+            except Exception as e:
+                self.health[name].record_failure(e)
+                last_error = e
+        raise NoWorkingModelError(
+            f"No working Gemini model found. Check API Key or Region. Last error: {last_error}"
+        ) from last_error
+
+    @staticmethod
+    def _flight_key(kind, prompt, kwargs):
+        return (kind, prompt, repr(sorted(kwargs.items())))
+
+    def _record(self, site, model, started, ttft=None, prompt="", text="", usage=None, source=UPSTREAM, error=None):
+        input_tokens, output_tokens, cached_tokens = usage_tokens(usage)
+        self.metrics.record(site, model, time.time() - (time.perf_counter() - started), time.perf_counter() - started,
+                            ttft=ttft, source=source, error=error,
+                            input_tokens=input_tokens or estimate_tokens(str(prompt)),
+                            output_tokens=output_tokens or estimate_tokens(text), cached_tokens=cached_tokens or 0)
+
+    def generate_content(self, prompt, cache=True, site=None, **kwargs):
+        # `site` names the caller (agent, recommender...) in the metrics.
+        started = time.perf_counter()
+        cache = self._cache_for(cache, kwargs)
+        if cache:
+            name = self._candidates()[0]
+            text = cache.get(name, str(prompt))
+            if text is not None:
+                self._record(site, name, started, prompt=prompt, text=text, source=CACHE)
+                return CachedResponse(text)
+
+        # Identical concurrent requests share one upstream call.
+        key = self._flight_key("generate", str(prompt), kwargs)
+        flight, leader = self.flights.begin(key)
+        if not leader:
+            response = self.flights.wait(flight)
+            self._record(site, self._current, started, prompt=prompt, text=chunk_text(response), source=COALESCED)
+            return response
+        try:
+            name, response = self._failover(prompt, lambda model, text: model.generate_content(text, **kwargs))
+        except Exception as e:
+            self.flights.finish(key, flight, error=e)
+            self._record(site, None, started, prompt=prompt, error=e)
+            raise
+        self.flights.finish(key, flight, result=response)
+        text = chunk_text(response)
+        if cache:
+            cache.put(name, str(prompt), text)
+        self._record(site, name, started, prompt=prompt, text=text, usage=response)
+        return response
+
+    def stream_content(self, prompt, cache=True, site=None, **kwargs):
+        # Same failover as generate_content, but only until the first chunk
+        # arrives: once text has been shown we cannot switch models any more.
+        started = time.perf_counter()
+        cache = self._cache_for(cache, kwargs)
+        if cache:
+            name = self._candidates()[0]
+            text = cache.get(name, str(prompt))
+            if text is not None:
+                self._record(site, name, started, ttft=time.perf_counter() - started, prompt=prompt, text=text,
+                             source=CACHE)
+                yield text
+                return
+        key = self._flight_key("stream", str(prompt), kwargs)
+        flight, leader = self.flights.begin(key)
+        if not leader:
+            # Someone is already streaming this exact prompt: wait for the full text.
+            text = self.flights.wait(flight)
+            self._record(site, self._current, started, ttft=time.perf_counter() - started, prompt=prompt,
+                         text=text, source=COALESCED)
+            yield text
+            return
+
+        def open_stream(model, text):
+            chunks = iter(model.generate_content(text, stream=True, **kwargs))
+            return chunks, next(chunks, None)
+
+        name, ttft, last, parts, error = None, None, None, [], None
+        try:
+            name, (chunks, first) = self._failover(prompt, open_stream)
+            ttft = time.perf_counter() - started
+            if first is not None:
+                last = first
+                parts.append(chunk_text(first))
+                yield parts[-1]
+            for chunk in chunks:
+                last = chunk
+                parts.append(chunk_text(chunk))
+                yield parts[-1]
+            text = "".join(parts)
+            if cache:
+                cache.put(name, str(prompt), text)
+            self.flights.finish(key, flight, result=text)
+        except GeneratorExit:
+            # Only a finished answer is cached or shared: followers of an
+            # abandoned stream get an error, not the text that arrived so far.
+            self.flights.finish(key, flight, error=StreamAbandonedError(f"stream of {name} abandoned"))
+            raise
+        except BaseException as e:
+            error = e
+            self.flights.finish(key, flight, error=e)
+            raise
+        finally:
+            # The last chunk carries the usage totals of the whole answer.
+            self._record(site, name, started, ttft=ttft, prompt=prompt, text="".join(parts), usage=last,
+                         error=error)
+
+    def _gauges(self):
+        flow = self.flow_report()
+        return {"queue_depth": flow.get("queue_depth", 0), "in_flight": flow["in_flight"],
+                "retries_total": flow["retries"]}
+
+    def flow_report(self):
+        # Rate limiter queue / wait stats plus retry and coalescing counters
+        report = self.limiter.stats() if self.limiter else {}
+        report.update({"retries": self.retries, "coalesced": self.flights.coalesced,
+                       "in_flight": self.flights.in_flight()})
+        return report
+
+    def health_report(self):
+        return [self.health[name].as_dict() for name in self.model_names]
@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+from collections import deque
+
+# --- LLM CALL METRICS ---
+# Every ModelRegistry call is recorded under its call site (architect, each
+# recommender, build_wars, ...): wall time, time to first token, token counts,
+# where the answer came from (upstream / cache / coalesced), how much of the
+# prompt was a cached prefix, and errors. Recent
+# calls live in a ring buffer for percentiles; counters are cumulative, as
+# Prometheus expects.
+
+RING_SIZE = 2000
+QUANTILES = (0.5, 0.95, 0.99)
+EXPORT_INTERVAL = 10.0        # seconds between Prometheus file rewrites
+PREFIX = "alphaaudio_llm"
+
+UPSTREAM, CACHE, COALESCED = "upstream", "cache", "coalesced"
+
+
+class CallRecord:
+    __slots__ = ("site", "model", "started", "wall", "ttft", "input_tokens", "output_tokens", "source", "error",
+                 "cached_tokens")
+
+    def __init__(self, site, model, started, wall, ttft, input_tokens, output_tokens, source, error,
+                 cached_tokens=0):
+        self.site = site
+        self.model = model
+        self.started = started
+        self.wall = wall
+        self.ttft = ttft
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.source = source
+        self.error = error
+        self.cached_tokens = cached_tokens   # part of input_tokens read from a cached prefix
+
+    def as_dict(self):
+        return {
+            "time": time.strftime("%H:%M:%S", time.localtime(self.started)), "site": self.site,
+            "model": self.model, "source": self.source, "wall_s": round(self.wall, 3),
+            "ttft_s": None if self.ttft is None else round(self.ttft, 3),
+            "input_tokens": self.input_tokens, "cached_tokens": self.cached_tokens,
+            "output_tokens": self.output_tokens, "error": self.error,
+        }
+
+
+def quantile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(q * (len(values) - 1))))]
+
+
+class Metrics:
+    def __init__(self, capacity=RING_SIZE, export_path=None, export_interval=EXPORT_INTERVAL):
+        self.ring = deque(maxlen=capacity)
+        self.totals = {}          # (site, source) -> [calls, errors, input tokens, output tokens, cached tokens]
+        self.export_path = export_path
+        self.export_interval = export_interval
+        self.gauges = None        # optional () -> {name: value}, e.g. rate limiter queue depth
+        self._exported = 0.0
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+
+    def record(self, site, model, started, wall, ttft=None, input_tokens=0, output_tokens=0,
+               source=UPSTREAM, error=None, cached_tokens=0):
+        rec = CallRecord(site or "unknown", model, started, wall, ttft, input_tokens, output_tokens, source,
+                         None if error is None else type(error).__name__, cached_tokens)
+        with self._lock:
+            self.ring.append(rec)
+            total = self.totals.setdefault((rec.site, source), [0, 0, 0, 0, 0])
+            total[0] += 1
+            total[1] += error is not None
+            total[2] += input_tokens
+            total[3] += output_tokens
+            total[4] += cached_tokens
+        if self.export_path and time.monotonic() - self._exported > self.export_interval:
+            self.export()
+        return rec
+
+    def recent(self, n=50):
+        with self._lock:
+            return [r.as_dict() for r in list(self.ring)[-n:]][::-1]
+
+    def summary(self):
+        # One row per call site over the ring buffer window.
+        with self._lock:
+            records = list(self.ring)
+        sites = {}
+        for r in records:
+            sites.setdefault(r.site, []).append(r)
+        rows = []
+        for site, recs in sorted(sites.items()):
+            walls = [r.wall for r in recs if r.error is None]
+            ttfts = [r.ttft for r in recs if r.ttft is not None]
+            row = {"site": site, "calls": len(recs), "errors": sum(r.error is not None for r in recs),
+                   "cache_hits": sum(r.source != UPSTREAM for r in recs)}
+            for q in QUANTILES:
+                value = quantile(walls, q)
+                row[f"wall_p{int(q * 100)}"] = None if value is None else round(value, 3)
+            row["ttft_p50"] = None if not ttfts else round(quantile(ttfts, 0.5), 3)
+            row["ttft_p95"] = None if not ttfts else round(quantile(ttfts, 0.95), 3)
+            row["input_tokens"] = sum(r.input_tokens for r in recs)
+            # Billed at the full input rate: what was not read from a cached prefix
+            row["uncached_input_tokens"] = row["input_tokens"] - sum(r.cached_tokens for r in recs)
+            row["output_tokens"] = sum(r.output_tokens for r in recs)
+            row["models"] = ", ".join(sorted({r.model for r in recs if r.model}))
+            rows.append(row)
+        return rows
+
+    # --- PROMETHEUS ---
+    def to_prometheus(self):
+        with self._lock:
+            records = list(self.ring)
+            totals = {k: list(v) for k, v in self.totals.items()}
+        lines = []
+
+        def summary_metric(name, help_text, field):
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} summary")
+            by_site = {}
+            for r in records:
+                value = getattr(r, field)
+                if value is not None and r.error is None:
+                    by_site.setdefault(r.site, []).append(value)
+            for site, values in sorted(by_site.items()):
+                for q in QUANTILES:
+                    lines.append(f'{PREFIX}_{name}{{site="{site}",quantile="{q}"}} {quantile(values, q):.6f}')
+                lines.append(f'{PREFIX}_{name}_sum{{site="{site}"}} {sum(values):.6f}')
+                lines.append(f'{PREFIX}_{name}_count{{site="{site}"}} {len(values)}')
+
+        summary_metric("call_seconds", "Wall time of LLM calls (recent window).", "wall")
+        summary_metric("ttft_seconds", "Time to first streamed token (recent window).", "ttft")
+        counters = (("calls_total", "LLM calls by call site and answer source.", 0),
+                    ("errors_total", "Failed LLM calls.", 1),
+                    ("input_tokens_total", "Prompt tokens sent.", 2),
+                    ("output_tokens_total", "Response tokens received.", 3),
+                    ("cached_input_tokens_total", "Prompt tokens read from a cached prefix.", 4))
+        for name, help_text, i in counters:
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} counter")
+            for (site, source), values in sorted(totals.items()):
+                lines.append(f'{PREFIX}_{name}{{site="{site}",source="{source}"}} {values[i]}')
+        for name, value in (self.gauges() if self.gauges else {}).items():
+            lines.append(f"# TYPE {PREFIX}_{name} gauge")
+            lines.append(f"{PREFIX}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path=None):
+        # Atomic rewrite so the scraper never reads a half-written file.
+        path = path or self.export_path
+        with self._export_lock:
+            self._exported = time.monotonic()
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f"{path}.tmp"
+            with open(tmp, "w") as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp, path)
+        return path
@@ -0,0 +1,236 @@
+import math
+
+import numpy as np
+
+from . import cabin, electrical, enclosure
+from .query import shortlist_headunits, shortlist_processors
+from .serialize import NO_PROCESSOR_TIERS, SQ_HINTS
+
+# --- BEGINNER'S GUIDE BUILD OPTIMIZER ---
+# Searches sub x quantity x amplifier (+ headunit / processor / battery bank when
+# the tier needs them) against the price range of the selected package. Subs and
+# amps are walked cheapest first so a branch is cut as soon as its running cost
+# leaves the budget, or as soon as its best possible output is already beaten by
+# a cheaper build. What survives is the cost / output Pareto front; the AI only
+# explains the builds it is given. The picked builds also get an in-car SPL
+# prediction for the user's vehicle, to check the Decibel Goal against.
+
+# Gear Lab enclosure choices -> closest solver alignment
+ENCLOSURE_MODEL = {
+    "Sealed": enclosure.SEALED,
+    "Ported (Vented)": enclosure.PORTED,
+    "4th Order Bandpass": enclosure.BANDPASS4,
+    "6th Order Bandpass": enclosure.BANDPASS4,
+    "No Wall (Free Air)": enclosure.SEALED,
+    "Trunk Wall (Reflected)": enclosure.PORTED,
+    "B-Pillar/C-Pillar Wall": enclosure.PORTED,
+}
+# Rough build cost of the box per subwoofer (materials or a prefab box)
+ENCLOSURE_COST = {
+    "Sealed": 90,
+    "Ported (Vented)": 140,
+    "4th Order Bandpass": 200,
+    "6th Order Bandpass": 260,
+    "No Wall (Free Air)": 300,
+    "Trunk Wall (Reflected)": 250,
+    "B-Pillar/C-Pillar Wall": 400,
+}
+DEFAULT_ENCLOSURE_COST = 150
+
+# The DB has no prices for these, so the plan budgets street-price allowances.
+PROCESSOR_ALLOWANCE = 350
+BATTERY_PRICE_PER_AH = {"LTO": 1.5, "LifePo4": 0.5, "SCiB": 2.0, "AGM": 4.5, "Sodium": 1.2, "Li-ion": 3.0}
+DEFAULT_BATTERY_PRICE_PER_AH = 2.0
+STOCK_ALTERNATOR_AMPS = 120       # what a stock charging system carries without a bank
+WATTS_PER_AH = 30                 # rule of thumb: at least 1 Ah of bank per 30 W RMS
+
+QUANTITIES = {
+    "Essential": (1,),
+    "Budget SPL": (1, 2),
+    "Enhanced": (1, 2),
+    "Audiophile": (1, 2),
+    "Competition": (1, 2, 4),
+}
+NO_HEADUNIT_TIERS = {"Budget SPL", "Essential"}
+NOT_SOURCE_UNITS = {"external"}            # chassis types that play no audio (DSP remotes)
+
+SCORE_BAND = np.geomspace(30, 80, 24)      # Hz, where the output score is averaged
+MATCH_RANGE = (0.5, 2.0)                   # amp watts / sub watts outside this is a mismatch
+IDEAL_HEADROOM = 1.2
+MATCH_PENALTY_DB = 2.0                     # per octave away from the ideal headroom
+# Goal -> (dB bonus for SQ-oriented subs, dB bonus for class AB amps)
+GOAL_BONUS = {
+    "Audiophile (SQ)": (6.0, 1.5),
+    "SQL (Balanced)": (3.0, 0.5),
+    "SPL (Bass)": (0.0, 0.0),
+}
+DEFAULT_TOP_N = 2
+
+
+class Build:
+    __slots__ = ("sub", "quantity", "amp", "headunit", "processor", "bank",
+                 "enclosure", "costs", "spl", "score", "in_car", "in_car_hz")
+
+    @property
+    def cost(self):
+        return sum(self.costs.values())
+
+    def as_row(self):
+        return {
+            "Subwoofer": f"{self.quantity}x {self.sub.label}",
+            "Amplifier": self.amp.label,
+            "Headunit": self.headunit["brand"] + " " + self.headunit["model"] if self.headunit else "-",
+            "Processor": self.processor["brand"] + " " + self.processor["model"] if self.processor else "-",
+            "Battery bank": f"{self.bank['config']} {self.bank['cell']}" if self.bank else "stock",
+            "Est. SPL @1m (dB)": round(self.spl, 1),
+            "Est. in-car peak (dB)": round(self.in_car, 1) if self.in_car is not None else None,
+            "Est. cost ($)": round(self.cost),
+        }
+
+    def describe(self):
+        costs = ", ".join(f"{k} ${v:,.0f}" for k, v in self.costs.items())
+        return (f"{self.quantity}x {self.sub.label} ({self.sub.get('size')}\", {self.sub.get('rms')} W RMS each) in a "
+                f"{self.enclosure} box on a {self.amp.label} ({self.amp.sub_power:,.0f} W); "
+                + (f"headunit {self.headunit['brand']} {self.headunit['model']}; " if self.headunit else "")
+                + (f"processor {self.processor['brand']} {self.processor['model']}; " if self.processor else "")
+                + (f"battery bank {self.bank['config']} {self.bank['cell']}; " if self.bank else "")
+                + f"estimated {self.spl:.1f} dB @ 1 m (30-80 Hz average, before cabin gain); "
+                + (f"predicted in-car peak {self.in_car:.1f} dB at {self.in_car_hz:.0f} Hz; "
+                   if self.in_car is not None else "")
+                + f"cost ${self.cost:,.0f} ({costs})")
+
+
+def _driver_output(subs, kind):
+    # Band-averaged SPL at 1 W and the power at which each driver reaches xmax,
+    # from one vectorized enclosure solve at rated power.
+    design = enclosure.solve(subs, kind, power=[s.get("rms") for s in subs])
+    rms = np.array([s.get("rms") for s in subs], dtype=float)
+    band = (enclosure.DEFAULT_FREQS >= SCORE_BAND[0]) & (enclosure.DEFAULT_FREQS <= SCORE_BAND[-1])
+    spl_rated = design.spl[:, 0, band].mean(axis=-1)
+    spl_1w = spl_rated - 10 * np.log10(rms)
+    exc_ratio = design.peak_excursion[:, 0] / design.xmax[:, 0]
+    p_xmax = rms / np.maximum(exc_ratio, 1e-9) ** 2
+    return spl_1w, np.minimum(rms, p_xmax)
+
+
+def _bank_for(catalogs, amp_power, cache):
+    # Cheapest viable battery bank for this much amplifier power (None = stock is fine)
+    if amp_power not in cache:
+        load = electrical.ElectricalLoad(amp_power)
+        bank = None
+        if load.peak_current > STOCK_ALTERNATOR_AMPS:
+            banks = electrical.enumerate_banks(catalogs.batteries, load, STOCK_ALTERNATOR_AMPS)
+            priced = [(_bank_cost(catalogs, b), b) for b in banks
+                      if b["viable"] and b["capacity_Ah"] >= amp_power / WATTS_PER_AH]
+            bank = min(priced, key=lambda p: p[0], default=None)
+        cache[amp_power] = bank
+    return cache[amp_power]
+
+
+def _bank_cost(catalogs, bank):
+    cell = next(r for r in catalogs.batteries if f"{r.brand} {r.model}" == bank["cell"])
+    per_ah = BATTERY_PRICE_PER_AH.get(cell.type, DEFAULT_BATTERY_PRICE_PER_AH)
+    return per_ah * cell.capacity_Ah * bank["cells"]
+
+
+def _source_unit(catalog):
+    # Best headunit that is a real source unit, None when the catalog has none
+    ranked = shortlist_headunits(catalog, None, 4, None, k=len(catalog)).rows
+    return next((r for r in ranked if not r.get("external")
+                 and str(r.get("chassis_type", "")).strip().lower() not in NOT_SOURCE_UNITS), None)
+
+
+def _dominated(front, cost, score):
+    return any(c <= cost and s >= score for c, s, _ in front)
+
+
+def optimize_builds(catalogs, min_price, max_price, tier, goal_point, enclosure_type,
+                    headunit_cost=0, top_n=DEFAULT_TOP_N, car=None):
+    """Top `top_n` builds of the cost / output Pareto front within `max_price`.
+
+    `headunit_cost` is the allowance for a new headunit (0 keeps the stock one).
+    With `car` (free-text vehicle) the picked builds get their in-car SPL.
+    Returns (builds best first, number of complete builds evaluated).
+    """
+    kind = ENCLOSURE_MODEL.get(enclosure_type, enclosure.PORTED)
+    box_cost = ENCLOSURE_COST.get(enclosure_type, DEFAULT_ENCLOSURE_COST)
+    sq_bonus, ab_bonus = GOAL_BONUS.get(goal_point, GOAL_BONUS["SQL (Balanced)"])
+
+    fixed = {}
+    headunit = processor = None
+    if headunit_cost and tier not in NO_HEADUNIT_TIERS:
+        headunit = _source_unit(catalogs.headunits)
+        fixed["headunit"] = headunit_cost
+    if tier not in NO_PROCESSOR_TIERS:
+        processor = next(iter(shortlist_processors(catalogs.processors, None, 2, 4, "Yes", k=1).rows), None)
+        fixed["processor"] = PROCESSOR_ALLOWANCE
+    fixed_cost = sum(fixed.values())
+
+    subs = sorted((s for s in catalogs.subwoofers if s.get("sd") and s.get("vas")), key=lambda s: s.price)
+    amps = sorted(catalogs.amplifiers, key=lambda a: a.price)
+    if not subs or not amps:
+        return [], 0
+    spl_1w, usable = _driver_output(subs, kind)
+    max_amp_power = max(a.sub_power for a in amps)
+    banks = {}
+    front, evaluated = [], 0
+
+    for i, sub in enumerate(subs):
+        sq = any(h in str(sub.get("type", "")).lower() for h in SQ_HINTS)
+        sub_bonus = sq_bonus if sq else 0.0
+        for qty in QUANTITIES.get(tier, (1, 2)):
+            base = sub.price * qty + box_cost * qty + fixed_cost
+            if base + amps[0].price > max_price:
+                break                              # more subs only cost more
+            # Optimistic output: every sub at its usable power, best amp bonus.
+            bound = (spl_1w[i] + 10 * math.log10(min(usable[i], max_amp_power / qty))
+                     + 20 * math.log10(qty) + sub_bonus + ab_bonus)
+            if _dominated(front, base, bound):
+                continue
+            for amp in amps:
+                if base + amp.price > max_price:
+                    break                          # amps are sorted by price
+                power = amp.sub_power
+                ratio = power / (sub.rms * qty)
+                if not MATCH_RANGE[0] <= ratio <= MATCH_RANGE[1]:
+                    continue
+                costs = {"subwoofers": sub.price * qty, "enclosure": box_cost * qty, "amplifier": amp.price}
+                costs.update(fixed)
+                priced_bank = _bank_for(catalogs, power, banks)
+                bank = None
+                if priced_bank:
+                    costs["battery bank"], bank = priced_bank
+                cost = sum(costs.values())
+                if cost > max_price:
+                    continue
+                evaluated += 1
+                spl = spl_1w[i] + 10 * math.log10(min(usable[i], power / qty)) + 20 * math.log10(qty)
+                score = (spl + sub_bonus + (ab_bonus if amp.get("class") in ("AB", "A/B") else 0.0)
+                         - MATCH_PENALTY_DB * abs(math.log2(ratio / IDEAL_HEADROOM)))
+                if _dominated(front, cost, score):
+                    continue
+                build = Build()
+                build.sub, build.quantity, build.amp = sub, qty, amp
+                build.headunit, build.processor, build.bank = headunit, processor, bank
+                build.enclosure, build.costs, build.spl, build.score = enclosure_type, costs, float(spl), float(score)
+                build.in_car = build.in_car_hz = None
+                front = [f for f in front if not (cost <= f[0] and score >= f[1])]
+                front.append((cost, score, build))
+
+    # Best output first; builds far below the package range are only a fallback.
+    in_range = [f for f in front if f[0] >= min_price]
+    ranked = [b for _, _, b in sorted(in_range or front, key=lambda f: -f[1])]
+    # Prefer builds on different subwoofer brands so the options really differ.
+    picked, brands = [], set()
+    for build in ranked:
+        if build.sub.brand not in brands:
+            picked.append(build)
+            brands.add(build.sub.brand)
+    picked = (picked + [b for b in ranked if b not in picked])[:top_n]
+    if car is not None and picked:
+        resp = cabin.predict_builds([b.sub for b in picked], [b.quantity for b in picked],
+                                    [min(b.amp.sub_power / b.quantity, b.sub.rms) for b in picked],
+                                    [car] * len(picked), kind)
+        for build, peak, hz in zip(picked, resp.peak, resp.peak_freq):
+            build.in_car, build.in_car_hz = float(peak), float(hz)
+    return picked, evaluated
@@ -0,0 +1,173 @@
+import json
+import os
+
+import numpy as np
+
+from . import cabin, electrical, enclosure, guides, thermal
+from .agents import design_studio_dag
+from .catalog import Catalogs
+from .query import match_record, parse_number, parse_power, parse_quantity
+
+# --- DESIGN STUDIO PIPELINE ---
+# Everything the "INITIATE SIMULATION" button does that is not UI: the local
+# enclosure / cabin / electrical / thermal models, the wiring guide passages for
+# the user's notes, the project data string and the agent DAG run.
+# Used by the Streamlit page and by the headless batch runner (alphaaudio.batch).
+
+ENCLOSURE_KINDS = {"Ported": enclosure.PORTED, "Sealed": enclosure.SEALED, "4th Order Bandpass": enclosure.BANDPASS4}
+SIMULATION_AGENTS = ["architect", "structural", "thermal"]
+
+# Batch spec fields and their Design Studio defaults
+DEFAULT_SPEC = {
+    "car": "2010 Honda Civic",
+    "subwoofer": "2x Sundown Zv6 15",
+    "power": "5000W",
+    "alternator": "240",
+    "fs": 32,
+    "enclosure": "Ported",
+    "tolerance": "Zero",
+    "music": "Rap (30-40Hz)",
+    "notes": "",
+    "extra": "",
+}
+
+DB_FILES = {
+    "subwoofers": ("Subwoofer_db.json", []),
+    "amplifiers": ("amplifiers_db.json", []),
+    "battery_electrical": ("battery_electrical_db.json", {"batteries": [], "alternators": [], "wiring_guides": []}),
+    "headunits_processors": ("headunits_processors_db.json", {"headunits": [], "processors": []}),
+}
+
+
+def load_json(path, default):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def load_catalogs(data_dir="."):
+    data = {key: load_json(os.path.join(data_dir, name), default) for key, (name, default) in DB_FILES.items()}
+    return Catalogs(data["subwoofers"], data["amplifiers"], data["battery_electrical"], data["headunits_processors"])
+
+
+def load_guides(data_dir=".", path=guides.INDEX_PATH):
+    passages = guides.guide_passages(load_json(os.path.join(data_dir, "wiring_guide.json"), {}),
+                                     load_json(os.path.join(data_dir, DB_FILES["battery_electrical"][0]), {}))
+    return guides.load_index(path, passages)
+
+
+# --- LOCAL MODELS ---
+class EnclosureModel:
+    __slots__ = ("driver", "quantity", "power_per_sub", "designs", "summary")
+
+
+def enclosure_model(catalogs, subwoofer, power, fs, enclosure_kind):
+    # Every enclosure kind for the matched driver (the page plots all of them);
+    # `summary` describes the chosen one. None when the sub is not in the catalog.
+    driver = match_record(catalogs.subwoofers, subwoofer)
+    if not driver:
+        return None
+    model = EnclosureModel()
+    model.driver, model.quantity = driver, parse_quantity(subwoofer)
+    model.power_per_sub = (parse_power(power, catalogs.amplifiers) or driver.rms * model.quantity) / model.quantity
+    model.designs = {label: enclosure.solve([driver], kind, tunings=[fs], power=[model.power_per_sub])
+                     for label, kind in ENCLOSURE_KINDS.items()}
+    chosen = model.designs.get(enclosure_kind) or model.designs["Ported"]
+    model.summary = chosen.summary(quantity=model.quantity)
+    return model
+
+
+def cabin_model(enc, car, enclosure_kind):
+    # In-car SPL of the chosen enclosure (the enclosure model's quantity and power)
+    design = enc.designs.get(enclosure_kind) or enc.designs["Ported"]
+    return cabin.in_car(design, enc.quantity, car)
+
+
+def electrical_model(catalogs, power, alternator, music_style=None):
+    # (load, ranked banks, summary) or None without a power figure.
+    watts = parse_power(power, catalogs.amplifiers)
+    if not watts:
+        return None
+    alt_amps = parse_number(alternator, 0)
+    load = electrical.ElectricalLoad(watts, music_style=music_style)
+    banks = electrical.enumerate_banks(catalogs.batteries, load, alt_amps)
+    return load, banks, electrical.electrical_summary(load, banks, alt_amps)
+
+
+class ThermalModel:
+    __slots__ = ("driver", "quantity", "power_per_sub", "simulation", "index", "summary")
+
+
+def thermal_model(catalogs, subwoofer, power, music_style, alternatives=3):
+    # Coil temperatures of the whole subwoofer catalog at the build's power per
+    # sub; `index` is the matched driver. None when the sub is not in the catalog.
+    driver = match_record(catalogs.subwoofers, subwoofer)
+    if not driver:
+        return None
+    model = ThermalModel()
+    model.driver, model.quantity = driver, parse_quantity(subwoofer)
+    model.power_per_sub = (parse_power(power, catalogs.amplifiers) or driver.rms * model.quantity) / model.quantity
+    drivers = list(catalogs.subwoofers)
+    model.index = next(i for i, d in enumerate(drivers) if d is driver)
+    model.simulation = thermal.simulate(drivers, model.power_per_sub, music_style)
+    model.summary = model.simulation.summary(model.index)
+    if np.isfinite(model.simulation.time_to_limit[model.index]):
+        safe = [row for row in model.simulation.table()
+                if row["minutes_to_limit"] is None and row["steady_c"] < thermal.T_LIMIT
+                and row["driver"] != driver.label]
+        # Cheapest way out: the lowest-rated drivers that still survive this power
+        safe.sort(key=lambda row: row["rms"])
+        if safe:
+            model.summary += ". Drivers that stay under the limit at this power: " + ", ".join(
+                f"{row['driver']} ({row['steady_c']} C)" for row in safe[:alternatives])
+    return model
+
+
+def project_data(spec, enclosure_summary="", cabin_summary=""):
+    text = (f"Car: {spec['car']}, Sub: {spec['subwoofer']}, Power: {spec['power']}, Fs: {spec['fs']}, "
+            f"Enclosure: {spec['enclosure']}, Music: {spec['music']}, Tolerance: {spec['tolerance']}, Notes: {spec['notes']}")
+    if enclosure_summary:
+        text += ("\nCOMPUTED ENCLOSURE (local Thiele-Small solver, use these numbers instead of "
+                 f"re-deriving them): {enclosure_summary}")
+    if cabin_summary:
+        text += f"\nPREDICTED IN-CAR SPL (local cabin gain model): {cabin_summary}"
+    return text
+
+
+def design_context(catalogs, spec, guide_index=None):
+    # DAG context for one build spec (missing fields take the Design Studio defaults).
+    # With a GuideIndex, install questions in the notes get the matching guide passages.
+    spec = {**DEFAULT_SPEC, **{k: v for k, v in spec.items() if v is not None}}
+    enc = enclosure_model(catalogs, spec["subwoofer"], spec["power"], spec["fs"], spec["enclosure"])
+    spl = cabin_model(enc, spec["car"], spec["enclosure"]).summary(at=spec["fs"]) if enc else ""
+    elec = electrical_model(catalogs, spec["power"], spec["alternator"], spec["music"])
+    therm = thermal_model(catalogs, spec["subwoofer"], spec["power"], spec["music"])
+    return {
+        "proj_data": project_data(spec, enc.summary if enc else "", spl),
+        "extra": spec["extra"],
+        "electrical": elec[2] if elec else "",
+        "thermal": therm.summary if therm else "",
+        "guides": guide_index.context(f"{spec['notes']} {spec['extra']}") if guide_index else "",
+    }
+
+
+# --- HEADLESS RUN ---
+def run_design(model, dag, context, targets=None, cache=False, max_workers=4):
+    """Run the design agents without a UI. Returns (outputs, errors, seconds per agent)."""
+    timings = {}
+
+    def call(agent, prompt, progress):
+        return "".join(model.stream_content(prompt, cache=cache, site=agent.name, **agent.options))
+
+    def on_event(name, status, payload):
+        if status == "done":
+            timings[name] = payload
+
+    outputs, errors = dag.run(call, context, targets=targets, max_workers=max_workers, on_event=on_event)
+    return outputs, errors, timings
+
+
+def default_dag(data_dir="."):
+    return design_studio_dag(load_json(os.path.join(data_dir, "design_prompts.json"), {}))
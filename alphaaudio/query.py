@@ -0,0 +1,243 @@
+import re
+
+from .resolver import parse_part
+
+# --- CATALOG PRE-FILTER ---
+# The recommenders used to paste whole tables into the prompt. These functions
+# apply the structured form inputs as hard filters (answered by the Catalog
+# indexes), score what is left and keep only the top-K rows, so prompt size no
+# longer grows with the catalog.
+
+DEFAULT_TOP_K = 8
+
+# Target Fs window per Gear Lab music style
+STYLE_FS_RANGE = {
+    "Decaf (20-30Hz)": (20, 30),
+    "Rap (30-40Hz)": (30, 40),
+    "EDM (40Hz+)": (40, 60),
+    "Metal": (35, 50),
+}
+
+SQ_TYPE_HINTS = ("sound quality", "musical", "daily", "sq")
+
+# Gear Lab chemistry choices -> battery "type" values in the DB
+CHEMISTRY_TYPES = {
+    "LifePo4": {"LifePo4"},
+    "LTO": {"LTO"},
+    "AGM": {"AGM"},
+    "Sodium": {"Sodium"},
+    "Li-ion": {"Li-ion"},
+    "SCiB": {"SCiB"},
+}
+
+# Power text: a leading "2x" is a quantity, and a number followed by another unit
+# ("12V") is never the wattage
+POWER_QUANTITY = re.compile(r"^\s*\d+\s*[x×]\s*", re.IGNORECASE)
+POWER_NUMBER = re.compile(r"(?<![\d.])(\d+(?:\.\d+)?)\s*(k)?\s*(w(?:atts?|rms)?)?(?![a-z\d]|\.\d)", re.IGNORECASE)
+
+
+def parse_number(text, default=None):
+    # "1500", "$1,500", "5000W", "4.5 V" -> float
+    if isinstance(text, (int, float)):
+        return float(text)
+    match = re.search(r"\d+(?:\.\d+)?", str(text or "").replace(",", ""))
+    return float(match.group()) if match else default
+
+
+def parse_quantity(text, default=1):
+    # "2x Sundown Zv6 15", "dual T3 15", "Zv6 15 (2)" -> 2
+    quantity = parse_part(text)[0]
+    return quantity if quantity else default
+
+
+def parse_power(text, amplifiers=None, default=None):
+    # "5000W", "8k", "2x 1500W", "12V 5000W", or an amplifier name ("Taramps
+    # Smart 8K") resolved to its sub power
+    if amplifiers is not None and re.search(r"[a-z]{3}", str(text or ""), re.IGNORECASE):
+        amp = match_record(amplifiers, text)
+        if amp:
+            return amp.sub_power
+    text = POWER_QUANTITY.sub("", str(text or "").replace(",", ""))
+    numbers = list(POWER_NUMBER.finditer(text))
+    # A number with "k" or "W" after it, else the first bare one
+    match = next((m for m in numbers if m.group(2) or m.group(3)), numbers[0] if numbers else None)
+    if not match:
+        return default
+    return float(match.group(1)) * (1000 if match.group(2) else 1)
+
+
+def match_record(catalog, text):
+    # Catalog record for a free-text part name, or None when the UI would ask
+    # instead (nothing close enough, or a runner-up too close: Resolution.best)
+    best = catalog.resolve(text).best
+    return best.record if best else None
+
+
+def _num(row, key, default=0.0):
+    value = row.get(key)
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else default
+
+
+class Shortlist:
+    __slots__ = ("label", "rows", "total", "matched", "relaxed")
+
+    def __init__(self, label, rows, total, matched, relaxed=()):
+        self.label = label
+        self.rows = rows          # what goes into the prompt, best first
+        self.total = total        # rows in the catalog
+        self.matched = matched    # rows that passed the hard filters
+        self.relaxed = list(relaxed)   # filters dropped because no row could match them
+
+    @property
+    def pruned(self):
+        return self.total - len(self.rows)
+
+    def summary(self):
+        text = (f"Shortlisted {len(self.rows)} of {self.total} {self.label} for the AI "
+                f"({self.matched} matched your filters, {self.pruned} pruned).")
+        if self.relaxed:
+            text += f" Filter dropped: {'; '.join(self.relaxed)}."
+        return text
+
+
+def _shortlist(catalog, matched, score, k, fallback_key=None, relaxed=()):
+    pool = matched
+    if not pool and fallback_key:
+        # Nothing meets the hard filters: hand over the closest rows instead of nothing.
+        pool = sorted(catalog, key=fallback_key)[:k]
+    ranked = sorted(pool, key=score, reverse=True)[:k]
+    return Shortlist(catalog.name, [r.as_dict() for r in ranked], len(catalog), len(matched), relaxed)
+
+
+def _max(records, key):
+    return max((_num(r, key) for r in records), default=0.0) or 1.0
+
+
+def _choice(value):
+    # "Any" / empty selectbox values mean "no constraint"
+    return None if value in (None, "", "Any") else value
+
+
+# --- SUBWOOFERS ---
+def shortlist_subwoofers(catalog, budget, music_style, goal, k=DEFAULT_TOP_K):
+    budget = parse_number(budget)
+    lo, hi = STYLE_FS_RANGE.get(music_style, (20, 60))
+    matched = catalog.filter(ranges={"price": (None, budget)})
+    max_rms, max_xmax = _max(matched, "rms"), _max(matched, "xmax")
+
+    def score(r):
+        fs = _num(r, "fs", (lo + hi) / 2)
+        distance = max(lo - fs, fs - hi, 0)
+        fs_fit = max(0.0, 1 - distance / 10)
+        rms = _num(r, "rms") / max_rms
+        xmax = _num(r, "xmax") / max_xmax
+        if goal == "Wind/Hairtricks":
+            goal_fit = 0.6 * xmax + 0.4 * rms + (0.2 if fs <= 25 else 0)
+        elif goal == "SPL Score":
+            goal_fit = 0.6 * rms + 0.4 * xmax
+        else:
+            kind = str(r.get("type", "")).lower()
+            goal_fit = 0.7 if any(h in kind for h in SQ_TYPE_HINTS) else 0.3 * rms + 0.2
+        return 1.5 * fs_fit + goal_fit
+
+    return _shortlist(catalog, matched, score, k,
+                      fallback_key=lambda r: _num(r, "price", float("inf")))
+
+
+# --- AMPLIFIERS ---
+def shortlist_amplifiers(catalog, budget, desired_rms, channels, amp_class, k=DEFAULT_TOP_K):
+    budget = parse_number(budget)
+    desired = parse_number(desired_rms)
+    channels = int(parse_number(channels, 0))
+    equals = {"class": amp_class} if _choice(amp_class) else {}
+    matched = catalog.filter(ranges={"price": (None, budget)}, equals=equals)
+
+    def score(r):
+        power = _num(r, "power_rms_per_ch")
+        if desired:
+            ratio = power / desired
+            # Being short on power hurts more than having headroom.
+            power_fit = ratio if ratio < 1 else max(0.0, 1 - (ratio - 1) * 0.25)
+        else:
+            power_fit = 0.5
+        channel_fit = 1.0 if int(_num(r, "channels")) == channels else 0.0
+        return 2 * power_fit + channel_fit
+
+    return _shortlist(catalog, matched, score, k,
+                      fallback_key=lambda r: _num(r, "price", float("inf")))
+
+
+# --- BATTERIES & ALTERNATORS ---
+def shortlist_batteries(catalog, chemistry, min_capacity, k=DEFAULT_TOP_K):
+    min_capacity = parse_number(min_capacity, 0)
+    wanted = CHEMISTRY_TYPES.get(chemistry)
+    matched = catalog.filter(ranges={"capacity_Ah": (min_capacity, None)},
+                             equals={"type": wanted} if wanted else {})
+    max_discharge, max_capacity = _max(matched, "max_discharge_A"), _max(matched, "capacity_Ah")
+
+    def score(r):
+        return _num(r, "max_discharge_A") / max_discharge + 0.5 * _num(r, "capacity_Ah") / max_capacity
+
+    return _shortlist(catalog, matched, score, k,
+                      fallback_key=lambda r: -_num(r, "capacity_Ah"))
+
+
+def shortlist_alternators(catalog, min_amps, k=DEFAULT_TOP_K):
+    matched = catalog.filter(ranges={"amperage": (parse_number(min_amps, 0), None)})
+    return _shortlist(catalog, matched,
+                      lambda r: -_num(r, "amperage"),   # smallest that still does the job first
+                      k, fallback_key=lambda r: -_num(r, "amperage"))
+
+
+# --- HEADUNITS & PROCESSORS ---
+def _yes_no(equals, field, choice):
+    if _choice(choice):
+        equals[field] = choice == "Yes"
+    return equals
+
+
+def _words(text):
+    return set(re.findall(r"[a-z0-9]+", str(text).casefold()))
+
+
+def _bucket_choice(equals, catalog, field, choice, relaxed):
+    # Every catalog value holding all the words of the choice, any case: "optical"
+    # finds "Analog RCA + Optical". A choice no row has is dropped, and said so.
+    if not _choice(choice):
+        return equals
+    wanted = _words(choice)
+    values = {v for v in catalog.bucket_values(field) if isinstance(v, str) and wanted <= _words(v)}
+    if values:
+        equals[field] = values
+    else:
+        relaxed.append(f"no {catalog.name} with {field.replace('_', ' ')} \"{choice}\"")
+    return equals
+
+
+def shortlist_headunits(catalog, chassis_type, min_preout, eq_needed, k=DEFAULT_TOP_K):
+    relaxed = []
+    equals = _bucket_choice({}, catalog, "chassis_type", chassis_type, relaxed)
+    matched = catalog.filter(ranges={"preout_voltage": (parse_number(min_preout, 0), None)},
+                             equals=_yes_no(equals, "internal_eq", eq_needed))
+
+    def score(r):
+        return _num(r, "preout_voltage") + 0.1 * _num(r, "eq_bands")
+
+    return _shortlist(catalog, matched, score, k,
+                      fallback_key=lambda r: -_num(r, "preout_voltage"), relaxed=relaxed)
+
+
+def shortlist_processors(catalog, input_topology, channels_in, channels_out, active_needed, k=DEFAULT_TOP_K):
+    need_in = parse_number(channels_in, 0)
+    need_out = parse_number(channels_out, 0)
+    relaxed = []
+    equals = _bucket_choice({}, catalog, "input_topology", input_topology, relaxed)
+    matched = catalog.filter(ranges={"channels_in": (need_in, None), "channels_out": (need_out, None)},
+                             equals=_yes_no(equals, "active", active_needed))
+
+    def score(r):
+        # Closest fit on outputs first, spare channels are fine but cost money.
+        return -abs(_num(r, "channels_out") - need_out) - 0.5 * abs(_num(r, "channels_in") - need_in)
+
+    return _shortlist(catalog, matched, score, k,
+                      fallback_key=lambda r: abs(_num(r, "channels_out") - need_out), relaxed=relaxed)
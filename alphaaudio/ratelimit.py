@@ -0,0 +1,161 @@
+import random
+import threading
+import time
+from collections import deque
+
+# --- UPSTREAM FLOW CONTROL ---
+# Shared by every session through the process-wide ModelRegistry:
+#   * RateLimiter: token buckets on requests/min and tokens/min; callers block
+#     until both have room instead of getting a 429 from Gemini.
+#   * RetryPolicy: exponential backoff with full jitter on retryable errors.
+#   * SingleFlight: identical concurrent requests share one upstream call.
+
+DEFAULT_RPM = 60
+DEFAULT_TPM = 1_000_000
+WAIT_SAMPLES = 500            # recent waits kept for the stats
+
+# HTTP codes / exception names (google.api_core, requests, builtins) worth retrying
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_NAMES = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded",
+    "InternalServerError", "GatewayTimeout", "BadGateway", "TimeoutError", "ConnectionError",
+}
+
+
+class RateLimiter:
+    def __init__(self, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)       # both buckets start full (one minute of burst)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waiting = 0                  # callers currently blocked (queue depth)
+        self.peak_waiting = 0
+        self.acquired = 0
+        self.waits = deque(maxlen=WAIT_SAMPLES)
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def acquire(self, tokens=0):
+        # Blocks until one request and `tokens` tokens are available; returns the wait.
+        tokens = min(tokens, self.tpm)   # a single huge prompt must still get through
+        started = time.monotonic()
+        queued = False
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._requests >= 1 and self._tokens >= tokens:
+                        self._requests -= 1
+                        self._tokens -= tokens
+                        self.acquired += 1
+                        waited = now - started
+                        self.waits.append(waited)
+                        return waited
+                    delay = max((1 - self._requests) * 60 / self.rpm,
+                                (tokens - self._tokens) * 60 / self.tpm, 0.01)
+                    if not queued:
+                        queued = True
+                        self.waiting += 1
+                        self.peak_waiting = max(self.peak_waiting, self.waiting)
+                time.sleep(min(delay, 1.0))
+        finally:
+            if queued:
+                with self._lock:
+                    self.waiting -= 1
+
+    def stats(self):
+        with self._lock:
+            waits = sorted(self.waits)
+        p95 = waits[int(0.95 * (len(waits) - 1))] if waits else 0.0
+        return {
+            "rpm": self.rpm, "tpm": self.tpm, "queue_depth": self.waiting, "peak_queue_depth": self.peak_waiting,
+            "acquired": self.acquired, "mean_wait": sum(waits) / len(waits) if waits else 0.0,
+            "p95_wait": p95, "max_wait": waits[-1] if waits else 0.0,
+        }
+
+
+def is_retryable(error):
+    code = getattr(error, "code", None)
+    code = getattr(code, "value", code)       # api_core stores an HTTPStatus
+    if isinstance(code, int) and code in RETRYABLE_CODES:
+        return True
+    return type(error).__name__ in RETRYABLE_NAMES
+
+
+class RetryPolicy:
+    def __init__(self, retries=4, base_delay=1.0, max_delay=30.0):
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def should_retry(self, error, attempt):
+        return attempt < self.retries and is_retryable(error)
+
+    def delay(self, attempt):
+        # "Full jitter": uniform in [0, base * 2^attempt], capped
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def begin(self, key):
+        # (flight, is_leader). The leader must call finish(); followers wait().
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.followers += 1
+                self.coalesced += 1
+                return flight, False
+            flight = self._flights[key] = _Flight()
+            return flight, True
+
+    def finish(self, key, flight, result=None, error=None):
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+        flight.result, flight.error = result, error
+        flight.done.set()
+
+    @staticmethod
+    def wait(flight):
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    def do(self, key, fn):
+        flight, leader = self.begin(key)
+        if not leader:
+            return self.wait(flight)
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, flight, error=e)
+            raise
+        self.finish(key, flight, result=result)
+        return result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._flights)
@@ -0,0 +1,182 @@
+import math
+import re
+
+import numpy as np
+
+# --- PART NAME RESOLVER ---
+# Free-text gear fields ("2x Sundown Zv6 15", "Skar evl-12", "hond civic") are
+# split into a quantity, a cone size and a name, and the name is looked up in a
+# character-trigram inverted index of every catalog label. A lookup counts the
+# query's rare trigrams over their posting lists to get candidates, then tests
+# the common ones (" 12", "d4 ") for those candidates only, against per-trigram
+# bitsets, so it stays under a millisecond at 100k names. Candidates are ranked with
+# a Tversky similarity that forgives words the DB has and the user left out
+# ("Audio", "Series"). The score doubles as the confidence of a match.
+
+BETA = 0.5               # weight of the record's extra trigrams (the query's count fully)
+MIN_SCORE = 0.3          # below this a name is not even a suggestion
+CONFIDENT = 0.6          # a best match this good is used without asking
+AMBIGUOUS_GAP = 0.05     # a runner-up this close to the best means "did you mean"
+SIZE_BONUS = 0.1         # stated cone size matches the record
+WRONG_SIZE_CAP = 0.5     # a record of another cone size is at most a suggestion
+COMMON_SHARE = 0.02      # trigrams in more names than this share are kept as bitsets
+DEFAULT_SUGGESTIONS = 3
+
+QUANTITY_WORDS = {"single": 1, "dual": 2, "pair": 2, "two": 2, "three": 3, "triple": 3, "four": 4, "quad": 4}
+# "2x Zv6 15" / "2 x Zv6 15" at the start or "Zv6 15 (2)" at the end; an "x 15"
+# or "x15" elsewhere is part of the name, never a count
+QUANTITY_PATTERN = re.compile(r"^(\d+)\s*[x×](?=\s|$)|\((\d+)\)$", re.IGNORECASE)
+SIZE_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*(?:\"|''|in\b|inch(?:es)?\b|-inch\b)", re.IGNORECASE)
+SIZES = {"6.5", "8", "10", "12", "13", "15", "18", "21", "24"}
+
+
+def normalize(text):
+    # lower case alphanumerics, one space between words: "ZV6-15" -> "zv6 15"
+    return " ".join(re.findall(r"[a-z0-9]+(?:\.[0-9]+)?", str(text or "").lower()))
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Character-trigram inverted index over a list of names."""
+
+    def __init__(self, names):
+        self.names = [normalize(n) for n in names]
+        postings = {}
+        self.sizes = np.empty(len(self.names), dtype=np.int32)
+        for i, name in enumerate(self.names):
+            grams = trigrams(name)
+            self.sizes[i] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+        # Rare trigrams keep their posting list, common ones a packed bitset
+        limit = max(COMMON_SHARE * len(self.names), 64)
+        self.postings, self.bitsets = {}, {}
+        for gram, ids in postings.items():
+            if len(ids) <= limit:
+                self.postings[gram] = np.array(ids, dtype=np.int32)
+            else:
+                mask = np.zeros(len(self.names), dtype=bool)
+                mask[ids] = True
+                self.bitsets[gram] = np.packbits(mask)
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, text, k=DEFAULT_SUGGESTIONS, min_score=MIN_SCORE):
+        """[(name index, score)] best first, scores in 0..1."""
+        grams = trigrams(normalize(text))
+        rare = [self.postings[g] for g in grams if g in self.postings]
+        common = [self.bitsets[g] for g in grams if g in self.bitsets]
+        if not rare and not common:
+            return []
+        q = len(grams)
+        # score <= shared / q, so fewer shared trigrams can't reach min_score
+        need = max(1, math.ceil(min_score * q))
+        if rare:
+            cand, shared = np.unique(np.concatenate(rare), return_counts=True)
+            keep = shared + len(common) >= need
+            cand, shared = cand[keep], shared[keep]
+            byte, bit = cand >> 3, 7 - (cand & 7)
+            for bits in common:
+                shared = shared + ((bits[byte] >> bit) & 1)
+        else:
+            # Only common trigrams (a bare "12"): count them over every name
+            counts = sum(np.unpackbits(bits, count=len(self.names)).astype(np.int32) for bits in common)
+            cand = np.flatnonzero(counts >= need)
+            shared = counts[cand]
+        score = shared / (q + BETA * (self.sizes[cand] - shared))
+        keep = score >= min_score
+        cand, score = cand[keep], score[keep]
+        if len(cand) > k:
+            top = np.argpartition(-score, k)[:k]
+            cand, score = cand[top], score[top]
+        order = np.argsort(-score, kind="stable")
+        return [(int(cand[i]), float(score[i])) for i in order]
+
+
+# --- FREE-TEXT PARSING ---
+def parse_part(text):
+    """(quantity or None, cone size or None, name text) of a free-text part."""
+    text = str(text or "").strip()
+    quantity = None
+    match = QUANTITY_PATTERN.search(text)
+    if match:
+        quantity = int(next(g for g in match.groups() if g))
+        text = (text[:match.start()] + " " + text[match.end():]).strip()
+    else:
+        words = text.lower().split()
+        if words and words[0] in QUANTITY_WORDS:
+            quantity = QUANTITY_WORDS[words[0]]
+            text = text.split(None, 1)[1] if len(words) > 1 else ""
+    size = None
+    match = SIZE_PATTERN.search(text)
+    if match:
+        size = match.group(1)
+        text = (text[:match.start()] + " " + match.group(1) + " " + text[match.end():]).strip()
+    else:
+        # A bare trailing cone size is usually part of the model name too ("Zv6 15")
+        numbers = [n for n in re.findall(r"\b\d+(?:\.\d+)?\b", text) if n in SIZES]
+        size = numbers[-1] if numbers else None
+    return quantity, size, text
+
+
+class Match:
+    __slots__ = ("record", "label", "score")
+
+    def __init__(self, record, label, score):
+        self.record, self.label, self.score = record, label, score
+
+    def __repr__(self):
+        return f"Match({self.label!r}, {self.score:.2f})"
+
+
+class Resolution:
+    __slots__ = ("text", "quantity", "size", "matches")
+
+    def __init__(self, text, quantity, size, matches):
+        self.text, self.quantity, self.size, self.matches = text, quantity, size, matches
+
+    @property
+    def confidence(self):
+        return self.matches[0].score if self.matches else 0.0
+
+    @property
+    def best(self):
+        # The top match when it is good enough and clearly ahead, else None
+        if not self.matches or self.confidence < CONFIDENT:
+            return None
+        if len(self.matches) > 1 and self.matches[1].score > self.confidence - AMBIGUOUS_GAP:
+            return None
+        return self.matches[0]
+
+    @property
+    def suggestions(self):
+        # "Did you mean": only when there is no confident answer
+        return [] if self.best else self.matches
+
+    def replace(self, label):
+        # The field text with the name swapped for `label`, keeping the quantity
+        return f"{self.quantity}x {label}" if self.quantity else label
+
+
+def resolve(index, records, text, k=DEFAULT_SUGGESTIONS):
+    """Resolve free text against `records` indexed by `index` (one name each).
+    A cone size stated in the text nudges records of that size up; records of
+    another size are capped below CONFIDENT, so they are only suggested."""
+    quantity, size, name = parse_part(text)
+    found = index.search(name, k=k * 2) if name else []
+    matches = []
+    for i, score in found:
+        record = records[i]
+        if size and hasattr(record, "get"):
+            record_size = str(record.get("size") or "").strip().rstrip('"')
+            if record_size:
+                score = score + SIZE_BONUS if record_size == size else min(score, WRONG_SIZE_CAP)
+        label = getattr(record, "label", None) or index.names[i]
+        matches.append(Match(record, label, min(max(score, 0.0), 1.0)))
+    matches.sort(key=lambda m: -m.score)
+    return Resolution(text, quantity, size, matches[:k])
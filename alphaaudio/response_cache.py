@@ -0,0 +1,166 @@
+import glob
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# --- LLM RESPONSE CACHE ---
+# Content-addressed: the key is a hash of (model name, full prompt, database file
+# versions). A small in-memory LRU sits in front of a SQLite file so answers
+# survive restarts. Editing any *_db.json changes the version, which makes every
+# older entry unreachable from this process. Other processes sharing the file may
+# still run on the old files, so rows of another version are only purged once
+# nobody has read them for STALE_VERSION_TTL, along with the TTL and size limits.
+
+DEFAULT_TTL = 24 * 3600            # seconds
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_MAX_DISK_BYTES = 64 * 1024 * 1024
+STALE_VERSION_TTL = 3600           # seconds an unread row of another version is kept
+
+
+def db_files_version(data_dir=".", pattern="*_db.json"):
+    # mtime + size is enough to notice an edit and costs one stat() per file.
+    parts = []
+    for path in sorted(glob.glob(os.path.join(data_dir, pattern))):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        parts.append(f"{os.path.basename(path)}:{st.st_mtime_ns}:{st.st_size}")
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:16]
+
+
+def cache_key(model_name, prompt, version):
+    h = hashlib.sha256()
+    for part in (model_name, prompt, version):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class CachedResponse:
+    # Quacks like a Gemini response for the call sites that only read .text
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+
+class ResponseCache:
+    def __init__(self, path, ttl=DEFAULT_TTL, memory_entries=DEFAULT_MEMORY_ENTRIES,
+                 max_disk_bytes=DEFAULT_MAX_DISK_BYTES, version_fn=None, data_dir=".",
+                 stale_version_ttl=STALE_VERSION_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.stale_version_ttl = stale_version_ttl
+        # Versions the *_db.json files of `data_dir`, not of the working directory
+        self.version_fn = version_fn or (lambda: db_files_version(data_dir))
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()   # key -> (text, expires_at)
+        self._version = None
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, model TEXT, version TEXT, text TEXT,"
+            " size INTEGER, created REAL, expires REAL, last_access REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_access ON responses(last_access)")
+        self._conn.commit()
+
+    # --- VERSIONING ---
+    def _current_version(self):
+        version = self.version_fn()
+        if version != self._version:
+            # Databases changed (or first use): our older keys can't be reached any
+            # more. Their disk rows are left to _evict, other processes may use them.
+            self._memory.clear()
+            self._version = version
+        return version
+
+    # --- LOOKUP ---
+    def get(self, model_name, prompt):
+        now = time.time()
+        with self._lock:
+            key = cache_key(model_name, prompt, self._current_version())
+            entry = self._memory.get(key)
+            if entry and entry[1] > now:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            row = self._conn.execute(
+                "SELECT text, expires FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and row[1] > now:
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self._remember(key, row[0], row[1])
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, model_name, prompt, text):
+        if not text:
+            return
+        now = time.time()
+        expires = now + self.ttl
+        with self._lock:
+            version = self._current_version()
+            key = cache_key(model_name, prompt, version)
+            self._remember(key, text, expires)
+            size = len(text.encode("utf-8"))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model_name, version, text, size, now, expires, now),
+            )
+            self._evict(now, version)
+            self._conn.commit()
+
+    # --- EVICTION ---
+    def _remember(self, key, text, expires):
+        self._memory[key] = (text, expires)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now, version):
+        self._conn.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+        self._conn.execute("DELETE FROM responses WHERE version != ? AND last_access <= ?",
+                           (version, now - self.stale_version_ttl))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        # Least recently used rows go first until we are back under the limit.
+        excess = total - self.max_disk_bytes
+        freed = 0
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            doomed.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        for (key,) in doomed:
+            self._memory.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            rows, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "memory_entries": len(self._memory),
+                "disk_entries": rows, "disk_bytes": size}
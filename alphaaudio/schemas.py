@@ -0,0 +1,200 @@
+import json
+import re
+
+# --- STRUCTURED AGENT OUTPUTS ---
+# The Architect, Structural and Thermal agents answer in JSON mode against the
+# response schemas stored next to their prompts in design_prompts.json
+# (<AGENT>_SCHEMA, the OpenAPI subset Gemini accepts). Answers are validated and
+# parsed into the report classes below; downstream agents get the one-line
+# `compact()` form instead of the previous agent's prose, and the UI shows
+# `to_markdown()`.
+
+SEVERITIES = ("low", "medium", "high", "critical")
+SEVERITY_ICONS = {"low": "🟢", "medium": "🟡", "high": "🟠", "critical": "🔴"}
+FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def json_config(schema):
+    # generation_config asking Gemini for JSON that follows `schema`
+    return {"response_mime_type": "application/json", "response_schema": schema}
+
+
+def validate(value, schema, path="$"):
+    """Check `value` against the schema subset we use (object / array / string /
+    number / integer / boolean, `required`, `enum`, `minItems`). Raises SchemaError."""
+    kind = schema.get("type", "object").lower()
+    if kind == "object":
+        if not isinstance(value, dict):
+            raise SchemaError(f"{path}: expected an object")
+        for key in schema.get("required", []):
+            if value.get(key) is None:
+                raise SchemaError(f"{path}.{key}: missing")
+        for key, sub in schema.get("properties", {}).items():
+            if value.get(key) is not None:
+                validate(value[key], sub, f"{path}.{key}")
+    elif kind == "array":
+        if not isinstance(value, list):
+            raise SchemaError(f"{path}: expected an array")
+        if len(value) < schema.get("minItems", 0):
+            raise SchemaError(f"{path}: expected at least {schema['minItems']} items")
+        for i, item in enumerate(value):
+            validate(item, schema.get("items", {}), f"{path}[{i}]")
+    elif kind in ("number", "integer"):
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise SchemaError(f"{path}: expected a number")
+    elif kind == "boolean":
+        if not isinstance(value, bool):
+            raise SchemaError(f"{path}: expected true or false")
+    elif kind == "string":
+        if not isinstance(value, str):
+            raise SchemaError(f"{path}: expected a string")
+    if "enum" in schema and value not in schema["enum"]:
+        raise SchemaError(f"{path}: {value!r} is not one of {', '.join(map(str, schema['enum']))}")
+
+
+def example(schema):
+    # Smallest value matching `schema` (offline fake model answers)
+    kind = schema.get("type", "object").lower()
+    if "enum" in schema:
+        return schema["enum"][0]
+    if kind == "object":
+        return {key: example(sub) for key, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [example(schema.get("items", {}))]
+    return {"number": 0.0, "integer": 0, "boolean": False}.get(kind, "")
+
+
+def _num(value, unit="", digits=1):
+    return "?" if value is None else f"{value:,.{digits}f}{unit}"
+
+
+# --- REPORTS ---
+class RiskItem:
+    __slots__ = ("item", "severity", "mitigation")
+
+    def __init__(self, data):
+        self.item = data.get("item", "")
+        self.severity = data.get("severity", "low")
+        self.mitigation = data.get("mitigation", "")
+
+    def compact(self):
+        return f"{self.severity.upper()} {self.item}" + (f" (fix: {self.mitigation})" if self.mitigation else "")
+
+    def to_markdown(self):
+        fix = f": {self.mitigation}" if self.mitigation else ""
+        return f"- {SEVERITY_ICONS.get(self.severity, '')} **{self.item}** ({self.severity}){fix}"
+
+
+def _risks(data):
+    order = {s: i for i, s in enumerate(SEVERITIES)}
+    return sorted((RiskItem(r) for r in data.get("risks") or []), key=lambda r: -order.get(r.severity, 0))
+
+
+class ArchitectReport:
+    __slots__ = ("net_volume_ft3", "gross_volume_ft3", "tuning_hz", "port_area_in2", "port_length_in",
+                 "port_velocity_ms", "subsonic_hz", "bracing", "notes")
+
+    def __init__(self, data):
+        for slot in self.__slots__:
+            setattr(self, slot, data.get(slot))
+
+    def compact(self):
+        parts = [f"net {_num(self.net_volume_ft3, ' ft3', 2)}", f"Fb {_num(self.tuning_hz, ' Hz')}"]
+        if self.gross_volume_ft3 is not None:
+            parts.append(f"gross {_num(self.gross_volume_ft3, ' ft3', 2)}")
+        if self.port_area_in2:
+            parts.append(f"port {_num(self.port_area_in2, ' in2')} x {_num(self.port_length_in, ' in')}")
+            parts.append(f"port velocity {_num(self.port_velocity_ms, ' m/s')}")
+        if self.subsonic_hz is not None:
+            parts.append(f"subsonic {_num(self.subsonic_hz, ' Hz')}")
+        if self.bracing:
+            parts.append(f"bracing: {self.bracing}")
+        return " | ".join(parts)
+
+    def to_markdown(self):
+        lines = [
+            "**The Blueprint**",
+            f"- **Net Volume:** {_num(self.net_volume_ft3, ' ft³', 2)} (gross {_num(self.gross_volume_ft3, ' ft³', 2)})",
+            f"- **Tuning (Fb):** {_num(self.tuning_hz, ' Hz')}",
+        ]
+        if self.port_area_in2:
+            lines.append(f"- **Port:** {_num(self.port_area_in2, ' in²')}, {_num(self.port_length_in, ' in')} long, "
+                         f"{_num(self.port_velocity_ms, ' m/s')} peak velocity")
+        else:
+            lines.append("- **Port:** none (sealed)")
+        if self.subsonic_hz is not None:
+            lines.append(f"- **Subsonic filter:** {_num(self.subsonic_hz, ' Hz')}")
+        if self.bracing:
+            lines.append(f"- **Bracing:** {self.bracing}")
+        if self.notes:
+            lines += ["", self.notes]
+        return "\n".join(lines)
+
+
+class StructuralReport:
+    __slots__ = ("risks", "deadening", "notes")
+
+    def __init__(self, data):
+        self.risks = _risks(data)
+        self.deadening = data.get("deadening") or ""
+        self.notes = data.get("notes") or ""
+
+    def compact(self):
+        text = "; ".join(r.compact() for r in self.risks) or "no risks"
+        return f"{text} | deadening: {self.deadening}" if self.deadening else text
+
+    def to_markdown(self):
+        lines = ["**Risk Register**"] + ([r.to_markdown() for r in self.risks] or ["- none found"])
+        if self.deadening:
+            lines.append(f"\n**Deadening:** {self.deadening}")
+        if self.notes:
+            lines += ["", self.notes]
+        return "\n".join(lines)
+
+
+class ThermalReport:
+    __slots__ = ("peak_current_a", "voltage_sag_v", "min_voltage_v", "coil_temp_c", "risks", "notes")
+
+    def __init__(self, data):
+        for slot in ("peak_current_a", "voltage_sag_v", "min_voltage_v", "coil_temp_c"):
+            setattr(self, slot, data.get(slot))
+        self.risks = _risks(data)
+        self.notes = data.get("notes") or ""
+
+    def compact(self):
+        parts = [f"peak {_num(self.peak_current_a, ' A', 0)}", f"sag {_num(self.voltage_sag_v, ' V')}",
+                 f"coil {_num(self.coil_temp_c, ' C', 0)}"]
+        if self.min_voltage_v is not None:
+            parts.insert(2, f"floor {_num(self.min_voltage_v, ' V')}")
+        parts += [r.compact() for r in self.risks]
+        return " | ".join(parts)
+
+    def to_markdown(self):
+        lines = [
+            "**Energy Budget**",
+            f"- **Peak current:** {_num(self.peak_current_a, ' A', 0)}",
+            f"- **Voltage sag:** {_num(self.voltage_sag_v, ' V')} (floor {_num(self.min_voltage_v, ' V')})",
+            f"- **Coil temperature:** {_num(self.coil_temp_c, ' °C', 0)}",
+        ]
+        if self.risks:
+            lines += ["", "**Risks**"] + [r.to_markdown() for r in self.risks]
+        if self.notes:
+            lines += ["", self.notes]
+        return "\n".join(lines)
+
+
+REPORTS = {"architect": ArchitectReport, "structural": StructuralReport, "thermal": ThermalReport}
+
+
+def parse(name, text, schema):
+    """Validate the JSON answer of agent `name` and return its report object."""
+    try:
+        data = json.loads(FENCE.sub("", text or ""))
+    except ValueError as e:
+        raise SchemaError(f"{name}: answer is not JSON ({e})") from None
+    validate(data, schema, name)
+    return REPORTS[name](data)
@@ -0,0 +1,152 @@
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# --- COMPACT CATALOG SERIALIZATION ---
+# Pretty-printed JSON repeats every key on every row. Prompts get each table as
+# one header line plus one pipe-separated line per row instead, restricted to
+# the columns that matter for the request and cut down to a token budget.
+
+CHARS_PER_TOKEN = 4          # rough Gemini average for English + numbers
+DEFAULT_TOKEN_BUDGET = 3000
+SEPARATOR = "|"
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "Y" if value else "N"
+    if isinstance(value, (list, tuple)):
+        return ";".join(_cell(v) for v in value)
+    return str(value).replace(SEPARATOR, "/").replace("\n", " ")
+
+
+class Table:
+    __slots__ = ("name", "rows", "columns")
+
+    def __init__(self, name, rows, columns):
+        self.name = name
+        self.rows = list(rows)     # best first: trimming drops from the end
+        self.columns = list(columns)
+
+    def header(self):
+        return f"{self.name} ({SEPARATOR.join(self.columns)}):"
+
+    def lines(self):
+        return [SEPARATOR.join(_cell(row.get(c)) for c in self.columns) for row in self.rows]
+
+
+def render_tables(tables, token_budget=DEFAULT_TOKEN_BUDGET):
+    # Returns the compact text. While it is over budget, the lowest-ranked row of
+    # the table that currently has the most rows is dropped (each table keeps one).
+    lines = {t.name: t.lines() for t in tables}
+    cost = {t.name: [estimate_tokens(line) + 1 for line in lines[t.name]] for t in tables}
+    total = sum(estimate_tokens(t.header()) + 1 + sum(cost[t.name]) for t in tables)
+    dropped = 0
+    while token_budget and total > token_budget:
+        name = max(lines, key=lambda n: len(lines[n]))
+        if len(lines[name]) <= 1:
+            break
+        lines[name].pop()
+        total -= cost[name].pop()
+        dropped += 1
+    blocks = ["\n".join([t.header()] + lines[t.name]) for t in tables]
+    return "\n\n".join(blocks), dropped
+
+
+def log_prompt_savings(label, before_text, after_text, dropped=0):
+    before, after = estimate_tokens(before_text), estimate_tokens(after_text)
+    saved = 100 * (1 - after / before) if before else 0
+    logger.info("%s catalog: %d -> %d est. tokens (%.0f%% smaller, %d rows trimmed)",
+                label, before, after, saved, dropped)
+    return before, after
+
+
+# --- CATALOG SNAPSHOTS ---
+# A whole table in compact form, every column, in catalog order: the same text
+# on every request until the database changes, so it can be the cached prefix
+# of a prompt. Rows past the token budget are left out of the snapshot; requests
+# that need one of them carry that row in their suffix.
+SNAPSHOT_TOKEN_BUDGET = 8000
+
+
+class Snapshot:
+    __slots__ = ("name", "text", "columns", "labels")
+
+
+def row_label(row):
+    return f"{row.get('brand')} {row.get('model')}"
+
+
+def catalog_snapshot(name, rows, token_budget=SNAPSHOT_TOKEN_BUDGET):
+    columns = []
+    for row in rows:
+        columns += [c for c in row if c not in columns]
+    table = Table(name.title(), rows, columns)
+    text, dropped = render_tables([table], token_budget)
+    snap = Snapshot()
+    snap.name, snap.text, snap.columns = name, text, columns
+    snap.labels = {row_label(r) for r in table.rows[:len(table.rows) - dropped]}
+    log_prompt_savings(f"{name} snapshot", json.dumps(table.rows, indent=2), text, dropped)
+    return snap
+
+
+# --- BEGINNER'S GUIDE ---
+# Columns worth sending per goal; anything else only costs tokens.
+SUB_COLUMNS = {
+    "Audiophile (SQ)": ["brand", "model", "size", "rms", "fs", "price", "type"],
+    "SPL (Bass)": ["brand", "model", "size", "rms", "fs", "xmax", "price"],
+    "SQL (Balanced)": ["brand", "model", "size", "rms", "fs", "xmax", "price", "type"],
+}
+AMP_COLUMNS = {
+    "Audiophile (SQ)": ["brand", "model", "power_rms_per_ch", "channels", "class", "impedance", "price"],
+    "SPL (Bass)": ["brand", "model", "power_rms_per_ch", "bridged_power", "channels", "impedance", "price"],
+    "SQL (Balanced)": ["brand", "model", "power_rms_per_ch", "channels", "class", "impedance", "price"],
+}
+HEADUNIT_COLUMNS = ["brand", "model", "chassis_type", "preout_voltage", "eq_bands", "internal_eq"]
+PROCESSOR_COLUMNS = ["brand", "model", "input_topology", "channels_in", "channels_out", "active", "tuning"]
+
+# Tiers that never get a DSP / processor in the plan
+NO_PROCESSOR_TIERS = {"Budget SPL", "Essential"}
+
+SQ_HINTS = ("sound quality", "musical", "daily")
+
+
+def _price_rank(rows, target):
+    # Closest price to the share of the budget that part usually takes.
+    return sorted(rows, key=lambda r: abs((r.get("price") or 0) - target))
+
+
+def beginner_catalog_tables(catalogs, tier, goal_point, max_price):
+    subs = _price_rank(catalogs.subwoofers, 0.3 * max_price)
+    amps = _price_rank(catalogs.amplifiers, 0.3 * max_price)
+    if goal_point == "SPL (Bass)":
+        # Most power among the subs that leave room in the budget for an amp
+        subs = sorted(subs, key=lambda r: ((r.get("price") or 0) > 0.5 * max_price, -(r.get("rms") or 0)))
+    elif goal_point == "Audiophile (SQ)":
+        subs = sorted(subs, key=lambda r: not any(h in str(r.get("type", "")).lower() for h in SQ_HINTS))
+    tables = [
+        Table("Subwoofers", subs, SUB_COLUMNS.get(goal_point, SUB_COLUMNS["SQL (Balanced)"])),
+        Table("Amplifiers", amps, AMP_COLUMNS.get(goal_point, AMP_COLUMNS["SQL (Balanced)"])),
+        Table("Headunits", sorted(catalogs.headunits, key=lambda r: -(r.get("preout_voltage") or 0)),
+              HEADUNIT_COLUMNS),
+    ]
+    if tier not in NO_PROCESSOR_TIERS:
+        tables.append(Table("Processors", catalogs.processors, PROCESSOR_COLUMNS))
+    return tables
+
+
+def beginner_catalog_text(catalogs, tier, goal_point, max_price, token_budget=DEFAULT_TOKEN_BUDGET):
+    tables = beginner_catalog_tables(catalogs, tier, goal_point, max_price)
+    text, dropped = render_tables(tables, token_budget)
+    # What the prompt used to carry: the three databases as indented JSON
+    before = "\n\n".join(json.dumps(c.rows, indent=2) for c in
+                          (catalogs.subwoofers, catalogs.amplifiers, catalogs.headunits, catalogs.processors))
+    log_prompt_savings("Beginner's Guide", before, text, dropped)
+    return text
@@ -0,0 +1,39 @@
+import time
+
+# --- STREAMING ---
+# Turns a stream of text chunks into progressive renders. The renderer is any
+# callable taking the text so far (e.g. a Streamlit placeholder's .info), so this
+# module stays free of UI imports.
+
+RENDER_INTERVAL = 0.08     # seconds between two renders, keeps the websocket quiet
+CURSOR = " ▌"
+
+
+class StreamResult:
+    __slots__ = ("text", "ttft", "total")
+
+    def __init__(self, text, ttft, total):
+        self.text = text
+        self.ttft = ttft       # seconds until the first non-empty chunk (None if nothing came)
+        self.total = total     # seconds until the stream ended
+
+
+def consume_stream(chunks, on_text=None, interval=RENDER_INTERVAL):
+    start = time.perf_counter()
+    parts = []
+    ttft = None
+    last_render = 0.0
+    for piece in chunks:
+        if not piece:
+            continue
+        now = time.perf_counter()
+        if ttft is None:
+            ttft = now - start
+        parts.append(piece)
+        if on_text and now - last_render >= interval:
+            on_text("".join(parts) + CURSOR)
+            last_render = now
+    text = "".join(parts)
+    if on_text:
+        on_text(text)
+    return StreamResult(text, ttft, time.perf_counter() - start)
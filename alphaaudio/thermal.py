@@ -0,0 +1,134 @@
+import numpy as np
+
+from .electrical import DEFAULT_DUTY, DUTY_CYCLE
+
+# --- VOICE-COIL THERMAL MODEL ---
+# Two-time-constant lumped network: the coil heats up in seconds and dumps its
+# heat into the motor (magnet + plates), which heats up over minutes and sheds it
+# to the enclosure air. Driven by a burst envelope whose on-time follows the
+# music-style duty cycle, with the coil's resistance rising with temperature
+# (power compression on a voltage-driven amp). Integrated step by step in time,
+# vectorized over every driver, so a whole catalog is simulated in one pass.
+#
+# The DB has no coil / motor data, so the network is scaled from the ratings:
+# rated RMS held continuously settles at RATED_RISE above ambient, and the time
+# constants grow with cone size (a stand-in for coil and motor mass).
+
+T_AMBIENT = 40.0         # C, air inside a box in a closed car
+T_LIMIT = 180.0          # C, where coil adhesives and formers start to fail
+RATED_RISE = 120.0       # C above ambient with the rated RMS held continuously
+COIL_SHARE = 0.6         # share of the total thermal resistance between coil and motor
+TAU_COIL = 15.0          # s, coil time constant of a 12" driver (scales with size)
+TAU_MOTOR = 900.0        # s, motor time constant of a 12" driver (scales with size^2)
+ALPHA_CU = 0.00393       # 1/K, copper resistance temperature coefficient
+BURST_PERIOD = 10.0      # s, one "song phrase": full power for duty x period, then rest
+DEFAULT_MINUTES = 30
+DT = 0.25                # s, integration step (well under the smallest coil time constant)
+
+
+def _col(drivers, name, default):
+    values = [d.get(name) for d in drivers]
+    return np.array([default if v is None else v for v in values], dtype=float)[:, None]
+
+
+def _size(drivers):
+    sizes = []
+    for d in drivers:
+        try:
+            sizes.append(float(str(d.get("size", "12")).strip().rstrip('"')))
+        except ValueError:
+            sizes.append(12.0)
+    return np.array(sizes)[:, None]
+
+
+class ThermalNetwork:
+    # Per-driver parameters, shaped (N, 1) to broadcast against time.
+    __slots__ = ("labels", "rms", "r_coil", "r_motor", "c_coil", "c_motor")
+
+    def __init__(self, drivers):
+        self.labels = [f"{d.get('brand')} {d.get('model')}" for d in drivers]
+        self.rms = np.maximum(_col(drivers, "rms", 500.0), 1.0)
+        scale = _size(drivers) / 12.0
+        r_total = RATED_RISE / self.rms
+        self.r_coil = COIL_SHARE * r_total
+        self.r_motor = (1 - COIL_SHARE) * r_total
+        self.c_coil = np.maximum(TAU_COIL * scale, 4 * DT) / self.r_coil
+        self.c_motor = TAU_MOTOR * scale ** 2 / self.r_motor
+
+    def __len__(self):
+        return len(self.labels)
+
+
+def envelope(duty, minutes=DEFAULT_MINUTES, dt=DT):
+    # (time, 0/1 burst mask): each BURST_PERIOD opens with a full-power burst
+    t = np.arange(0, minutes * 60 + dt, dt)
+    return t, ((t % BURST_PERIOD) < duty * BURST_PERIOD).astype(float)
+
+
+class ThermalSimulation:
+    # Arrays are (drivers,) unless noted; `coil` is (drivers, time).
+    __slots__ = ("labels", "power", "duty", "time", "coil", "peak", "steady", "steady_motor",
+                 "time_to_limit", "compression_db", "rms")
+
+    def summary(self, i=0):
+        ttl = self.time_to_limit[i]
+        limit = (f"reaches the {T_LIMIT:.0f} C limit after {ttl / 60:.1f} min" if np.isfinite(ttl)
+                 else f"stays under the {T_LIMIT:.0f} C limit for {self.time[-1] / 60:.0f} min")
+        return (f"{self.labels[i]} at {self.power[i]:,.0f} W ({self.power[i] / self.rms[i]:.1f}x its "
+                f"{self.rms[i]:,.0f} W rating), {self.duty:.0%} duty: coil peaks at {self.peak[i]:.0f} C and "
+                f"{limit}; steady state coil {self.steady[i]:.0f} C, motor {self.steady_motor[i]:.0f} C, "
+                f"{self.compression_db[i]:.1f} dB power compression (ambient {T_AMBIENT:.0f} C)")
+
+    def table(self):
+        # One row per driver, coolest steady-state coil first
+        rows = []
+        for i in np.argsort(self.steady):
+            ttl = self.time_to_limit[i]
+            rows.append({
+                "driver": self.labels[i],
+                "rms": round(float(self.rms[i])),
+                "power_w": round(float(self.power[i])),
+                "peak_c": round(float(self.peak[i])),
+                "steady_c": round(float(self.steady[i])),
+                "minutes_to_limit": None if np.isinf(ttl) else round(float(ttl) / 60, 1),
+                "compression_db": round(float(self.compression_db[i]), 1),
+            })
+        return rows
+
+
+def simulate(drivers, power, music_style=None, minutes=DEFAULT_MINUTES, dt=DT):
+    """Play `minutes` of bursts at `power` watts per driver (scalar or one per
+    driver) through every driver's thermal network. Returns a ThermalSimulation."""
+    net = drivers if isinstance(drivers, ThermalNetwork) else ThermalNetwork(list(drivers))
+    n = len(net)
+    duty = DUTY_CYCLE.get(music_style, DEFAULT_DUTY)
+    power = np.broadcast_to(np.asarray(power, dtype=float).reshape(-1), (n,)).astype(float)
+    t, burst = envelope(duty, minutes, dt)
+
+    coil = np.full(n, T_AMBIENT)
+    motor = np.full(n, T_AMBIENT)
+    history = np.empty((n, len(t)))
+    r_coil, r_motor = net.r_coil[:, 0], net.r_motor[:, 0]
+    c_coil, c_motor = net.c_coil[:, 0], net.c_motor[:, 0]
+    for k, on in enumerate(burst):
+        history[:, k] = coil
+        heat = on * power / (1 + ALPHA_CU * (coil - T_AMBIENT))
+        to_motor = (coil - motor) / r_coil
+        coil = coil + dt * (heat - to_motor) / c_coil
+        motor = motor + dt * (to_motor - (motor - T_AMBIENT) / r_motor) / c_motor
+
+    # Steady state under the average power: rise = P_avg * R / (1 + alpha * rise)
+    p_avg, r_total = duty * power, r_coil + r_motor
+    rise = (np.sqrt(1 + 4 * ALPHA_CU * p_avg * r_total) - 1) / (2 * ALPHA_CU)
+    heat_avg = p_avg / (1 + ALPHA_CU * rise)
+
+    over = history >= T_LIMIT
+    sim = ThermalSimulation()
+    sim.labels, sim.power, sim.duty, sim.time, sim.coil = net.labels, power, duty, t, history
+    sim.rms = net.rms[:, 0]
+    sim.peak = history.max(axis=1)
+    sim.steady = T_AMBIENT + rise
+    sim.steady_motor = T_AMBIENT + heat_avg * r_motor
+    sim.time_to_limit = np.where(over.any(axis=1), t[over.argmax(axis=1)], np.inf)
+    sim.compression_db = 10 * np.log10(1 + ALPHA_CU * rise)
+    return sim
@@ -0,0 +1,200 @@
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from . import cabin
+from .llm import chunk_text
+from .query import match_record, parse_power, parse_quantity
+
+# --- BUILD WARS TOURNAMENT ---
+# Builds are pre-scored from their resolved catalog specs and their predicted
+# in-car SPL (one vectorized cabin model pass for the whole field) to seed a
+# single elimination bracket. Every match of a round is judged by the AI at the same
+# time, and verdicts are memoized by the unordered pair of build descriptions, so
+# editing one build only replays the matches it takes part in.
+
+MAX_WORKERS = 8
+WINNER_PATTERN = re.compile(r"WINNER:\s*\**\s*([AB])\b", re.IGNORECASE)
+# Pre-score weights: predicted in-car SPL, usable power, displacement, value (watts per dollar)
+SCORE_WEIGHTS = (0.5, 0.15, 0.2, 0.15)
+SPL_SPAN_DB = 20.0   # a build this far below the loudest one gets no SPL credit
+
+
+class Entry:
+    __slots__ = ("index", "car", "sub", "power", "record", "quantity", "rms", "vd", "price_per_watt",
+                 "spl", "peak_hz", "curve", "score", "seed")
+
+    def __init__(self, index, car, sub, power, catalog, amplifiers=None):
+        self.index = index
+        self.car, self.sub, self.power = car.strip(), sub.strip(), power.strip()
+        self.record = match_record(catalog, sub) if sub.strip() else None
+        self.quantity = parse_quantity(sub)
+        rated = self.record.rms * self.quantity if self.record else None
+        self.rms = parse_power(power, amplifiers) or rated or 0.0
+        if self.record:
+            self.rms = min(self.rms, rated * 1.5)     # power the subs can't take does not count
+            sd, xmax = self.record.get("sd", 0), self.record.get("xmax", 0)
+            self.vd = self.quantity * sd * xmax / 1e4  # cm2 x mm -> litres
+            cost = self.record.price * self.quantity
+            self.price_per_watt = cost / self.rms if self.rms else None
+        else:
+            self.vd, self.price_per_watt = 0.0, None
+        self.spl = self.peak_hz = self.curve = None     # set by predict_spl
+        self.score = 0.0
+        self.seed = None
+
+    @property
+    def name(self):
+        return f"Build {self.index + 1}"
+
+    @property
+    def key(self):
+        # What the verdict depends on: editing any field gives a new key.
+        return f"{self.car} | {self.sub} | {self.power}".lower()
+
+    def describe(self):
+        text = f"{self.car}, {self.sub}, {self.power}"
+        if self.record:
+            text += (f" (resolved: {self.quantity}x {self.record.label}, {self.rms:,.0f} W usable, "
+                     f"Vd {self.vd:.2f} L"
+                     + (f", predicted in-car peak {self.spl:.1f} dB at {self.peak_hz:.0f} Hz" if self.spl else "")
+                     + f", pre-score {self.score:.2f})")
+        return text
+
+    def as_row(self):
+        return {
+            "Seed": self.seed, "Build": self.name, "Car": self.car, "Subwoofer": self.sub,
+            "Resolved": f"{self.quantity}x {self.record.label}" if self.record else "-",
+            "Usable RMS (W)": round(self.rms), "Vd (L)": round(self.vd, 2),
+            "In-car SPL (dB)": round(self.spl, 1) if self.spl else None,
+            "Peak (Hz)": round(self.peak_hz) if self.peak_hz else None,
+            "$/W": round(self.price_per_watt, 2) if self.price_per_watt else None,
+            "Pre-score": round(self.score, 3),
+        }
+
+
+def predict_spl(entries):
+    # Ported box at each driver's own alignment, usable power split over the subs
+    resolved = [e for e in entries if e.record and e.rms and e.record.get("sd") and e.record.get("vas")]
+    if not resolved:
+        return None
+    resp = cabin.predict_builds([e.record for e in resolved], [e.quantity for e in resolved],
+                                [e.rms / e.quantity for e in resolved], [e.car for e in resolved])
+    for i, e in enumerate(resolved):
+        e.spl, e.peak_hz, e.curve = float(resp.peak[i]), float(resp.peak_freq[i]), resp.spl[i]
+    return resp
+
+
+def pre_score(entries):
+    # Each metric normalized to the best entry, weighted, highest first.
+    predict_spl(entries)
+    best_spl = max((e.spl for e in entries if e.spl), default=0)
+    best_rms = max((e.rms for e in entries), default=0) or 1
+    best_vd = max((e.vd for e in entries), default=0) or 1
+    values = [1 / e.price_per_watt for e in entries if e.price_per_watt]
+    best_value = max(values, default=0) or 1
+    w_spl, w_rms, w_vd, w_value = SCORE_WEIGHTS
+    for e in entries:
+        value = 1 / e.price_per_watt if e.price_per_watt else 0
+        spl = max(0.0, 1 - (best_spl - e.spl) / SPL_SPAN_DB) if e.spl else 0
+        e.score = (w_spl * spl + w_rms * e.rms / best_rms + w_vd * e.vd / best_vd
+                   + w_value * value / best_value)
+    ranked = sorted(entries, key=lambda e: -e.score)
+    for seed, e in enumerate(ranked, 1):
+        e.seed = seed
+    return ranked
+
+
+def bracket_order(size):
+    # Standard seeding: 1 meets the lowest seed, and 1 and 2 can only meet in the final.
+    order = [1]
+    while len(order) < size:
+        n = len(order) * 2
+        order = [s for seed in order for s in (seed, n + 1 - seed)]
+    return order
+
+
+def pair_key(a, b):
+    return tuple(sorted((a.key, b.key)))
+
+
+def match_prompt(comparison_prompt, a, b):
+    # Always the same A/B order for a pair, whatever the bracket order.
+    first, second = sorted((a, b), key=lambda e: e.key)
+    return (f"{comparison_prompt}\n\nDATA:\nBuild A: {first.describe()}\nBuild B: {second.describe()}\n\n"
+            "This is one match of a knockout tournament. End with a single line: WINNER: A or WINNER: B"), first, second
+
+
+class Match:
+    __slots__ = ("a", "b", "winner", "verdict", "cached", "error")
+
+    def __init__(self, a, b):
+        self.a, self.b = a, b
+        self.winner, self.verdict, self.cached = None, "", False
+        self.error = None         # why the judge failed; the higher seed went through
+
+
+def judge_match(model, comparison_prompt, a, b):
+    prompt, first, second = match_prompt(comparison_prompt, a, b)
+    text = chunk_text(model.generate_content(prompt, site="build_wars"))
+    found = WINNER_PATTERN.findall(text)
+    if found:
+        winner = first if found[-1].upper() == "A" else second
+    else:
+        winner = max((a, b), key=lambda e: e.score)   # no clear verdict: higher seed goes through
+    return winner.key, text
+
+
+def run_tournament(ranked, judge, memo, max_workers=MAX_WORKERS, on_round=None):
+    """Play the bracket of `ranked`, the entries as seeded by pre_score (they are
+    only read here, so the page that scored them can keep rendering them).
+    `judge(a, b)` returns (winner key, verdict text) and is only called for pairs
+    missing from `memo` (pair key -> (winner key, text)). Verdicts are memoized as
+    they arrive; a failed judge call only costs its own match, which the higher
+    seed wins (Match.error says why, nothing is memoized). Returns the list of
+    rounds, each a list of Match."""
+    if len(ranked) < 2:
+        return []
+    size = 2 ** math.ceil(math.log2(len(ranked)))
+    by_seed = {e.seed: e for e in ranked}
+    alive = [by_seed.get(seed) for seed in bracket_order(size)]    # None = bye
+    rounds = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while len(alive) > 1:
+            matches, advancing = [], []
+            for a, b in zip(alive[::2], alive[1::2]):
+                if a is None or b is None:
+                    advancing.append(a or b)
+                    continue
+                matches.append(Match(a, b))
+                advancing.append(None)
+            todo = [m for m in matches if pair_key(m.a, m.b) not in memo]
+            futures = {pool.submit(judge, m.a, m.b): m for m in todo}
+            for future in as_completed(futures):
+                m = futures[future]
+                try:
+                    memo[pair_key(m.a, m.b)] = future.result()
+                except Exception as e:
+                    m.error = f"{type(e).__name__}: {e}"
+            slot = iter(matches)
+            for i, team in enumerate(advancing):
+                if team is not None:
+                    continue
+                m = next(slot)
+                m.cached = m not in futures.values()
+                if m.error:
+                    m.winner = max((m.a, m.b), key=lambda e: e.score)
+                    m.verdict = f"⚠️ The judge failed ({m.error}), the higher seed goes through."
+                else:
+                    winner_key, m.verdict = memo[pair_key(m.a, m.b)]
+                    m.winner = m.a if m.a.key == winner_key else m.b
+                advancing[i] = m.winner
+            rounds.append(matches)
+            if on_round:
+                on_round(len(rounds), matches)
+            alive = advancing
+    return rounds
+
+
+def round_name(remaining):
+    return {2: "Final", 4: "Semi-finals", 8: "Quarter-finals"}.get(remaining, f"Round of {remaining}")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The tests import the app's packages from the checkout, as tools/ does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
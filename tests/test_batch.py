@@ -0,0 +1,39 @@
+import json
+import os
+
+from alphaaudio.batch import main
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SPECS = [
+    {"id": "civic", "car": "2010 Honda Civic", "subwoofer": "2x Sundown Zv6 15", "power": "5000W"},
+    {"id": "tacoma", "car": "2018 Toyota Tacoma", "subwoofer": "Fi Car Audio MT 18", "power": "2x 1500W"},
+]
+
+
+def run_batch(tmp_path, output, metrics):
+    specs = tmp_path / "builds.jsonl"
+    specs.write_text("".join(json.dumps(s) + "\n" for s in SPECS))
+    return main([str(specs), "-o", str(output), "--data-dir", ROOT, "--fake", "--fake-latency", "0",
+                 "--rpm", "6000", "--metrics-file", str(metrics)])
+
+
+def read_rows(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_fake_batch_writes_results_and_resumes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)          # the guide index cache lands here
+    output, metrics = tmp_path / "results.jsonl", tmp_path / "metrics.prom"
+
+    assert run_batch(tmp_path, output, metrics) == 0
+    rows = read_rows(output)
+    assert sorted(r["id"] for r in rows) == ["civic", "tacoma"]
+    assert all(r["status"] == "ok" and r["outputs"] for r in rows)
+    text = metrics.read_text()
+    for site in ("architect", "structural", "thermal", "core"):
+        assert f'alphaaudio_llm_call_seconds_count{{site="{site}"}} 2' in text
+
+    # Same command again: every build is finished, nothing is appended
+    assert run_batch(tmp_path, output, metrics) == 0
+    assert read_rows(output) == rows
@@ -0,0 +1,20 @@
+import time
+
+from alphaaudio import jobs
+
+
+def broken_stream():
+    yield "Ported 3.5 ft³ "
+    raise RuntimeError("connection reset")
+
+
+def test_failed_stream_marks_its_step_failed():
+    queue = jobs.JobQueue(workers=1)
+    job = queue.submit("design", lambda job: job.stream("architect", broken_stream(), "Architect"))
+    deadline = time.time() + 5
+    while job.active and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert job.status == jobs.FAILED
+    assert str(job.error) == "connection reset"
+    assert job.snapshot() == [("architect", "Architect", jobs.FAILED, "Ported 3.5 ft³ ")]
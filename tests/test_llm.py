@@ -0,0 +1,39 @@
+import threading
+import time
+
+from alphaaudio.llm import ModelRegistry, StreamAbandonedError, fake_factory
+from alphaaudio.response_cache import ResponseCache
+
+PROMPT = "Pick a subwoofer for a 2010 Honda Civic"
+
+
+def test_abandoned_stream_is_neither_cached_nor_shared():
+    cache = ResponseCache(":memory:", version_fn=lambda: "v1")
+    registry = ModelRegistry(["fake-model"], fake_factory(0.02), cache=cache)
+    stream = registry.stream_content(PROMPT)
+    next(stream)
+
+    result = {}
+
+    def follow():
+        try:
+            result["text"] = "".join(registry.stream_content(PROMPT))
+        except StreamAbandonedError as e:
+            result["error"] = e
+
+    follower = threading.Thread(target=follow)
+    follower.start()
+    while registry.flights.coalesced == 0:
+        time.sleep(0.005)
+    stream.close()
+    follower.join(5)
+
+    assert "error" in result
+    assert cache.get("fake-model", PROMPT) is None
+
+
+def test_finished_stream_is_cached():
+    cache = ResponseCache(":memory:", version_fn=lambda: "v1")
+    registry = ModelRegistry(["fake-model"], fake_factory(0), cache=cache)
+    text = "".join(registry.stream_content(PROMPT))
+    assert text and cache.get("fake-model", PROMPT) == text
@@ -0,0 +1,24 @@
+import pytest
+
+from alphaaudio.query import parse_power
+
+
+@pytest.mark.parametrize("text, watts", [
+    ("5000", 5000.0),
+    ("5000W", 5000.0),
+    ("5,000 watts", 5000.0),
+    ("8k", 8000.0),
+    ("8 kW", 8000.0),
+    ("2x 1500W", 1500.0),          # quantity prefix
+    ("2 × 8K", 8000.0),
+    ("12V 5000W", 5000.0),         # voltage first
+    ("14.4V 1200 W RMS", 1200.0),
+    ("1500W @ 1 ohm", 1500.0),
+])
+def test_parse_power(text, watts):
+    assert parse_power(text) == watts
+
+
+@pytest.mark.parametrize("text", ["", None, "lots", "14.4V"])
+def test_parse_power_default(text):
+    assert parse_power(text, default=0.0) == 0.0
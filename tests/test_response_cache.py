@@ -0,0 +1,27 @@
+from alphaaudio.response_cache import ResponseCache
+
+PROMPT = "Pick a subwoofer for a 2010 Honda Civic"
+
+
+def test_processes_on_other_versions_keep_their_rows(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    old = ResponseCache(path, version_fn=lambda: "old")
+    new = ResponseCache(path, version_fn=lambda: "new")
+
+    old.put("fake-model", PROMPT, "built on the old catalogs")
+    new.put("fake-model", PROMPT, "built on the new catalogs")
+    assert new.get("fake-model", PROMPT) == "built on the new catalogs"
+
+    # A fresh process on the old files still finds its answer on disk
+    assert ResponseCache(path, version_fn=lambda: "old").get("fake-model", PROMPT) == "built on the old catalogs"
+    assert new.stats()["disk_entries"] == 2
+
+
+def test_unread_rows_of_other_versions_expire(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    ResponseCache(path, version_fn=lambda: "old").put("fake-model", PROMPT, "built on the old catalogs")
+    new = ResponseCache(path, version_fn=lambda: "new", stale_version_ttl=0)
+
+    new.put("fake-model", PROMPT, "built on the new catalogs")
+    assert new.stats()["disk_entries"] == 1
+    assert ResponseCache(path, version_fn=lambda: "old").get("fake-model", PROMPT) is None
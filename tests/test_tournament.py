@@ -0,0 +1,46 @@
+import os
+
+from alphaaudio import tournament
+from alphaaudio.pipeline import load_catalogs
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUILDS = [
+    ("2010 Honda Civic", "2x Sundown Zv6 15", "5000W"),
+    ("2018 Toyota Tacoma", "Fi Car Audio MT 18", "2x 1500W"),
+    ("2015 Ford F-150", "SoundQubed HDX4.218", "8k"),
+    ("2012 Chevy Tahoe", "Stereo Integrity DBX 18", "3000W"),
+]
+
+
+def seeded():
+    catalogs = load_catalogs(ROOT)
+    entries = [tournament.Entry(i, car, sub, power, catalogs.subwoofers, catalogs.amplifiers)
+               for i, (car, sub, power) in enumerate(BUILDS)]
+    return tournament.pre_score(entries)
+
+
+def test_failed_match_goes_to_higher_seed_and_entries_stay_untouched():
+    ranked = seeded()
+    before = [(e.seed, e.score) for e in ranked]
+    broken = tournament.pair_key(ranked[0], ranked[3])     # seeds 1 and 4 meet in round one
+
+    def judge(a, b):
+        if tournament.pair_key(a, b) == broken:
+            raise TimeoutError("judge timed out")
+        return min((a, b), key=lambda e: e.seed).key, "WINNER: A"
+
+    memo = {}
+    rounds = tournament.run_tournament(ranked, judge, memo)
+
+    assert [(e.seed, e.score) for e in ranked] == before
+    first = rounds[0]
+    assert [bool(m.error) for m in first].count(True) == 1
+    failed = next(m for m in first if m.error)
+    assert failed.winner is ranked[0] and not failed.cached
+    assert broken not in memo and len(memo) == 2
+    assert rounds[-1][0].winner is ranked[0]
+
+    # Only the failed match is judged again
+    calls = []
+    rounds = tournament.run_tournament(ranked, lambda a, b: calls.append((a, b)) or judge(a, b), memo)
+    assert len(calls) == 1
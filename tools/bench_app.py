@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# --- APP STARTUP / RERUN BENCHMARK ---
+# Drives the Streamlit app headless with streamlit.testing (no browser, no API
+# calls) and reports:
+#   * cold start: a fresh interpreter running the first script run, and which
+#     heavy SDKs that run imported
+#   * rerun: mean / p50 / max time of a full script rerun on every page
+#
+#   python tools/bench_app.py                 # the app in this checkout
+#   python tools/bench_app.py old/streamlit_app.py --reruns 50
+#
+# Run it against two checkouts to compare a change before/after.
+
+PAGES = ["welcome", "🎛️ Design Studio", "🧪 Gear Lab", "⚔️ Build Wars", "🎓 Beginner's Guide"]
+HEAVY_MODULES = ["google.generativeai", "fpdf", "pandas"]
+DEFAULT_APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "streamlit_app.py")
+
+
+def app_test(app):
+    from streamlit.testing.v1 import AppTest
+    os.chdir(os.path.dirname(os.path.abspath(app)))     # the app opens its JSON files relative to cwd
+    sys.path.insert(0, os.getcwd())
+    return AppTest.from_file(os.path.abspath(app), default_timeout=120)
+
+
+def cold_child(app):
+    # One first run in this (fresh) interpreter; prints JSON for the parent.
+    started = time.perf_counter()
+    at = app_test(app)
+    at.run()
+    elapsed = time.perf_counter() - started
+    print(json.dumps({"seconds": elapsed, "errors": len(at.exception),
+                      "loaded": [m for m in HEAVY_MODULES if m in sys.modules]}))
+
+
+def cold_start(app, runs):
+    samples, loaded = [], set()
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, os.path.abspath(__file__), app, "--cold-child"],
+                             capture_output=True, text=True, check=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        samples.append(result["seconds"])
+        loaded.update(result["loaded"])
+    return samples, sorted(loaded)
+
+
+def reruns(app, count):
+    at = app_test(app)
+    at.run()
+    timings = {}
+    for page in PAGES:
+        at.session_state["page"] = page
+        at.run()                                # warm the page's caches and imports
+        samples = []
+        for _ in range(count):
+            started = time.perf_counter()
+            at.run()
+            samples.append(time.perf_counter() - started)
+        if at.exception:
+            raise SystemExit(f"{page}: {at.exception[0].value}")
+        timings[page] = samples
+    return timings
+
+
+def ms(seconds):
+    return f"{seconds * 1000:7.1f} ms"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python tools/bench_app.py", description="Time app startup and reruns.")
+    parser.add_argument("app", nargs="?", default=DEFAULT_APP, help="path to streamlit_app.py")
+    parser.add_argument("--cold", type=int, default=3, help="fresh-interpreter starts (default: %(default)s)")
+    parser.add_argument("--reruns", type=int, default=20, help="reruns timed per page (default: %(default)s)")
+    parser.add_argument("--cold-child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.cold_child:
+        return cold_child(args.app)
+
+    samples, loaded = cold_start(args.app, args.cold)
+    print(f"cold start   median {ms(statistics.median(samples))}  max {ms(max(samples))}  (n={len(samples)})")
+    print(f"  heavy modules loaded at startup: {', '.join(loaded) or 'none'}")
+    for page, values in reruns(args.app, args.reruns).items():
+        print(f"rerun {page:<20} mean {ms(statistics.mean(values))}  p50 {ms(statistics.median(values))}  "
+              f"max {ms(max(values))}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,42 @@
+import argparse
+import os
+import sys
+import time
+
+# --- COLUMNAR CATALOG BUILD ---
+# Compiles every *_db.json catalog to the memory-mapped Arrow files the Gear Lab
+# tables read (.cache/catalogs/<name>.arrow). The app also compiles a stale file
+# itself on first view; run this at deploy time so no session waits for it.
+#
+#   python tools/build_catalogs.py            # only the files whose JSON changed
+#   python tools/build_catalogs.py --force    # all of them
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from alphaaudio import columnar  # noqa: E402
+from alphaaudio.pipeline import load_catalogs  # noqa: E402
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python tools/build_catalogs.py",
+                                     description="Compile the JSON catalogs to Arrow IPC files.")
+    parser.add_argument("--data-dir", default=ROOT, help="directory of the *_db.json files (default: the checkout)")
+    parser.add_argument("--out", default=None, help=f"output directory (default: <data-dir>/{columnar.DEFAULT_DIR})")
+    parser.add_argument("--force", action="store_true", help="recompile files that are up to date")
+    args = parser.parse_args(argv)
+    out = args.out or os.path.join(args.data_dir, columnar.DEFAULT_DIR)
+
+    catalogs = load_catalogs(args.data_dir)
+    for catalog in catalogs:
+        started = time.perf_counter()
+        path = os.path.join(out, f"{catalog.name}.arrow")
+        table = columnar.load_table(catalog, os.path.join(args.data_dir, columnar.SOURCES[catalog.name]), out,
+                                    force=args.force)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        print(f"{catalog.name:<12} {len(table):>8} rows  {len(table.columns):>3} columns  {size / 1024:8.1f} KiB  "
+              f"{(time.perf_counter() - started) * 1000:7.1f} ms  ({len(catalog.errors)} rows rejected)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
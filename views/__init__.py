@@ -0,0 +1,2 @@
+# Page modules of the Streamlit app: streamlit_app.py imports one on demand
+# and calls its render(). Shared state and LLM helpers live in views.common.
@@ -0,0 +1,34 @@
+import streamlit as st
+from views.common import DATA, get_job_queue, get_model_registry
+
+
+def render():
+    st.header("🛠️ Admin: LLM Metrics")
+    registry = get_model_registry()
+    st.caption(f"Per call site over the last {registry.metrics.ring.maxlen} calls (wall / TTFT in seconds). "
+               f"Current model: {registry.current_model or 'not resolved yet'}")
+    st.dataframe(registry.metrics.summary(), width="stretch")
+
+    a1, a2 = st.columns(2)
+    with a1:
+        st.markdown("**Upstream queue**")
+        st.json(registry.flow_report())
+        st.markdown("**Background jobs**")
+        st.json(get_job_queue().stats())
+        if registry.context_cache is not None:
+            st.markdown("**Cached catalog prefixes**")
+            st.json(registry.context_cache.stats())
+    with a2:
+        st.markdown("**Model health**")
+        st.dataframe(registry.health_report(), width="stretch")
+
+    st.markdown("**Data files** (reloaded on change)")
+    st.dataframe(DATA.status(), width="stretch")
+
+    st.markdown("**Recent calls**")
+    st.dataframe(registry.metrics.recent(100), width="stretch")
+
+    if st.button("📤 Export Prometheus file now"):
+        st.success(f"Written to {registry.metrics.export()}")
+    with st.expander("Prometheus text format"):
+        st.code(registry.metrics.to_prometheus(), language="text")
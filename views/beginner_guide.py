@@ -0,0 +1,304 @@
+import streamlit as st
+from alphaaudio import cabin
+from alphaaudio.context_cache import Prompt
+from alphaaudio.optimizer import optimize_builds
+from alphaaudio.query import parse_number
+from alphaaudio.serialize import beginner_catalog_text
+from views.common import BEGINNER_CATALOG_TOKEN_BUDGET, CATALOGS, get_working_model, part_input, show_job, submit_llm
+
+# --- TIER AND MODIFIER DEFINITIONS ---
+TIERS = {
+    "Budget SPL": {"name": "Budget SPL Warrior", "base_min": 800, "base_max": 2000, "desc": "Entry-level setup: Budget-friendly amp (e.g., Taramps), affordable subwoofer(s), and enclosure. Maximize loudness without premium component costs."},
+    "Essential": {"name": "Essential Sound", "base_min": 400, "base_max": 800, "desc": "Upgrades main speakers and adds a compact amp. A great step up from factory sound."},
+    "Enhanced": {"name": "Enhanced Fidelity", "base_min": 1000, "base_max": 2500, "desc": "Aftermarket headunit, component speakers, amplifier, and a dedicated subwoofer. Powerful, clear sound with deep bass."},
+    "Audiophile": {"name": "Audiophile Experience", "base_min": 2500, "base_max": 5000, "desc": "High-end speakers, multiple amps, DSP for precise tuning, and sound deadening. Ultimate clarity and impact."},
+    "Competition": {"name": "Competition Grade", "base_min": 5000, "base_max": 15000, "desc": "Top-of-the-line everything, custom fabrication, and major electrical upgrades. For winning competitions."}
+}
+MODIFIERS = {
+    "pro_install_percent": 0.25,
+    "simple_install_discount_percent": -0.05,
+    "luxury_percent": 0.40,
+    "aftermarket_radio_cost": 400,
+    "audiophile_percent": 0.30,
+    "spl_percent": 0.15,
+    "sql_percent": 0.20
+}
+
+
+def calculate_price_range(base_min, base_max, tier_name, goal_point):
+    # Setup, install and finish choices are read from the questionnaire widgets' session state
+    min_price, max_price = base_min, base_max
+
+    # Apply goal point modifier
+    if goal_point == "Audiophile (SQ)":
+        min_price *= (1 + MODIFIERS["audiophile_percent"])
+        max_price *= (1 + MODIFIERS["audiophile_percent"])
+    elif goal_point == "SPL (Bass)":
+        min_price *= (1 + MODIFIERS["spl_percent"])
+        max_price *= (1 + MODIFIERS["spl_percent"])
+    elif goal_point == "SQL (Balanced)":
+        min_price *= (1 + MODIFIERS["sql_percent"])
+        max_price *= (1 + MODIFIERS["sql_percent"])
+
+    # For Budget SPL tier, no additional headunit cost
+    if tier_name == "Budget SPL":
+        pass  # Budget tier is minimal
+    # Add headunit cost if needed for other tiers
+    elif st.session_state.bg_current_setup == "Stock" and tier_name in ["Enhanced", "Audiophile", "Competition"]:
+        min_price += MODIFIERS["aftermarket_radio_cost"]
+        max_price += MODIFIERS["aftermarket_radio_cost"]
+
+    # Pro install cost
+    if st.session_state.bg_installation_plan == "Professional Install":
+        install_mod = MODIFIERS["pro_install_percent"]
+        if st.session_state.bg_install_complexity:
+             install_mod += MODIFIERS["simple_install_discount_percent"]
+        min_price *= (1 + install_mod)
+        max_price *= (1 + install_mod)
+
+    # Luxury finish cost
+    if st.session_state.bg_aesthetic_focus == "Luxury/Beauty Finish":
+        min_price *= (1 + MODIFIERS["luxury_percent"])
+        max_price *= (1 + MODIFIERS["luxury_percent"])
+
+    return min_price, max_price
+
+
+def calculate_price(base_min, base_max, tier_name, goal_point):
+    min_price, max_price = calculate_price_range(base_min, base_max, tier_name, goal_point)
+    return f"${int(min_price):,} - ${int(max_price):,}"
+
+
+# --- DYNAMIC PACKAGE CARDS ---
+# A fragment: selecting a tier reruns the cards alone. Changing a questionnaire
+# answer still reruns the whole page, which redraws the prices.
+@st.fragment
+def price_cards():
+    card_cols = st.columns(len(TIERS))
+
+    for i, (tier_key, tier_info) in enumerate(TIERS.items()):
+        with card_cols[i]:
+            is_selected = (st.session_state.bg_selected_tier == tier_key)
+            with st.container(border=True):
+                st.markdown(f"#### {tier_info['name']}")
+                price_range = calculate_price(tier_info['base_min'], tier_info['base_max'], tier_key, st.session_state.bg_goal_point)
+                st.markdown(f"**Price Range:** {price_range}")
+                st.markdown(f"<small>{tier_info['desc']}</small>", unsafe_allow_html=True)
+
+                # Use a callback to set the selected tier
+                if st.button(f"Select {tier_key}", key=f"select_{tier_key}", type="primary" if is_selected else "secondary", use_container_width=True):
+                    st.session_state.bg_selected_tier = tier_key
+                    st.rerun(scope="fragment") # Rerun the cards only to update the button styles
+
+    st.info(f"**Selected Package:** {st.session_state.bg_selected_tier}")
+
+
+def render():
+    st.header("🎓 Beginner's Guide: System Questionnaire")
+    st.write("Configure your preferences below. The package prices will update in real-time based on your choices. Finally, select a package and build your plan.")
+    # Tutorial removed: interactive tutorial with hovering windows was reverted per user request.
+
+    # --- INITIALIZE SESSION STATE FOR SELECTIONS ---
+    if 'bg_selected_tier' not in st.session_state:
+        st.session_state.bg_selected_tier = "Enhanced" # Default selection
+
+    # --- INTERACTIVE CONTROLS (OUTSIDE THE FORM) ---
+    st.subheader("Your Listening Style & Vehicle")
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        music_genres = st.multiselect(
+            "Music Genres",
+            ["Rock", "Pop", "Hip-Hop / Rap", "Electronic (EDM)", "Country", "Jazz / Classical", "Metal", "Other"],
+            key="bg_music_genres",
+            help="Select the music you listen to most. This helps the AI choose components (like subwoofers and speakers) that are best suited for your taste."
+        )
+        sound_preference = st.radio(
+            "Sound Preference",
+            ("Balance", "Bass", "Clarity"),
+            key="bg_sound_preference", horizontal=True,
+            help="Tell us what's most important to you. 'Balance' for an all-around system. 'Bass' for deep, powerful lows. 'Clarity' for crisp, detailed highs and vocals."
+        )
+    with c2:
+        car_info, _ = part_input("Make, Model, Year", "bg_car_info", cabin.resolve_vehicle, replace=cabin.replace_vehicle, missing=None, placeholder="e.g., 2015 Ford F-150", help="Enter your vehicle's details. This helps determine available space, and potential need for specific integrations (like a new headunit or processor).")
+        current_setup = st.radio(
+            "Current Setup",
+            ("Stock", "Aftermarket HU", "Aftermarket Speakers"),
+            key="bg_current_setup", horizontal=True,
+            help="Let us know what's already in your car. 'Stock' means no changes. If you have an 'Aftermarket HU' (Headunit/Radio) or 'Speakers', the AI will factor that into the plan."
+        )
+    with c3:
+        loudness_preference = st.select_slider("Loudness Goal", options=["Subtle", "Lively", "Loud", "Very Loud", "Competition"], key="bg_loudness", help="How loud do you want it? 'Subtle' is just above stock. 'Lively' is for spirited driving. 'Loud' and 'Very Loud' require significant power and component upgrades. 'Competition' is for extreme performance.")
+
+
+    st.subheader("Installation & Aesthetics")
+    c4, c5, c6 = st.columns(3)
+    with c4:
+        installation_plan = st.radio(
+            "Installation Plan",
+            ("DIY (Do-It-Yourself)", "Professional Install"),
+            key="bg_installation_plan",
+            help="Choose 'DIY' if you plan to install the system yourself. Choose 'Professional Install' to have an expert do it, which will add a significant cost percentage to the final estimate."
+        )
+        goal_point = st.radio(
+            "Goal Point",
+            ("Audiophile (SQ)", "SPL (Bass)", "SQL (Balanced)"),
+            key="bg_goal_point",
+            help="Define your primary audio goal. 'Audiophile' focuses on pristine sound quality. 'SPL' focuses on maximum loudness and bass. 'SQL' provides a mix of quality and loudness."
+        )
+
+    with c5:
+        aesthetic_focus = st.radio(
+            "Aesthetic Goal",
+            ("Function over form", "Luxury/Beauty Finish"),
+            key="bg_aesthetic_focus",
+            help="Choose 'Function over form' for a basic, hidden installation. Choose 'Luxury/Beauty Finish' for custom fabrication, lighting, and premium materials, which increases the cost."
+        )
+    
+    with c6:
+        decibel_goal = st.text_input(
+            "Decibel Goal (dB)",
+            key="bg_decibel_goal",
+            placeholder="e.g., 140 (Optional)",
+            help="Enter a specific decibel number you want to achieve. Leave empty if you want the AI to recommend a level based on your other choices. This will influence component selection."
+        )
+        install_complexity = st.checkbox(
+            "Keep the install simple?",
+            key="bg_install_complexity",
+            value=True,
+            help="Check this to prioritize components and designs that are easier to install, avoiding complex custom fabrication like fiberglass or welded metal racks."
+        )
+
+    st.subheader("Subwoofer Enclosure & Component Strategy")
+    c7, c8 = st.columns(2)
+    with c7:
+        enclosure_type = st.selectbox(
+            "Enclosure Type",
+            ("Sealed", "Ported (Vented)", "4th Order Bandpass", "6th Order Bandpass", "No Wall (Free Air)", "Trunk Wall (Reflected)", "B-Pillar/C-Pillar Wall"),
+            key="bg_enclosure_type",
+            help="Choose the enclosure design based on your vehicle and sound goals. Sealed = accurate, tight bass. Ported = louder, boomy bass. Bandpass = extreme SPL. No Wall = flex and power. Wall setups = space efficiency."
+        )
+    with c8:
+        component_strategy = st.selectbox(
+            "Component Budget Strategy",
+            ("Balanced", "Amp & Enclosure Focus (Budget Parts)", "Speaker Quality Focus (Economy Amp)"),
+            key="bg_component_strategy",
+            help="'Balanced' = equal budget across amp, sub, enclosure. 'Amp & Enclosure Focus' = save on sub quality, invest in amp & enclosure for extreme SPL. 'Speaker Quality Focus' = budget amp, invest in high-quality subwoofers and processing."
+        )
+    st.divider()
+
+    # --- DYNAMIC PACKAGE CARDS ---
+    st.subheader("Select Your Project Tier")
+
+    price_cards()
+    st.divider()
+
+    # --- SUBMISSION FORM ---
+    with st.form("beginner_submission"):
+        submitted = st.form_submit_button("Build My Plan", use_container_width=True, type="primary")
+
+        if submitted:
+            # The questionnaire answers of this run feed the optimizer and the prompt
+            selected_tier_info = TIERS[st.session_state.bg_selected_tier]
+            final_price_range = calculate_price(selected_tier_info['base_min'], selected_tier_info['base_max'], st.session_state.bg_selected_tier, goal_point)
+            final_min_price, final_max_price = calculate_price_range(selected_tier_info['base_min'], selected_tier_info['base_max'], st.session_state.bg_selected_tier, goal_point)
+
+            model = get_working_model()
+            if model:
+                with st.spinner("Searching Gear Lab and building two systems for you..."):
+                    # Consolidate user questionnaire data
+                    questionnaire_data = (
+                        f"Music Genres: {', '.join(music_genres)}\n"
+                        f"Sound Preference: {sound_preference}\n"
+                        f"Loudness Preference: {loudness_preference}\n"
+                        f"Vehicle: {car_info}\n"
+                        f"Current Setup: {current_setup}\n"
+                        f"Selected Tier: {selected_tier_info['name']}\n"
+                        f"Estimated Final Price Range: {final_price_range}\n"
+                        f"Installation Plan: {installation_plan}\n"
+                        f"Keep Install Simple: {'Yes' if install_complexity else 'No'}\n"
+                        f"Aesthetic Goal: {aesthetic_focus}\n"
+                        f"Goal Point: {goal_point}\n"
+                        f"Decibel Goal: {st.session_state.bg_decibel_goal if st.session_state.bg_decibel_goal else 'Not Specified'}\n"
+                        f"Enclosure Type: {enclosure_type}\n"
+                        f"Component Budget Strategy: {component_strategy}"
+                    )
+
+                    # Local search picks the parts; the AI only has to explain them
+                    builds, evaluated = optimize_builds(
+                        CATALOGS, final_min_price, final_max_price, st.session_state.bg_selected_tier,
+                        goal_point, enclosure_type,
+                        headunit_cost=MODIFIERS["aftermarket_radio_cost"] if current_setup == "Stock" else 0,
+                        car=car_info)
+                    if builds:
+                        st.caption(f"Optimizer checked {evaluated} complete builds within budget, best {len(builds)} shown.")
+                        st.dataframe([b.as_row() for b in builds], width="stretch")
+                        builds_text = "\n".join(f"BUILD {i + 1}: {b.describe()}" for i, b in enumerate(builds))
+                        # Decibel Goal checked against the cabin model instead of left to the AI
+                        decibel_goal = parse_number(st.session_state.bg_decibel_goal)
+                        if decibel_goal:
+                            loudest = max(b.in_car for b in builds)
+                            if loudest >= decibel_goal:
+                                check = f"reachable: the loudest build is predicted at {loudest:.1f} dB"
+                                st.success(f"🎯 Decibel goal {decibel_goal:.0f} dB is {check}.")
+                            else:
+                                check = (f"NOT reachable within this budget: the loudest build is predicted at "
+                                         f"{loudest:.1f} dB, {decibel_goal - loudest:.1f} dB short")
+                                st.warning(f"🎯 Decibel goal {decibel_goal:.0f} dB is {check}.")
+                            builds_text += f"\nDECIBEL GOAL CHECK (local cabin model): {decibel_goal:.0f} dB is {check}."
+                        # Fixed instructions first (the cacheable prefix), this user's answers after
+                        beginner_prompt = Prompt("""
+You are a world-class car audio system designer for beginners. A local optimizer has already chosen the builds below from the Gear Lab databases so that they fit the user's budget, goal and enclosure type. Your task is to present and explain them.
+
+**CRITICAL INSTRUCTIONS:**
+1.  **Keep the Chosen Parts:** Do not swap, add or remove the listed subwoofers, amplifiers, headunits, processors or battery banks. The prices, SPL estimates and decibel goal check are computed, repeat them as given.
+2.  **Name Each Build:** Give each build a descriptive name (e.g., "The Clarity Build," "The Budget Basshead Build").
+3.  **Explain Your Choices:** For each component, briefly explain WHY it fits the user's goals (music taste, loudness, budget, enclosure type, component strategy, etc.) and how the builds differ.
+4.  **Handle Missing Components:** Parts the builds do not cover (door speakers, wiring kit, sound deadening) must be listed as a *type* and *size* with an estimated price, added to the build's total.
+5.  **Output Format:** Present the builds clearly and separately. Use Markdown for formatting (e.g., headers, bold text, lists).
+""", f"""
+**USER'S QUESTIONNAIRE:**
+---
+{questionnaire_data}
+---
+
+**OPTIMIZED BUILDS:**
+---
+{builds_text}
+---
+""", "beginner_builds")
+                    else:
+                        # Nothing fits the range: let the AI pick from the compact catalog instead
+                        catalog_text = beginner_catalog_text(CATALOGS, st.session_state.bg_selected_tier, goal_point, final_max_price, BEGINNER_CATALOG_TOKEN_BUDGET)
+                        beginner_prompt = Prompt("""
+You are a world-class car audio system designer for beginners. Your task is to create two complete, distinct car audio systems based on the user's preferences and budget, using the provided equipment databases.
+
+**CRITICAL INSTRUCTIONS:**
+1.  **Use Provided Databases:** You MUST select specific components (subwoofers, amplifiers, headunits, processors) from the JSON databases provided below. Do not invent components.
+2.  **Create Two Distinct Builds:** Design two different system options that fit the user's goals. For example, one focused more on sound quality (SQ) and one on loudness/bass (SPL), or two different brands. Give each build a descriptive name (e.g., "The Clarity Build," "The Budget Basshead Build").
+3.  **Respect Enclosure & Strategy:** The user has specified an enclosure type (e.g., sealed, ported, bandpass, no-wall, trunk-wall) and a component budget strategy. Use these to guide your recommendations:
+    - If "Amp & Enclosure Focus": Prioritize affordable but powerful amps (like Taramps) and excellent enclosure design. Sub quality is secondary.
+    - If "Speaker Quality Focus": Recommend high-quality subwoofers with a quality amp, but an economy-grade amplifier.
+    - If "Balanced": Spread the budget equally across amp, sub, and enclosure quality.
+4.  **Stay Within Budget:** The total cost of the components for each build MUST fall within the user's "Estimated Final Price Range". You must show the estimated total price for each build.
+5.  **Explain Your Choices:** For each component in each build, briefly explain WHY you chose it and how it fits the user's goals (music taste, loudness, budget, enclosure type, strategy, etc.).
+6.  **Handle Missing Components:** The databases may not include all necessary parts (like door speakers or wiring kits). If a required component is not in the database, you must:
+    a. Recommend a *type* and *size* of component (e.g., "6.5-inch Component Speakers").
+    b. Suggest a reasonable estimated price for that missing item.
+    c. Include this estimated price in the build's total cost.
+7.  **Output Format:** Present the two builds clearly and separately. Use Markdown for formatting (e.g., headers, bold text, lists).
+""", f"""
+**USER'S QUESTIONNAIRE:**
+---
+{questionnaire_data}
+---
+
+**COMPONENT DATABASES (GEAR LAB):**
+Each table starts with its column names; every following line is one component, fields separated by "|" (Y/N = yes/no).
+---
+{catalog_text}
+---
+""", "beginner_catalog")
+                    
+                    # Generate the recommendation in the background
+                    submit_llm(model, beginner_prompt, "beginner_guide", "Writing your build plan...")
+    show_job("beginner_guide")
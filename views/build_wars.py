@@ -0,0 +1,93 @@
+import pandas as pd
+import streamlit as st
+from alphaaudio import cabin, enclosure, tournament
+from views.common import (CATALOGS, MAX_BUILDS, PROMPTS, get_working_model, job_running, part_input,
+                          show_job, submit_job, submit_llm)
+
+
+def tournament_job(job, model, ranked, memo):
+    # `ranked` was seeded by the page before submitting and is only read here.
+    # Every judge call holds one of the shared upstream slots, like streamed answers.
+    def judge(a, b):
+        with job.upstream():
+            return tournament.judge_match(model, PROMPTS.get("COMPARISON_PROMPT"), a, b)
+
+    def on_round(r, matches):
+        failed = sum(1 for m in matches if m.error)
+        job.step("rounds", "🏆 Running tournament...", text=f"Round {r}: {len(matches)} matches decided"
+                 + (f", {failed} by seed after a judge error" if failed else ""))
+
+    return {"entries": ranked, "rounds": tournament.run_tournament(ranked, judge, memo, on_round=on_round)}
+
+
+def render():
+    st.header("⚔️ Build Wars: The Arena")
+    
+    num_builds = st.slider("How many builds?", 2, MAX_BUILDS, 2)
+    # Up to 4 builds fight in one comparison; bigger fields play a seeded knockout bracket
+    tournament_mode = st.toggle("🏆 Tournament mode", value=num_builds > 4, disabled=num_builds > 4,
+                                help="Seeds a bracket from local specs and judges every match of a round in parallel.")
+    tournament_mode = tournament_mode or num_builds > 4
+    
+    # Dynamic Columns for Inputs
+    build_data = []
+    entries = []
+    for row_start in range(0, num_builds, 4):
+        cols = st.columns(4 if num_builds > 4 else num_builds)
+        for i, col in zip(range(row_start, min(row_start + 4, num_builds)), cols):
+            with col:
+                st.subheader(f"Build #{i+1}")
+                c_model, _ = part_input(f"Car #{i+1}", f"c{i}", cabin.resolve_vehicle,
+                                        replace=cabin.replace_vehicle, missing=None)
+                c_sub, _ = part_input(f"Sub #{i+1}", f"s{i}", CATALOGS.subwoofers.resolve)
+                c_pwr, _ = part_input(f"Power #{i+1}", f"p{i}", CATALOGS.amplifiers.resolve, missing=None)
+                build_data.append(f"Build {i+1}: {c_model}, {c_sub}, {c_pwr}")
+                if c_model.strip() or c_sub.strip():
+                    entries.append(tournament.Entry(i, c_model, c_sub, c_pwr, CATALOGS.subwoofers, CATALOGS.amplifiers))
+
+    # --- INSTANT RANKING (local enclosure + cabin gain model, no AI) ---
+    ranked = tournament.pre_score(entries)
+    if any(e.spl for e in ranked):
+        with st.expander("📊 Instant ranking: predicted in-car SPL", expanded=True):
+            st.dataframe([e.as_row() for e in ranked], width="stretch")
+            st.line_chart(pd.DataFrame({f"{e.name}: {e.sub}": e.curve for e in ranked if e.spl},
+                                       index=enclosure.DEFAULT_FREQS.round(1)))
+    # Resolved builds carry their predicted SPL into the AI comparison
+    for e in ranked:
+        build_data[e.index] = f"Build {e.index + 1}: {e.describe()}"
+
+    busy = job_running("build_wars") or job_running("tournament")
+    if st.button("🚀 FIGHT!", type="primary", width="stretch", disabled=busy):
+        model = get_working_model()
+        if model and not tournament_mode:
+            combined_data = "\n".join(build_data)
+            submit_llm(model, f"{PROMPTS.get('COMPARISON_PROMPT')}\n\nDATA:\n{combined_data}", "build_wars", "Simulating Battle...", "success")
+        elif model and len(entries) < 2:
+            st.warning("Fill in at least two builds for a tournament.")
+        elif model:
+            save = lambda job: st.session_state.update(tournament=job.result)
+            submit_job("tournament", tournament_job, model, ranked, st.session_state['tournament_verdicts'],
+                       label="🏆 Running tournament...", keep=False, on_done=save)
+    show_job("tournament" if tournament_mode else "build_wars")
+
+    results = st.session_state.get('tournament')
+    if tournament_mode and results and results["rounds"]:
+        st.markdown("### Seeding (local pre-score)")
+        st.dataframe([e.as_row() for e in sorted(results["entries"], key=lambda e: e.seed)], width="stretch")
+        rounds = results["rounds"]
+        for r, matches in enumerate(rounds, 1):
+            field = 2 ** (len(rounds) - r + 1)
+            failed = sum(1 for m in matches if m.error)
+            judged = sum(1 for m in matches if not m.cached and not m.error)
+            st.markdown(f"#### {tournament.round_name(field)} ({judged} judged, {len(matches) - judged - failed} "
+                        f"from memory" + (f", {failed} failed" if failed else "") + ")")
+            for m in matches:
+                flag = " ⚠️" if m.error else ""
+                with st.expander(f"{m.a.name} (#{m.a.seed}) vs {m.b.name} (#{m.b.seed}) ➜ {m.winner.name}{flag}"):
+                    st.markdown(m.verdict)
+        failed = sum(1 for matches in rounds for m in matches if m.error)
+        if failed:
+            st.warning(f"⚠️ {failed} match{'es' if failed > 1 else ''} went to the higher seed because the judge "
+                       "failed. FIGHT again to retry them.")
+        champion = rounds[-1][0].winner
+        st.success(f"🏆 Champion: {champion.name}: {champion.car}, {champion.sub}, {champion.power}")
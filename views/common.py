@@ -0,0 +1,368 @@
+import streamlit as st
+import logging
+from alphaaudio import columnar, datastore, guides, jobs
+from alphaaudio.agents import design_studio_dag, retune_prompt
+from alphaaudio.catalog import Catalogs
+from alphaaudio.context_cache import GeminiContextCache
+from alphaaudio.datastore import DataFile, DataStore
+from alphaaudio.jobs import JobQueue
+from alphaaudio.llm import ModelRegistry, gemini_factory
+from alphaaudio.metrics import Metrics
+from alphaaudio.ratelimit import DEFAULT_RPM, DEFAULT_TPM, RateLimiter
+from alphaaudio.response_cache import ResponseCache
+from alphaaudio.serialize import SNAPSHOT_TOKEN_BUDGET, catalog_snapshot
+
+# --- SHARED APP STATE ---
+# Imported once per process: databases, catalogs, prompts and the LLM helpers
+# every page uses. Page modules import what they need from here.
+
+# --- CONFIGURATION ---
+# Try/Except block to handle local vs cloud secrets safely
+try:
+    API_KEY = st.secrets["api"]
+except:
+    # Fallback for local testing if secrets.toml isn't found
+    # You can also set an environment variable or hardcode for local dev
+    API_KEY = "YOUR_FALLBACK_KEY_HERE" 
+
+# Engine modules log prompt sizes and timings at INFO
+logging.basicConfig(format="%(asctime)s %(name)s %(levelname)s: %(message)s")
+logging.getLogger("alphaaudio").setLevel(logging.INFO)
+
+# --- LOAD DATABASES ---
+# Each JSON file is cached on its own with its mtime / size and checked against a
+# schema. refresh_data() runs at the top of every rerun: it stats the files and
+# reloads only the edited ones. A broken file keeps its last good version (its
+# default at first start) and is reported in the sidebar.
+DEFAULT_MODELS = ["gemini-1.5-flash", "gemini-1.5-flash-latest", "gemini-1.5-pro"]
+DEFAULT_PROMPTS = {
+    "ARCHITECT_PROMPT": "You are the AUDIO ARCHITECT. Design enclosure based on inputs. Output specs list.",
+    "STRUCTURAL_PROMPT": "You are the STRUCTURAL ANALYST. Predict damage based on power/tolerance.",
+    "THERMAL_PROMPT": "You are the THERMAL PHYSICIST. Predict coil meltdown and voltage issues.",
+    "CORE_PROMPT": "You are ALPHAAUDIO CORE. Synthesize reports into a GO/NO-GO verdict.",
+    "RECOMMENDER_PROMPT": "You are the GEAR LAB ASSISTANT.\nTask: Pick the BEST subwoofers from the provided DATABASE based on user needs.\nInput: User Preferences + Database List.\nOutput: The top 3 choices, explaining WHY they fit the goal.",
+    "COMPARISON_PROMPT": "You are the COMPARISON ENGINE. Compare these builds side-by-side and declare a winner for the specific goal."
+}
+
+@st.cache_resource # One store per process, shared by every session
+def get_data_store():
+    return DataStore([
+        DataFile("subwoofers", "Subwoofer_db.json", [], datastore.SUBWOOFERS_SCHEMA),
+        DataFile("models", "models.json", DEFAULT_MODELS, datastore.MODELS_SCHEMA),
+        DataFile("prompts", "design_prompts.json", DEFAULT_PROMPTS, datastore.PROMPTS_SCHEMA),
+        DataFile("amplifiers", "amplifiers_db.json", [], datastore.AMPLIFIERS_SCHEMA),
+        DataFile("battery_electrical", "battery_electrical_db.json",
+                 {"batteries": [], "alternators": [], "wiring_guides": []}, datastore.BATTERY_ELECTRICAL_SCHEMA),
+        DataFile("headunits_processors", "headunits_processors_db.json",
+                 {"headunits": [], "processors": []}, datastore.HEADUNITS_PROCESSORS_SCHEMA),
+        DataFile("wiring_guide", "wiring_guide.json", {}, datastore.WIRING_GUIDE_SCHEMA),
+    ])
+
+DATA = get_data_store()
+
+# Data file -> catalogs built from it (a whole file for the flat ones)
+CATALOG_FILES = {
+    "subwoofers": ["subwoofers"],
+    "amplifiers": ["amplifiers"],
+    "battery_electrical": ["batteries", "alternators"],
+    "headunits_processors": ["headunits", "processors"],
+}
+
+CATALOG_KEYS = {name: key for key, names in CATALOG_FILES.items() for name in names}
+
+def catalog_rows(key, name):
+    value = DATA[key]
+    return value if isinstance(value, list) else value.get(name, [])
+
+# Typed, indexed catalogs: built once per process (cache_resource, not copied per rerun)
+@st.cache_resource
+def load_catalogs():
+    return Catalogs(DATA["subwoofers"], DATA["amplifiers"], DATA["battery_electrical"], DATA["headunits_processors"])
+
+CATALOGS = load_catalogs()
+
+# Compact text of every catalog: the stable, cached prefix of the recommender prompts
+@st.cache_resource
+def load_snapshots():
+    return {c.name: catalog_snapshot(c.name, c.rows, SNAPSHOT_TOKEN_BUDGET) for c in CATALOGS}
+
+SNAPSHOTS = load_snapshots()
+
+# BM25 index over the wiring guide and electrical tips, saved to disk once built
+def build_guide_index():
+    return guides.load_index(guides.INDEX_PATH, guides.guide_passages(DATA["wiring_guide"], DATA["battery_electrical"]))
+
+@st.cache_resource
+def load_guide_index():
+    return build_guide_index()
+
+GUIDES = load_guide_index()
+
+# Prompts and models are read through these live objects, updated in place on reload
+@st.cache_resource
+def load_prompts():
+    return dict(DATA["prompts"])
+
+PROMPTS = load_prompts()
+
+@st.cache_resource
+def load_design_dag():
+    return design_studio_dag(PROMPTS)
+
+DESIGN_DAG = load_design_dag()
+
+# --- INCREMENTAL REBUILDS ---
+# The objects above are process-wide and mutated in place, so pages that imported
+# them see the new data; each subscriber only rebuilds what its files feed.
+def _reload_catalogs(changed):
+    for key in changed:
+        for name in CATALOG_FILES[key]:
+            catalog = CATALOGS.reload(name, catalog_rows(key, name))
+            SNAPSHOTS[name] = catalog_snapshot(name, catalog.rows, SNAPSHOT_TOKEN_BUDGET)
+
+def _reload_guides(changed):
+    GUIDES.replace(build_guide_index())
+
+def _reload_prompts(changed):
+    PROMPTS.clear()
+    PROMPTS.update(DATA["prompts"])
+    dag = design_studio_dag(PROMPTS)
+    DESIGN_DAG.agents, DESIGN_DAG.order = dag.agents, dag.order
+
+def _reload_models(changed):
+    get_model_registry().set_models(DATA["models"])
+
+DATA.subscribe("catalogs", CATALOG_FILES, _reload_catalogs)
+DATA.subscribe("guides", ["wiring_guide", "battery_electrical"], _reload_guides)
+DATA.subscribe("prompts", ["prompts"], _reload_prompts)
+DATA.subscribe("models", ["models"], _reload_models)
+
+def refresh_data():
+    # One stat() per file at most once a second; returns the keys reloaded
+    return DATA.refresh()
+
+# --- HELPER FUNCTIONS ---
+LLM_CACHE_PATH = ".cache/llm_responses.sqlite"
+METRICS_PATH = ".cache/metrics.prom" # Prometheus text file, rewritten every few seconds while calls happen
+BEGINNER_CATALOG_TOKEN_BUDGET = 3000 # max estimated tokens of catalog pasted into the Beginner's Guide prompt
+MAX_BUILDS = 64 # Build Wars field size (tournament mode above 4)
+LLM_RPM = DEFAULT_RPM # Gemini quota shared by all sessions: requests / minute
+LLM_TPM = DEFAULT_TPM # and tokens / minute
+JOB_WORKERS = 8 # background LLM jobs running at once, all sessions together
+MAX_UPSTREAM_CALLS = 6 # Gemini calls in flight at once, all jobs together
+JOB_POLL_INTERVAL = 1.0 # seconds between two progress refreshes of a running job
+PREFIX_CACHE_TTL = 3600 # seconds a cached catalog prefix lives upstream (storage is billed per hour)
+
+# Process-wide registry: shared by every session, resolved by the first real call
+# instead of probing Gemini on each rerun.
+@st.cache_resource
+def get_model_registry():
+    # Answers are cached on disk keyed by model + prompt + *_db.json versions; one
+    # rate limiter for every session keeps the whole app under the API quota.
+    # Catalog prefixes are registered upstream once and then sent by handle.
+    return ModelRegistry(DATA["models"], gemini_factory(API_KEY), cache=ResponseCache(LLM_CACHE_PATH),
+                         limiter=RateLimiter(rpm=LLM_RPM, tpm=LLM_TPM), metrics=Metrics(export_path=METRICS_PATH),
+                         context_cache=GeminiContextCache(ttl=PREFIX_CACHE_TTL))
+
+def get_working_model():
+    try:
+        return get_model_registry()
+    except Exception as e:
+        st.error(f"API Key Error: {e}")
+        return None
+
+# Jobs live in the process-wide queue, the session only keeps their ids in
+# st.session_state['jobs'] (slot -> entry), so reruns don't abort them.
+@st.cache_resource
+def get_job_queue():
+    return JobQueue(workers=JOB_WORKERS, max_upstream=MAX_UPSTREAM_CALLS)
+
+def submit_job(slot, fn, *args, label=None, render="markdown", keep=True, on_done=None):
+    # Runs fn(job, *args) in the background. `on_done(job)` is applied to this
+    # session once the job succeeds; `keep` leaves the final text on the page.
+    job = get_job_queue().submit(slot, fn, *args, label=label)
+    st.session_state['jobs'][slot] = {"id": job.id, "render": render, "keep": keep, "on_done": on_done,
+                                      "applied": False}
+    return job
+
+def collect_jobs():
+    # Applies every finished job of this session once, before the page renders.
+    queue = get_job_queue()
+    for slot, entry in list(st.session_state['jobs'].items()):
+        job = queue.get(entry["id"])
+        if job is None:
+            del st.session_state['jobs'][slot]   # evicted from the queue
+        elif not job.active and not entry["applied"]:
+            entry["applied"] = True
+            if job.status == jobs.DONE and entry["on_done"]:
+                entry["on_done"](job)
+
+def job_running(slot):
+    entry = st.session_state['jobs'].get(slot)
+    job = entry and get_job_queue().get(entry["id"])
+    return bool(job and job.active)
+
+def running_jobs():
+    queue = get_job_queue()
+    return [job for job in map(queue.get, (e["id"] for e in st.session_state['jobs'].values()))
+            if job is not None and job.active]
+
+STEP_STATES = {jobs.DONE: "complete", jobs.FAILED: "error"}
+
+def render_job(job, render="markdown", keep=True):
+    steps = job.snapshot()
+    if job.active:
+        st.caption(f"⏳ {job.label} ({job.status}, {job.elapsed:.0f}s)")
+    if len(steps) == 1 and steps[0][2] != jobs.FAILED:
+        if job.active or keep:
+            getattr(st, render)(steps[0][3] or "...")
+    else:
+        for name, label, state, text in steps:
+            if job.active or keep or state == jobs.FAILED:
+                with st.status(label, state=STEP_STATES.get(state, "running"), expanded=state != jobs.DONE):
+                    st.markdown(text)
+    if job.status == jobs.FAILED:
+        st.error(str(job.error))
+
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def job_progress(job_id, render):
+    job = get_job_queue().get(job_id)
+    if job is None or not job.active:
+        st.rerun()   # full rerun: collect_jobs applies the result to every part of the page
+    render_job(job, render)
+
+def show_job(slot):
+    # Live progress while the job runs (polled in a fragment), then its result.
+    entry = st.session_state['jobs'].get(slot)
+    job = entry and get_job_queue().get(entry["id"])
+    if not job:
+        return
+    if job.active:
+        job_progress(job.id, entry["render"])
+    else:
+        render_job(job, entry["render"], entry["keep"])
+
+def stream_job(job, model, prompt, site, cache=True, **options):
+    return job.stream(site, model.stream_content(prompt, cache=cache, site=site, **options)).text
+
+def submit_llm(model, prompt, agent, label, kind="markdown", cache=True, keep=True, on_done=None):
+    # One streamed answer in the background. When done it is kept in session
+    # state (`<agent>_out`) with its time-to-first-token. Creative agents pass
+    # cache=False so every press gives a fresh answer.
+    def done(job):
+        st.session_state[f"{agent}_out"] = job.result
+        st.session_state['ttft'][agent] = job.steps[agent].ttft
+        if on_done:
+            on_done(job)
+    return submit_job(agent, stream_job, model, prompt, agent, cache, label=label, render=kind, keep=keep,
+                      on_done=done)
+
+def design_job(job, model, targets, context, outputs):
+    # The Design Studio agents through the DAG executor: agents whose inputs are
+    # ready run concurrently, each one streams into its own step of the job.
+    def on_event(name, status, payload):
+        label = DESIGN_DAG[name].label
+        if status == "running":
+            job.step(name, label)
+        elif status == "done":
+            job.step(name, f"{label} done in {payload:.1f}s", state=jobs.DONE)
+        elif status != "partial":
+            job.step(name, f"{label} {status}", state=jobs.FAILED, text=str(payload))
+
+    def call(agent, prompt, progress):
+        return stream_job(job, model, prompt, agent.name, cache=False, **agent.options)
+
+    results, errors = DESIGN_DAG.run(call, context, targets=targets, outputs=outputs, on_event=on_event)
+    return {name: results[name] for name in targets if name in results}
+
+def run_design_agents(model, targets, context, outputs=None):
+    # Failed agents stay listed under the page; finished ones land in session state.
+    def done(job):
+        for name in DESIGN_DAG.order:
+            if name in job.result:
+                st.session_state[f"{name}_out"] = job.result[name]
+                st.session_state['ttft'][name] = job.steps[name].ttft
+                st.session_state['design_versions'].stamp(DESIGN_DAG, name)
+    targets = [n for n in DESIGN_DAG.order if n in targets]
+    return submit_job("design", design_job, model, targets, context, outputs,
+                      label="Running " + ", ".join(n.capitalize() for n in targets), keep=False, on_done=done)
+
+def retune_job(job, model, agent, prompt):
+    # Same JSON mode and validation as the agent's run in the DAG
+    text = stream_job(job, model, prompt, agent.name, cache=False, **agent.options)
+    agent.parse(text)
+    return text
+
+def retune_agent(model, name, feedback, kind):
+    # Reruns one Design Studio agent with the user's feedback. Its new output
+    # bumps its version, which leaves the agents downstream of it stale.
+    outputs = {n: st.session_state[f"{n}_out"] for n in DESIGN_DAG.order}
+    prompt = retune_prompt(DESIGN_DAG[name], st.session_state['design_context'], outputs, outputs[name], feedback)
+    def done(job):
+        st.session_state[f"{name}_out"] = job.result
+        st.session_state['ttft'][name] = job.steps[name].ttft
+        st.session_state['design_versions'].stamp(DESIGN_DAG, name)
+    return submit_job(name, retune_job, model, DESIGN_DAG[name], prompt, label=f"Retuning {name.capitalize()}",
+                      render=kind, keep=False, on_done=done)
+
+
+# --- CATALOG TABLES ---
+# The Gear Lab browses memory-mapped Arrow copies of the catalogs: search, sort
+# and paging run here, and each rerun sends the browser one page of rows. Opened
+# on first view; the file version in the key reopens (and recompiles) a table
+# after its JSON file is reloaded.
+@st.cache_resource(max_entries=2 * len(columnar.SOURCES), show_spinner=False)
+def get_catalog_table(name, version):
+    return columnar.load_table(getattr(CATALOGS, name), columnar.SOURCES[name])
+
+@st.fragment
+def catalog_table(name, columns=None):
+    # Paging, sorting and searching rerun this table only
+    table = get_catalog_table(name, DATA.version(CATALOG_KEYS[name]))
+    c_search, c_sort, c_order, c_size = st.columns([3, 2, 1, 1])
+    search = c_search.text_input("Search brand / model", key=f"{name}_table_search", placeholder="e.g. sundown 15")
+    sort = c_sort.selectbox("Sort by", ["(catalog order)"] + table.sortable, key=f"{name}_table_sort")
+    descending = c_order.toggle("Descending", key=f"{name}_table_desc")
+    page_size = c_size.selectbox("Rows", columnar.PAGE_SIZES, key=f"{name}_table_size")
+    ids = table.select(search, None if sort == "(catalog order)" else sort, descending)
+    matched = table.count(ids)
+    pages = max(1, -(-matched // page_size))
+    page_key = f"{name}_table_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages   # the search narrowed the rows
+    page = st.number_input("Page", min_value=1, max_value=pages, key=page_key) if pages > 1 else 1
+    st.dataframe(table.page(ids, page - 1, page_size, columns), width="stretch", hide_index=True)
+    first = (page - 1) * page_size
+    st.caption(f"Rows {min(first + 1, matched)}-{min(first + page_size, matched)} of {matched}"
+               + (f" matching ({len(table)} in the catalog)" if matched != len(table) else ""))
+
+
+# --- FREE-TEXT PART FIELDS ---
+# Gear names typed by the user are resolved against the catalogs on every rerun
+# (a trigram index lookup, well under a millisecond). Unclear names get "did you
+# mean" buttons that rewrite the field.
+NOT_IN_DB = "❔ Not in the Gear Lab database"
+
+def _use_suggestion(key, text):
+    st.session_state[key] = text
+
+def part_input(label, key, resolve, value="", replace=None, missing=NOT_IN_DB, **kwargs):
+    # text_input + resolution caption; returns (text, Resolution)
+    if key not in st.session_state:
+        st.session_state[key] = value
+    text = st.text_input(label, key=key, **kwargs)
+    resolution = resolve(text)
+    best = resolution.best
+    if best:
+        quantity = f"{resolution.quantity}x " if resolution.quantity else ""
+        st.caption(f"✅ {quantity}{best.label} ({best.score:.0%} match)")
+    elif resolution.suggestions:
+        st.caption("Did you mean:")
+        for i, match in enumerate(resolution.suggestions):
+            fixed = replace(text, match.label) if replace else resolution.replace(match.label)
+            st.button(f"{match.label} ({match.score:.0%})", key=f"{key}_suggest_{i}",
+                      on_click=_use_suggestion, args=(key, fixed))
+    elif text.strip() and missing:
+        st.caption(missing)
+    return text, resolution
+
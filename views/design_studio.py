@@ -0,0 +1,211 @@
+import pandas as pd
+import streamlit as st
+from alphaaudio import electrical, enclosure, pipeline, thermal
+from views.common import (CATALOGS, DATA, DESIGN_DAG, GUIDES, get_working_model, job_running, part_input, retune_agent,
+                          run_design_agents, show_job)
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def thermal_model(subwoofer, power, music_style, catalog_version):
+    # Whole-catalog playback simulation; every widget rerun would redo it otherwise.
+    # `catalog_version` only keys the cache, so an edited Subwoofer_db.json is used
+    return pipeline.thermal_model(CATALOGS, subwoofer, power, music_style)
+
+
+def render():
+    st.header("🎛️ Design Studio: Iterative Simulation")
+    add_prompt = st.session_state.get('add_prompt', "")
+    design_busy = job_running("design")
+    
+    # --- INPUT SECTION (Now on Main Page) ---
+    with st.expander("🛠️ Project Constraints (Click to Edit)", expanded=True):
+        c1, c2 = st.columns(2)
+        with c1:
+            car_model = st.text_input("Vehicle Model", "2010 Honda Civic")
+            subwoofer, _ = part_input("Subwoofer(s)", "ds_subwoofer", CATALOGS.subwoofers.resolve, "2x Sundown Zv6 15")
+            power = st.text_input("Amplifier Power (RMS)", "5000W")
+            alternator_amps = st.text_input("Alternator Output (A)", "240")
+        with c2:
+            Fs = st.slider("Desired Frequency (Hz)", 15, 75, 32)
+            enclosure_kind = st.selectbox("Enclosure Type", list(pipeline.ENCLOSURE_KINDS))
+            music_style = st.selectbox("Music Style", list(electrical.DUTY_CYCLE),
+                                       index=list(electrical.DUTY_CYCLE).index(pipeline.DEFAULT_SPEC["music"]))
+            tolerance = st.select_slider("Destruction Tolerance", options=["Zero", "Rattles", "Flex", "Breakage", "TERMINATION"])
+            comments = st.text_area("Describe your goals or your actual build, giving as much information as possible", "e.g. 'Lithium bank, chasing hairtricks'")
+
+        # --- LOCAL ENCLOSURE MODEL (instant, no LLM) ---
+        enc = pipeline.enclosure_model(CATALOGS, subwoofer, power, Fs, enclosure_kind)
+        if enc:
+            with st.expander(f"📈 Enclosure Model: {enc.quantity}x {enc.driver.label} @ {enc.power_per_sub:,.0f} W each", expanded=False):
+                st.caption(enc.summary + (" (T/S parameters estimated)" if enc.driver.get("ts_estimated") else ""))
+                freqs = enclosure.DEFAULT_FREQS.round(1)
+                g1, g2 = st.columns(2)
+                with g1:
+                    st.markdown("**SPL @ 1 m (dB, one driver)**")
+                    st.line_chart(pd.DataFrame({label: d.spl[0, 0] for label, d in enc.designs.items()}, index=freqs))
+                with g2:
+                    st.markdown("**Peak excursion (mm)**")
+                    st.line_chart(pd.DataFrame({label: d.excursion[0, 0] * 1e3 for label, d in enc.designs.items()}, index=freqs))
+            # --- IN-CAR SPL (enclosure response + cabin gain) ---
+            cabin_spl = pipeline.cabin_model(enc, car_model, enclosure_kind)
+            with st.expander(f"🚗 In-Car SPL: {cabin_spl.peak[0]:.1f} dB peak, {cabin_spl.at(Fs):.1f} dB at {Fs} Hz", expanded=False):
+                st.caption(cabin_spl.summary(at=Fs))
+                st.line_chart(pd.DataFrame({label: pipeline.cabin_model(enc, car_model, label).spl[0]
+                                            for label in enc.designs}, index=enclosure.DEFAULT_FREQS.round(1)))
+        else:
+            cabin_spl = None
+            st.caption("Subwoofer not found in the Gear Lab database: the Architect will size the box on its own.")
+
+        # --- LOCAL ELECTRICAL MODEL ---
+        elec = pipeline.electrical_model(CATALOGS, power, alternator_amps, music_style)
+        if elec:
+            load, banks, electrical_summary = elec
+            with st.expander(f"🔋 Electrical Model: {load.peak_current:,.0f} A peak", expanded=False):
+                st.caption(electrical_summary)
+                st.dataframe(electrical.smallest_banks(banks), width="stretch")
+
+        # --- LOCAL THERMAL MODEL ---
+        therm = thermal_model(subwoofer, power, music_style, DATA.version("subwoofers"))
+        if therm:
+            sim, i = therm.simulation, therm.index
+            with st.expander(f"🌡️ Thermal Model: coil peaks at {sim.peak[i]:.0f} °C", expanded=False):
+                st.caption(therm.summary)
+                st.markdown(f"**Coil temperature (°C) over {sim.time[-1] / 60:.0f} min of playback**")
+                step = max(1, round(1 / thermal.DT))   # one point per second
+                st.line_chart(pd.DataFrame({therm.driver.label: sim.coil[i, ::step], "limit": thermal.T_LIMIT},
+                                           index=(sim.time[::step] / 60).round(2)))
+                st.markdown(f"**Every driver at {therm.power_per_sub:,.0f} W**")
+                st.dataframe(sim.table(), width="stretch")
+
+        if st.button("🚀 INITIATE SIMULATION", type="primary", width="stretch", disabled=design_busy):
+            model = get_working_model()
+            if model:
+                # Architect first, then Structural and Thermal in parallel (both only read the Architect)
+                spec = {"car": car_model, "subwoofer": subwoofer, "power": power, "fs": Fs, "enclosure": enclosure_kind,
+                        "music": music_style, "tolerance": tolerance, "notes": comments}
+                context = {"proj_data": pipeline.project_data(spec, enc.summary if enc else "",
+                                                              cabin_spl.summary(at=Fs) if cabin_spl else ""),
+                           "extra": add_prompt,
+                           "electrical": elec[2] if elec else "", "thermal": therm.summary if therm else "",
+                           "guides": GUIDES.context(f"{comments} {add_prompt}")}
+                st.session_state['design_context'] = context   # retunes and refreshes reuse it
+                run_design_agents(model, pipeline.SIMULATION_AGENTS, context)
+                st.rerun()
+
+    # Simulation / refresh / core runs in the background: live progress, then failures if any
+    show_job("design")
+
+    # --- RESULTS SECTION ---
+    if st.session_state['architect_out']:
+        st.divider()
+        st.subheader("📊 Simulation Results")
+        
+        col1, col2, col3 = st.columns(3)
+        model = get_working_model()
+        stale = st.session_state['design_versions'].stale(DESIGN_DAG)
+        stale_tag = lambda name: " ⚠️ *stale*" if name in stale else ""
+
+        # ARCHITECT COLUMN
+        with col1:
+            st.markdown(f"#### 📐 Architect{stale_tag('architect')}")
+            st.info(DESIGN_DAG['architect'].render(st.session_state['architect_out']))
+            feedback = st.text_input("Refine Architect", key="arch_fb")
+            if st.button("Retune Architect", disabled=job_running("architect")):
+                retune_agent(model, "architect", feedback, "info")
+                st.rerun()
+            show_job("architect")
+
+        # STRUCTURAL COLUMN
+        with col2:
+            st.markdown(f"#### 🔨 Structural{stale_tag('structural')}")
+            st.warning(DESIGN_DAG['structural'].render(st.session_state['structural_out']))
+            feedback = st.text_input("Refine Structural", key="struct_fb")
+            if st.button("Re-Test Structural", disabled=job_running("structural")):
+                retune_agent(model, "structural", feedback, "warning")
+                st.rerun()
+            show_job("structural")
+
+        # THERMAL COLUMN
+        with col3:
+            st.markdown(f"#### 🔥 Thermal{stale_tag('thermal')}")
+            st.error(DESIGN_DAG['thermal'].render(st.session_state['thermal_out']))
+            feedback = st.text_input("Refine Thermal", key="therm_fb")
+            if st.button("Re-Check Thermal", disabled=job_running("thermal")):
+                retune_agent(model, "thermal", feedback, "error")
+                st.rerun()
+            show_job("thermal")
+
+        # STALE OUTPUTS: rerun only what a retune invalidated (Structural and
+        # Thermal together, then Core), reading the current upstream outputs
+        if stale:
+            s_msg, s_btn = st.columns([4, 1])
+            with s_msg:
+                labels = ", ".join(name.capitalize() for name in stale)
+                st.warning(f"Out of date after a retune: {labels}.")
+            with s_btn:
+                if st.button("🔄 Refresh stale", width="stretch", disabled=design_busy):
+                    outputs = {n: st.session_state[f"{n}_out"] for n in DESIGN_DAG.order if n not in stale}
+                    run_design_agents(model, stale, st.session_state['design_context'], outputs=outputs)
+                    st.rerun()
+
+        # CORE VERDICT SECTION
+        st.divider()
+        c_btn, c_res = st.columns([1, 4])
+        with c_btn:
+            # Core must not synthesize from outputs this page marks as out of date
+            upstream_stale = [name for name in stale if name != "core"]
+            if st.button("🏁 Synthesize Final Plan", type="primary", disabled=design_busy or bool(upstream_stale),
+                         help="Refresh the stale agents first" if upstream_stale else None):
+                outputs = {name: st.session_state[f"{name}_out"] for name in ("architect", "structural", "thermal")}
+                run_design_agents(model, ["core"], {}, outputs=outputs)
+                st.rerun()
+        
+        with c_res:
+            if st.session_state['core_out']:
+                st.success(f"**CORE VERDICT{stale_tag('core')}:**\n\n{st.session_state['core_out']}")
+
+    # --- SHARE SECTION (HIDDEN UNTIL DONE) ---
+    if st.session_state['core_out']:
+        st.divider()
+        st.header("📤 Export & Share")
+        
+        build_summary = f"""
+        VEHICLE: {car_model}
+        SUBWOOFER: {subwoofer}
+        POWER: {power}
+        TOLERANCE: {tolerance}
+        
+        -- ARCHITECT --
+        {DESIGN_DAG['architect'].render(st.session_state['architect_out'])}
+        
+        -- STRUCTURAL --
+        {DESIGN_DAG['structural'].render(st.session_state['structural_out'])}
+        
+        -- THERMAL --
+        {DESIGN_DAG['thermal'].render(st.session_state['thermal_out'])}
+        
+        -- CORE VERDICT --
+        {st.session_state['core_out']}
+        """
+        
+        col_pdf, col_txt = st.columns(2)
+        with col_txt:
+            st.text_area("Raw Text Summary", build_summary, height=150)
+            
+        with col_pdf:
+            if st.button("📄 Generate PDF Report"):
+                from fpdf import FPDF # type: ignore  # only loaded when a report is generated
+                pdf = FPDF()
+                pdf.add_page()
+                pdf.set_font("Arial", size=10)
+                # Simple PDF generation (ascii safe)
+                safe_text = build_summary.encode('latin-1', 'replace').decode('latin-1')
+                pdf.multi_cell(0, 5, safe_text)
+                
+                pdf_output = pdf.output(dest="S").encode("latin-1")
+                st.download_button(
+                    label="Download PDF",
+                    data=pdf_output,
+                    file_name="AlphaAudio_Build.pdf",
+                    mime="application/pdf"
+                )
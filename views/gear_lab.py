@@ -0,0 +1,286 @@
+import time
+
+import streamlit as st
+from alphaaudio import electrical
+from alphaaudio.context_cache import catalog_prompt
+from alphaaudio.query import (DEFAULT_TOP_K, parse_number, shortlist_alternators,
+                              shortlist_amplifiers, shortlist_batteries, shortlist_headunits,
+                              shortlist_processors, shortlist_subwoofers)
+from views.common import (CATALOGS, DATA, GUIDES, PROMPTS, SNAPSHOTS, catalog_table, get_working_model, show_job,
+                          submit_llm)
+
+
+def render():
+    st.header("🧪 Gear Laboratory")
+
+    # Onglets pour naviguer entre les catégories
+    tab_labels = [
+        "Subwoofers",
+        "Amplifiers",
+        "Battery & Electrical",
+        "Headunits & Processors",
+        "Wiring Guide",
+        "Other Accessories"
+    ]
+    tabs = st.tabs(tab_labels)
+
+    # Each tab is a fragment: submitting one recommender reruns that tab only,
+    # not the header, the other tabs or their database tables
+    for tab, render_tab in zip(tabs, [subwoofers_tab, amplifiers_tab, electrical_tab,
+                                      headunits_tab, wiring_guide_tab, accessories_tab]):
+        with tab:
+            render_tab()
+
+
+# Onglet Subwoofers
+@st.fragment
+def subwoofers_tab():
+    col_a, col_b = st.columns([1, 2])
+    with col_a:
+        st.subheader("AI Recommender")
+        with st.form("recommender_form"):
+            user_budget = st.text_input("Budget ($)", "1500")
+            music_style = st.selectbox("Music Style", ["Decaf (20-30Hz)", "Rap (30-40Hz)", "EDM (40Hz+)", "Metal"])
+            goal = st.radio("Goal", ["Wind/Hairtricks", "SPL Score", "Sound Quality"])
+            submitted = st.form_submit_button("🤖 Find My Subwoofer")
+            if submitted:
+                model = get_working_model()
+                if model:
+                    with st.spinner("Analyzing Database..."):
+                        reqs = f"Budget: {user_budget}, Music: {music_style}, Goal: {goal}"
+                        shortlist = shortlist_subwoofers(CATALOGS.subwoofers, user_budget, music_style, goal)
+                        st.caption(shortlist.summary())
+                        # Role prompt + catalog are the cached prefix, only the request part changes
+                        prompt = catalog_prompt(PROMPTS.get("RECOMMENDER_PROMPT"), [SNAPSHOTS["subwoofers"]], reqs, [shortlist],
+                                                name="subwoofer_recommender")
+                        submit_llm(model, prompt, "subwoofer_recommender", "Analyzing Database...")
+        show_job("subwoofer_recommender")
+    with col_b:
+        st.subheader("📦 Subwoofer Database")
+        catalog_table("subwoofers")
+
+
+# Onglet Amplifiers
+@st.fragment
+def amplifiers_tab():
+    st.subheader("Amplifiers Shopping & Database")
+    col_l, col_r = st.columns([1, 2])
+    with col_l:
+        st.markdown("### AI Amplifier Recommender")
+        with st.form("amp_recommender_form"):
+            amp_budget = st.text_input("Budget ($)", "1000")
+            desired_rms = st.text_input("Desired RMS per channel (e.g. 500)", "500")
+            channels = st.selectbox("Channel Count", [1, 2, 4, 5, 6, 8], index=2)
+            amp_class = st.selectbox("Preferred Class", ["Any", "D", "AB"], index=0)
+            amp_notes = st.text_area("Installation Constraints / Notes (optional)", "")
+            amp_submit = st.form_submit_button("🔎 Recommend Amplifiers")
+
+            if amp_submit:
+                model = get_working_model()
+                if model:
+                    with st.spinner("Analyzing amplifier database..."):
+                        reqs = f"Budget: {amp_budget}, DesiredRMS: {desired_rms}, Channels: {channels}, Class: {amp_class}, Notes: {amp_notes}"
+                        shortlist = shortlist_amplifiers(CATALOGS.amplifiers, amp_budget, desired_rms, channels, amp_class)
+                        st.caption(shortlist.summary())
+                        amp_prompt = PROMPTS.get("AMPLIFIER_RECOMMENDER_PROMPT", "You are the Amplifier Selection Specialist.")
+                        prompt = catalog_prompt(amp_prompt, [SNAPSHOTS["amplifiers"]], reqs, [shortlist],
+                                                name="amplifier_recommender")
+                        submit_llm(model, prompt, "amplifier_recommender", "Analyzing amplifier database...")
+        show_job("amplifier_recommender")
+    with col_r:
+        st.subheader("📦 Amplifier Database")
+        catalog_table("amplifiers")
+
+
+# Onglet Battery & Electrical
+@st.fragment
+def electrical_tab():
+    st.subheader("Battery Setups & Electrical Requirements")
+    col_bat, col_alt = st.columns([2, 1])
+    with col_bat:
+        st.markdown("### Battery Database")
+        catalog_table("batteries")
+    with col_alt:
+        st.markdown("### Alternator Database")
+        catalog_table("alternators")
+
+    st.markdown("---")
+    st.markdown("### Wiring Guides & Tips")
+    for guide in DATA["battery_electrical"].get("wiring_guides", []):
+        st.markdown(f"**{guide['topic']}**: {guide['details']}")
+
+    st.markdown("---")
+    st.markdown("### AI Battery/Electrical Recommender")
+    with st.form("battery_recommender_form"):
+        bat_budget = st.text_input("Budget ($)", "1000")
+        bat_type = st.selectbox("Preferred Chemistry", ["Any", "LifePo4", "LTO", "AGM", "Sodium", "Li-ion", "SCiB"], index=0)
+        bat_capacity = st.text_input("Minimum Capacity (Ah)", "40")
+        alt_needed = st.text_input("Required Alternator Amps", "320")
+        bat_rms = st.text_input("Total Amplifier RMS (W)", "5000")
+        bat_amp_class = st.selectbox("Amplifier Class", list(electrical.AMP_EFFICIENCY), index=0)
+        install_notes = st.text_area("Installation Constraints / Notes (optional)", "")
+        bat_submit = st.form_submit_button("🔎 Recommend Battery/Electrical Setup")
+
+        if bat_submit:
+            model = get_working_model()
+            if model:
+                with st.spinner("Analyzing battery/electrical database..."):
+                    reqs = f"Budget: {bat_budget}, Chemistry: {bat_type}, MinCapacity: {bat_capacity}, AltAmps: {alt_needed}, Notes: {install_notes}"
+                    cells = shortlist_batteries(CATALOGS.batteries, bat_type, bat_capacity)
+                    alternators = shortlist_alternators(CATALOGS.alternators, alt_needed)
+                    st.caption(f"{cells.summary()} {alternators.summary()}")
+                    # Deterministic bank sizing over the whole battery table, the AI only explains it
+                    alt_amps = parse_number(alt_needed, 0)
+                    load = electrical.ElectricalLoad(parse_number(bat_rms, 0), bat_amp_class)
+                    banks = electrical.enumerate_banks(CATALOGS.batteries, load, alt_amps)
+                    bank_summary = electrical.electrical_summary(load, banks, alt_amps)
+                    st.info(bank_summary)
+                    st.dataframe(electrical.smallest_banks(banks), width="stretch")
+                    reqs += f"\nELECTRICAL MODEL (computed, build on these numbers): {bank_summary}"
+                    extra = str({
+                        "banks": electrical.smallest_banks(banks)[:DEFAULT_TOP_K],
+                        # Only the guide passages relevant to this setup, not the whole guide
+                        "wiring_guides": [p.as_dict() for p, _ in GUIDES.search(
+                            f"{bat_type} battery alternator {install_notes}", DEFAULT_TOP_K)],
+                    })
+                    bat_prompt = PROMPTS.get("BATTERY_RECOMMENDER_PROMPT", "You are the Battery/Electrical Selection Specialist.")
+                    prompt = catalog_prompt(bat_prompt, [SNAPSHOTS["batteries"], SNAPSHOTS["alternators"]], reqs,
+                                            [cells, alternators], f"COMPUTED: {extra}", name="battery_recommender")
+                    submit_llm(model, prompt, "battery_recommender", "Analyzing battery/electrical database...")
+    show_job("battery_recommender")
+
+
+# Onglet Headunits & Processors
+@st.fragment
+def headunits_tab():
+    st.subheader("Headunits & Processors Shopping")
+    col_hu, col_proc = st.columns([2, 2])
+    with col_hu:
+        st.markdown("### Headunit Database")
+        catalog_table("headunits")
+    with col_proc:
+        st.markdown("### Processor/LOC Database")
+        catalog_table("processors")
+
+    st.markdown("---")
+    st.markdown("### AI Headunit Recommender")
+    with st.form("headunit_recommender_form"):
+        hu_budget = st.text_input("Budget ($)", "600")
+        chassis_type = st.selectbox("Chassis Type", ["Any", "Single DIN", "Double DIN", "Floating", "External", "Custom"], index=0)
+        min_preout = st.text_input("Minimum Pre-out Voltage (V)", "4")
+        eq_needed = st.selectbox("Internal EQ Needed", ["Any", "Yes", "No"], index=0)
+        data_integration = st.selectbox("Data Integration", ["Any", "Yes", "No"], index=0)
+        hu_notes = st.text_area("Features/Notes (Bluetooth, CarPlay, etc.)", "")
+        hu_submit = st.form_submit_button("🔎 Recommend Headunits")
+        if hu_submit:
+            model = get_working_model()
+            if model:
+                with st.spinner("Analyzing headunit database..."):
+                    reqs = f"Budget: {hu_budget}, Chassis: {chassis_type}, MinPreout: {min_preout}, EQ: {eq_needed}, Data: {data_integration}, Notes: {hu_notes}"
+                    shortlist = shortlist_headunits(CATALOGS.headunits, chassis_type, min_preout, eq_needed)
+                    st.caption(shortlist.summary())
+                    hu_prompt = PROMPTS.get("HEADUNIT_RECOMMENDER_PROMPT", "You are the Headunit Selection Specialist.")
+                    prompt = catalog_prompt(hu_prompt, [SNAPSHOTS["headunits"]], reqs, [shortlist],
+                                            name="headunit_recommender")
+                    submit_llm(model, prompt, "headunit_recommender", "Analyzing headunit database...")
+    show_job("headunit_recommender")
+
+    st.markdown("---")
+    st.markdown("### AI Processor/LOC Recommender")
+    with st.form("processor_recommender_form"):
+        proc_budget = st.text_input("Budget ($)", "400")
+        input_topology = st.selectbox("Input Topology", ["Any", "Analog RCA", "High/Low Level", "Optical", "LOC"], index=0)
+        channels_in = st.text_input("Channels In", "2")
+        channels_out = st.text_input("Channels Out", "4")
+        active_needed = st.selectbox("Active DSP Needed", ["Any", "Yes", "No"], index=0)
+        tuning = st.text_area("Tuning Needs/Notes", "")
+        proc_submit = st.form_submit_button("🔎 Recommend Processor/LOC")
+        if proc_submit:
+            model = get_working_model()
+            if model:
+                with st.spinner("Analyzing processor/LOC database..."):
+                    reqs = f"Budget: {proc_budget}, Input: {input_topology}, ChannelsIn: {channels_in}, ChannelsOut: {channels_out}, Active: {active_needed}, Tuning: {tuning}"
+                    shortlist = shortlist_processors(CATALOGS.processors, input_topology, channels_in, channels_out, active_needed)
+                    st.caption(shortlist.summary())
+                    proc_prompt = PROMPTS.get("PROCESSOR_RECOMMENDER_PROMPT", "You are the Processor/LOC Selection Specialist.")
+                    prompt = catalog_prompt(proc_prompt, [SNAPSHOTS["processors"]], reqs, [shortlist],
+                                            name="processor_recommender")
+                    submit_llm(model, prompt, "processor_recommender", "Analyzing processor/LOC database...")
+    show_job("processor_recommender")
+
+
+# Onglet Wiring Guide
+@st.fragment
+def wiring_guide_tab():
+    wiring_guide = DATA["wiring_guide"].get("wiring_guide", {})
+    st.header(wiring_guide.get("title", "Wiring & Installation Master Guide"))
+
+    # Local BM25 search over every guide and electrical tip, no AI call
+    query = st.text_input("🔎 Search the guides", key="guide_query",
+                          placeholder="e.g. what fuse for 4 gauge wire, how to set gains, ground point")
+    if query.strip():
+        started = time.perf_counter()
+        results = GUIDES.search(query)
+        st.caption(f"{len(results)} of {len(GUIDES)} passages in {(time.perf_counter() - started) * 1000:.1f} ms")
+        if not results:
+            st.info("No guide covers that yet. Try other words, or ask the AI through the Prompt Addition box.")
+        for i, (passage, score) in enumerate(results):
+            label = f"{passage.title} · {passage.source}" + (f" · {passage.difficulty}" if passage.difficulty else "")
+            with st.expander(f"{label} (score {score:.1f})", expanded=i == 0):
+                if passage.summary:
+                    st.caption(passage.summary)
+                st.markdown(passage.text)
+        st.divider()
+
+    # Create two columns
+    col1, col2 = st.columns(2, gap="large")
+
+    # ==========================================
+    # COLUMN 1: INSTALLATION ESSENTIALS
+    # ==========================================
+    with col1:
+        essentials = wiring_guide.get("installation_essentials", {})
+        st.subheader(essentials.get("title", "🛠️ Installation Essentials"))
+        st.info(essentials.get("description", "The mandatory steps for a safe, functional system."))
+
+        for i, guide in enumerate(essentials.get("guides", [])):
+            st.markdown(f"#### {guide.get('title', 'Untitled Guide')}")
+            st.select_slider(
+                "Difficulty Level",
+                options=["Beginner", "Intermediate", "Advanced", "Expert"],
+                value=guide.get("difficulty", "Beginner"),
+                disabled=True,
+                key=f"essential_diff_{i}"
+            )
+            with st.expander(guide.get("details", {}).get("summary", "Click to Expand")):
+                st.markdown(guide.get("details", {}).get("content", ""))
+            st.divider()
+
+    # ==========================================
+    # COLUMN 2: PRO TIPS & TRICKS
+    # ==========================================
+    with col2:
+        pro_tips = wiring_guide.get("pro_tips_and_tricks", {})
+        st.subheader(pro_tips.get("title", "💡 Pro Tips & Tricks"))
+        st.info(pro_tips.get("description", "Hacks to make your install look and perform like a pro."))
+
+        for i, guide in enumerate(pro_tips.get("guides", [])):
+            st.markdown(f"#### {guide.get('title', 'Untitled Guide')}")
+            st.select_slider(
+                "Difficulty Level",
+                options=["Beginner", "Intermediate", "Advanced", "Expert"],
+                value=guide.get("difficulty", "Beginner"),
+                disabled=True,
+                key=f"pro_tip_diff_{i}"
+            )
+            with st.expander(guide.get("details", {}).get("summary", "Click to Expand")):
+                st.markdown(guide.get("details", {}).get("content", ""))
+            st.divider()
+
+
+# Onglet Other Accessories
+@st.fragment
+def accessories_tab():
+    st.subheader("Other Accessories, Inputs, Distro Blocks, etc.")
+    st.info("À compléter : Ajoutez ici la base de données des accessoires, connecteurs, distribution, etc.")
+
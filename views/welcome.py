@@ -0,0 +1,37 @@
+import streamlit as st
+
+
+def render():
+    st.title("Welcome to AlphaAudio ☢️")
+    st.markdown("Your personal AI-powered car audio system simulator and designer.")
+    st.markdown("---")
+
+    st.header("How it Works")
+    st.markdown("""
+    AlphaAudio uses a suite of specialized AI agents to simulate and design your car audio system. You provide the constraints, and the AI does the heavy lifting, providing you with detailed analysis and recommendations.
+    """)
+
+    st.header("How to Use AlphaAudio")
+    st.markdown("""
+    Use the menu in the sidebar to navigate between the different modes:
+
+    ### 🎛️ Design Studio
+    This is the core of AlphaAudio. Here you can simulate a complete car audio build.
+    1.  **Enter Your Project Constraints**: Specify your vehicle, subwoofers, amplifier power, and your goals.
+    2.  **Initiate Simulation**: The AI agents (Architect, Structural, and Thermal) will analyze your setup.
+    3.  **Review and Refine**: Check the results from each agent. You can provide feedback and rerun the simulation for each part to refine the design. Reports that depend on a retuned part are flagged as stale, and **Refresh stale** reruns only those.
+    4.  **Synthesize Final Plan**: Once you are happy with the design, the CORE agent will provide a final verdict and a summary of the build.
+    5.  **Export**: You can export the final build plan as a text summary or a PDF report.
+
+    ### 🧪 Gear Lab
+    Here you can find the right gear for your build.
+    1.  **AI Recommender**: Get AI-powered recommendations for subwoofers, amplifiers, and more based on your budget and goals.
+    2.  **Database**: Browse the curated databases of audio equipment.
+
+    ### ⚔️ Build Comparison
+    Compare different builds side-by-side to see which one comes out on top for your specific goals.
+    1.  **Enter Builds**: Input the details for 2 to 64 different builds. Above 4 builds, they play a seeded knockout tournament.
+    2.  **FIGHT!**: The AI will simulate a "battle" between the builds and declare a winner.
+
+    **To get started, select a mode from the sidebar.**
+    """)